@@ -0,0 +1,162 @@
+"""Flag bad sensor rows in `duracion` and `tasa_penetracion`.
+
+A row is an anomaly for one or more reasons (bit flags, so a row can
+carry several):
+
+- `duracion_no_positiva`: a finite `duracion` <= 0 (end before start);
+- `tasa_invalida`: a negative or infinite `tasa_penetracion`;
+- `duracion_atipica` / `tasa_atipica`: a positive value far from its
+  rig's typical values, by robust statistics so the outliers being
+  looked for cannot drag the reference along:
+
+  - `"mad"`: robust z-score `|x - median| / (1.4826 * MAD)` above the
+    threshold (3.5 by default);
+  - `"iqr"`: outside the Tukey fences `Q1 - k*IQR .. Q3 + k*IQR`
+    (`k = 3`, "far out", by default).
+
+The per-rig medians, MADs and quartiles come from
+`group_statistics.RunningGroupQuantiles` sketches, so an
+`AnomalyDetector` can be fed chunk by chunk (or merged across worker
+processes) and every step is a vectorized pass over the rows. Missing
+values are never anomalies, and rigs with fewer than
+`MIN_GROUP_SAMPLES` values only get the validity checks.
+"""
+
+from typing import TypedDict
+
+import numpy as np
+import pandas as pd
+
+from classification import MAD_SCALE
+from group_statistics import RunningGroupQuantiles
+
+ANOMALY_METHODS: tuple = ("mad", "iqr")
+
+# Default cutoff per method: robust z for "mad", IQR multiple for "iqr".
+DEFAULT_ANOMALY_THRESHOLDS = {"mad": 3.5, "iqr": 3.0}
+
+# Rigs with fewer positive values are not checked against their spread.
+MIN_GROUP_SAMPLES = 20
+
+# Reason bits, in `ANOMALY_REASONS` order.
+ANOMALY_REASONS: tuple = (
+    "duracion_no_positiva",
+    "tasa_invalida",
+    "duracion_atipica",
+    "tasa_atipica",
+)
+
+# Group key of every row when the frame has no `perforadora` column.
+SINGLE_GROUP_KEY = "todas"
+
+
+class AnomalyReport(TypedDict):
+    """Anomaly counts for the data-quality warning.
+
+    `by_reason` maps every `ANOMALY_REASONS` entry to its row count (a
+    row may count under several); `anomaly_rows` holds up to 20 row
+    positions.
+    """
+
+    anomaly_count: int
+    by_reason: dict
+    anomaly_rows: list
+
+
+def _as_float(values):
+    return pd.Series(values, copy=False).to_numpy(dtype=float, na_value=np.nan)
+
+
+class AnomalyDetector:
+    """Per-rig robust reference for `duracion` and `tasa_penetracion`.
+
+    `update` (per chunk) and `merge` (per worker) accumulate the
+    sketches; `reasons` / `flags` score rows against what has been seen
+    so far.
+    """
+
+    def __init__(self, method="mad", threshold=None):
+        if method not in ANOMALY_METHODS:
+            raise ValueError(f"Método de detección no soportado: {method!r}")
+        self.method = method
+        self.threshold = DEFAULT_ANOMALY_THRESHOLDS[method] if threshold is None else threshold
+        self.duration = RunningGroupQuantiles()
+        self.rate = RunningGroupQuantiles()
+
+    def update(self, keys, duracion, tasa) -> "AnomalyDetector":
+        """Fold a batch of rows into the per-rig sketches."""
+        self.duration.update(keys, duracion)
+        self.rate.update(keys, tasa)
+        return self
+
+    def merge(self, other: "AnomalyDetector") -> "AnomalyDetector":
+        self.duration.merge(other.duration)
+        self.rate.merge(other.rate)
+        return self
+
+    def _bounds(self, sketch):
+        """Per-group `(low, high)` limits of the typical values."""
+        if self.method == "mad":
+            median, mad = sketch.median_mad()
+            reach = self.threshold * MAD_SCALE * mad
+            low, high = median - reach, median + reach
+        else:
+            q1, q3 = sketch.quantiles([0.25, 0.75]).T
+            reach = self.threshold * (q3 - q1)
+            low, high = q1 - reach, q3 + reach
+        # A zero spread (constant values) gives no usable reference.
+        usable = (sketch.counts() >= MIN_GROUP_SAMPLES) & (high > low)
+        return np.where(usable, low, -np.inf), np.where(usable, high, np.inf)
+
+    def _outside(self, sketch, keys, values):
+        slots = sketch.row_slots(keys)
+        if len(sketch) == 0:
+            return np.zeros(len(values), dtype=bool)
+        low, high = self._bounds(sketch)
+        known = slots >= 0
+        row_low = np.where(known, low[slots], -np.inf)
+        row_high = np.where(known, high[slots], np.inf)
+        with np.errstate(invalid="ignore"):
+            outside = (values < row_low) | (values > row_high)
+            return np.isfinite(values) & (values > 0) & outside
+
+    def reasons(self, keys, duracion, tasa) -> np.ndarray:
+        """`uint8` reason bits per row (0 = not an anomaly)."""
+        duracion = _as_float(duracion)
+        tasa = _as_float(tasa)
+        with np.errstate(invalid="ignore"):
+            checks = (
+                np.isfinite(duracion) & (duracion <= 0),
+                (tasa < 0) | np.isinf(tasa),
+                self._outside(self.duration, keys, duracion),
+                self._outside(self.rate, keys, tasa),
+            )
+        bits = np.zeros(len(duracion), dtype=np.uint8)
+        for bit, check in enumerate(checks):
+            bits |= check.astype(np.uint8) << bit
+        return bits
+
+    def flags(self, keys, duracion, tasa) -> np.ndarray:
+        """Boolean anomaly flag per row."""
+        return self.reasons(keys, duracion, tasa) > 0
+
+
+def frame_keys(df) -> pd.Series:
+    """Rig keys of `df`, or one `SINGLE_GROUP_KEY` group without rigs."""
+    if "perforadora" in df.columns:
+        return df["perforadora"]
+    return pd.Series(SINGLE_GROUP_KEY, index=df.index, dtype=object)
+
+
+def anomaly_report(reasons) -> AnomalyReport:
+    """Summarize the output of `AnomalyDetector.reasons`."""
+    reasons = np.asarray(reasons)
+    rows = np.flatnonzero(reasons)
+    return AnomalyReport(
+        anomaly_count=int(len(rows)),
+        by_reason={
+            name: int(np.count_nonzero(reasons & (1 << bit)))
+            for bit, name in enumerate(ANOMALY_REASONS)
+        },
+        anomaly_rows=rows[:20].tolist(),
+    )
@@ -0,0 +1,228 @@
+"""Headless batch processing of many rig exports.
+
+Usage::
+
+    python batch_processing.py exports/ "turnos/*.csv" \\
+        --metric penetration_rate --rate 1.0 0.7 0.4 \\
+        --output dureza.feather --report tiempos.csv --workers 8
+
+Every input is a CSV path, a directory (all `*.csv` inside) or a glob
+pattern. Each file goes through `DataProcessor.load_and_process` in a
+worker process, which also folds the file's `tasa_penetracion` into a
+per-rig `RunningGroupStats`. The parent merges those partial moments
+(Chan et al.), so `tasa_penetracion_normalizada` uses the statistics of
+the whole batch exactly as if every file had been one CSV, then
+classifies with the requested metric and thresholds and writes a single
+Feather or Parquet file (by extension) with an `archivo` column naming
+each row's source. Files that fail are reported, not fatal; the exit
+status is 1 when any file failed.
+"""
+
+import argparse
+import glob
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import TypedDict
+
+import pandas as pd
+
+from classification import DEFAULT_THRESHOLDS
+from csv_parsing import PYARROW_AVAILABLE
+from data_processor import METRIC_COLUMNS, RIG_NORMALIZATION_MODES, DataProcessor, compact_dtypes
+from group_statistics import RunningGroupStats
+
+OUTPUT_FORMATS: tuple = (".feather", ".parquet")
+
+
+class FileTiming(TypedDict):
+    """Per-file row of the timing report.
+
+    `segundos` is the worker's wall time for reading, processing and
+    (when possible) classifying the file; `error` is empty unless
+    `estado` is `"error"`.
+    """
+
+    archivo: str
+    filas: int
+    segundos: float
+    estado: str
+    error: str
+
+
+def expand_inputs(inputs) -> list:
+    """Sorted, de-duplicated CSV paths from files, directories and globs."""
+    paths = set()
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            paths.update(path.glob("*.csv"))
+        elif path.is_file():
+            paths.add(path)
+        else:
+            paths.update(Path(match) for match in glob.glob(item) if Path(match).is_file())
+    return sorted(paths)
+
+
+def process_file(path, thresholds, metric):
+    """Process and classify one CSV; runs inside a worker process.
+
+    For the per-rig normalized metrics classification is left to the
+    parent, since they need the statistics of every file.
+
+    Returns:
+        `(frame, rig_stats, timing)`; `frame` is `None` on failure.
+    """
+    start = time.perf_counter()
+    processor = DataProcessor()
+    rig_stats = RunningGroupStats()
+    try:
+        df = processor.load_and_process(path)
+        if "perforadora" in df.columns:
+            rig_stats.update(df["perforadora"], df["tasa_penetracion"])
+        if metric not in RIG_NORMALIZATION_MODES.values():
+            df = processor.classify_with_metric(df, thresholds, metric, copy=False)
+        df.insert(0, "archivo", Path(path).name)
+        df.attrs = {}
+    except Exception as e:
+        logging.exception(f"Error procesando {path}")
+        timing = FileTiming(
+            archivo=str(path), filas=0, segundos=time.perf_counter() - start,
+            estado="error", error=str(e),
+        )
+        return None, rig_stats, timing
+    timing = FileTiming(
+        archivo=str(path), filas=len(df), segundos=time.perf_counter() - start,
+        estado="ok", error="",
+    )
+    return df, rig_stats, timing
+
+
+def process_batch(paths, thresholds=DEFAULT_THRESHOLDS, metric="duration", workers=None):
+    """Process `paths` in parallel and combine them.
+
+    Args:
+        paths: CSV paths (see `expand_inputs`).
+        thresholds: A `Thresholds` TypedDict.
+        metric: Classification metric (a `METRIC_COLUMNS` key).
+        workers: Worker processes; `None` uses every CPU, `1` runs in
+            this process.
+
+    Returns:
+        `(frame, rig_stats, timings)`: the combined, classified frame
+        (compact dtypes, `tasa_penetracion_normalizada` from the merged
+        per-rig statistics when `perforadora` is present), the merged
+        `RunningGroupStats` and one `FileTiming` per path, in input order.
+    """
+    if metric not in METRIC_COLUMNS:
+        raise ValueError(f"Unknown metric {metric!r}")
+    workers = workers or os.cpu_count() or 1
+    args = [(path, thresholds, metric) for path in paths]
+    if workers > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(min(workers, len(paths))) as pool:
+            results = list(pool.map(process_file, *zip(*args)))
+    else:
+        results = [process_file(*a) for a in args]
+
+    rig_stats = RunningGroupStats()
+    frames, timings = [], []
+    for df, partial, timing in results:
+        rig_stats.merge(partial)
+        timings.append(timing)
+        if df is not None:
+            frames.append(df)
+    if not frames:
+        return pd.DataFrame(), rig_stats, timings
+
+    df = pd.concat(frames, ignore_index=True)
+    if "perforadora" in df.columns:
+        # PARITY-DEBT: webapp/src/utils/dataProcessor.ts:addRigNormalizedRate
+        df["tasa_penetracion_normalizada"] = rig_stats.normalize(
+            df["perforadora"], df["tasa_penetracion"]
+        )
+    if metric in RIG_NORMALIZATION_MODES.values():
+        processor = DataProcessor()
+        if metric != "rig_normalized_penetration" and "perforadora" in df.columns:
+            # Medians, MADs and ranks have no exact merge across workers:
+            # computed here, in one grouped pass over the combined frame.
+            mode = next(m for m, name in RIG_NORMALIZATION_MODES.items() if name == metric)
+            df = processor.add_rig_normalized_rate(df, copy=False, modes=(mode,))
+        df = processor.classify_with_metric(df, thresholds, metric, copy=False)
+    return compact_dtypes(df), rig_stats, timings
+
+
+def write_output(df, path) -> None:
+    """Write `df` as Feather or Parquet depending on the extension."""
+    path = Path(path)
+    if path.suffix not in OUTPUT_FORMATS:
+        raise ValueError(
+            f"Formato de salida no soportado: {path.suffix!r} (usa {', '.join(OUTPUT_FORMATS)})."
+        )
+    if not PYARROW_AVAILABLE:
+        raise ValueError("Se requiere pyarrow para escribir archivos Feather/Parquet.")
+    df = df.reset_index(drop=True)
+    if path.suffix == ".feather":
+        df.to_feather(path)
+    else:
+        df.to_parquet(path, index=False)
+
+
+def _thresholds(args):
+    return {
+        "duration": dict(zip(("soft", "medium", "hard"), map(float, args.duration))),
+        "rate": dict(zip(("soft", "medium", "hard"), map(float, args.rate))),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("inputs", nargs="+", help="CSV files, directories or glob patterns")
+    parser.add_argument("--metric", choices=sorted(METRIC_COLUMNS), default="duration")
+    parser.add_argument(
+        "--duration", type=float, nargs=3, metavar=("SOFT", "MEDIUM", "HARD"),
+        default=[DEFAULT_THRESHOLDS["duration"][k] for k in ("soft", "medium", "hard")],
+    )
+    parser.add_argument(
+        "--rate", type=float, nargs=3, metavar=("SOFT", "MEDIUM", "HARD"),
+        default=[DEFAULT_THRESHOLDS["rate"][k] for k in ("soft", "medium", "hard")],
+    )
+    parser.add_argument("--workers", type=int, help="worker processes (default: all CPUs)")
+    parser.add_argument("--output", type=Path, required=True, help=".feather or .parquet file")
+    parser.add_argument("--report", type=Path, help="write the per-file timing report as CSV")
+    args = parser.parse_args(argv)
+    # Checked up front: `write_output` only runs after the whole batch.
+    if args.output.suffix not in OUTPUT_FORMATS:
+        parser.error(
+            f"formato de salida no soportado: {args.output.suffix!r} "
+            f"(usa {', '.join(OUTPUT_FORMATS)})"
+        )
+    if not PYARROW_AVAILABLE:
+        parser.error("se requiere pyarrow para escribir archivos Feather/Parquet")
+
+    paths = expand_inputs(args.inputs)
+    if not paths:
+        parser.error("no se encontraron archivos CSV en las entradas indicadas")
+    start = time.perf_counter()
+    df, rig_stats, timings = process_batch(paths, _thresholds(args), args.metric, args.workers)
+
+    report = pd.DataFrame(timings, columns=list(FileTiming.__annotations__))
+    if args.report:
+        report.to_csv(args.report, index=False)
+    print(report.to_string(index=False))
+    failed = int((report["estado"] != "ok").sum())
+    if failed == len(paths):
+        print(f"Ningún archivo se procesó; no se escribe {args.output}.")
+        return 1
+    write_output(df, args.output)
+    print(
+        f"{len(df)} filas de {len(paths) - failed}/{len(paths)} archivos "
+        f"({len(rig_stats)} perforadoras) en {time.perf_counter() - start:.2f} s -> {args.output}"
+    )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
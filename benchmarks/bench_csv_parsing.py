@@ -0,0 +1,67 @@
+"""Compare the legacy full-file fallback with the targeted parser.
+
+Usage::
+
+    python -m benchmarks.bench_csv_parsing --size-mb 500 --bad-lines 5
+
+The legacy path is the pre-`csv_parsing` behaviour: a strict C-engine
+read that, on the first malformed line, re-reads the whole file with
+the python engine. The new path is `read_csv_with_report`.
+"""
+
+import argparse
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+import pandas as pd
+
+from benchmarks.synthetic import write_synthetic_csv
+from csv_parsing import read_csv_with_report
+
+
+def legacy_read(path):
+    try:
+        return pd.read_csv(path)
+    except pd.errors.ParserError:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            return pd.read_csv(path, engine="python", on_bad_lines="warn")
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=float, default=500.0)
+    parser.add_argument("--bad-lines", type=int, default=5)
+    parser.add_argument("--skip-legacy", action="store_true")
+    args = parser.parse_args(argv)
+
+    pd.set_option("future.infer_string", False)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "synthetic.csv"
+        seconds, rows = _timed(
+            lambda: write_synthetic_csv(path, size_mb=args.size_mb, bad_lines=args.bad_lines)
+        )
+        size = path.stat().st_size / 1024 / 1024
+        print(f"generated {size:.0f} MB, {rows} rows, {args.bad_lines} bad lines in {seconds:.1f} s")
+
+        seconds, (df, report) = _timed(lambda: read_csv_with_report(path))
+        print(
+            f"targeted: {seconds:8.2f} s  engine={report['engine']} rows={report['rows']} "
+            f"skipped={report['skipped_lines']}"
+        )
+        if not args.skip_legacy:
+            seconds, legacy = _timed(lambda: legacy_read(path))
+            print(f"legacy:   {seconds:8.2f} s  rows={len(legacy)}")
+            assert len(legacy) == len(df)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Memory footprint of processed frames, default vs compact dtypes.
+
+Usage::
+
+    python -m benchmarks.bench_memory --rows 1000000
+
+Processes one synthetic CSV with `load_and_process` and with
+`load_and_process(..., compact=True)`, then prints the deep
+`memory_usage` per column and in total.
+"""
+
+import argparse
+import logging
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+from benchmarks.synthetic import write_synthetic_csv
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.CRITICAL)
+    from data_processor import DataProcessor
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "synthetic.csv"
+        write_synthetic_csv(path, rows=args.rows)
+        processor = DataProcessor()
+        default = processor.load_and_process(path)
+        compact = processor.load_and_process(path, compact=True)
+
+    usage = pd.DataFrame(
+        {
+            "default_mb": default.memory_usage(deep=True) / 1e6,
+            "compact_mb": compact.memory_usage(deep=True) / 1e6,
+            "compact_dtype": compact.dtypes.astype(str),
+        }
+    )
+    print(usage.round(2).to_string())
+    before, after = usage["default_mb"].sum(), usage["compact_mb"].sum()
+    print(f"\ntotal: {before:.1f} MB -> {after:.1f} MB ({after / before:.0%}) for {args.rows} rows")
+
+
+if __name__ == "__main__":
+    main()
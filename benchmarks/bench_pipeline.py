@@ -0,0 +1,227 @@
+"""Time the ingestion -> classification -> plotting pipeline.
+
+Usage::
+
+    python -m benchmarks.bench_pipeline --rows 10000 100000 1000000 \\
+        --output bench.json
+    python -m benchmarks.bench_pipeline --baseline bench.json --tolerance 0.25
+
+For every size a synthetic CSV is generated (see `benchmarks.synthetic`)
+and each stage is timed: `load_and_process`, `classify_with_metric` for
+every metric, `add_rig_normalized_rate` (mean/std, then the robust and
+percentile modes together), the `HierarchicalNormalizer` over rig ×
+drill pattern, `flag_anomalies` and every `Visualizer.plot_*` builder
+(`plot_threshold_sweep` draws a `threshold_sweep` over `SWEEP_GRID`,
+itself timed as a stage, `plot_trend` draws daily `TrendEngine` trends
+and `plot_rig_utilisation` the per-shift `RigIntervals.utilisation`)
+plus the per-rig `group_summary`. A stage's time is the best of
+`--repeat` runs (`time.perf_counter`); its peak memory comes from one
+extra run under `tracemalloc`. With `--baseline`, stages slower than the
+baseline by more than `--tolerance` are listed and the exit status is 1.
+"""
+
+import argparse
+import json
+import logging
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from benchmarks.synthetic import write_synthetic_csv
+
+DEFAULT_ROWS = (10_000, 100_000, 1_000_000)
+METRICS = (
+    "duration",
+    "penetration_rate",
+    "rig_normalized_penetration",
+    "rig_robust_penetration",
+    "rig_percentile_penetration",
+)
+
+# Candidate duration cutoffs for the sweep stage (24^3 = 13,824 combinations).
+SWEEP_GRID = tuple(tuple(float(v) for v in range(lo, lo + 24)) for lo in (4, 14, 30))
+
+
+def measure(fn, repeat=3, memory=True):
+    """Best wall time of `repeat` calls and peak traced memory of one more.
+
+    Returns:
+        `(seconds, peak_bytes, result)`; `peak_bytes` is `None` when
+        `memory` is false.
+    """
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    peak = None
+    if memory:
+        tracemalloc.start()
+        try:
+            fn()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return best, peak, result
+
+
+def plot_builders():
+    """Names of every `Visualizer.plot_*` builder."""
+    from visualizer import Visualizer
+
+    return sorted(name for name in vars(Visualizer) if name.startswith("plot_"))
+
+
+def run_case(path, rows, repeat=3, memory=True, only=None):
+    """Benchmark every stage on the CSV at `path`; one record per stage."""
+    from classification import DEFAULT_THRESHOLDS
+    from data_processor import DataProcessor
+    from rig_intervals import RigIntervals
+    from time_series import TrendEngine
+    from visualizer import Visualizer
+
+    processor = DataProcessor()
+    records = []
+
+    def record(stage, fn):
+        if only and not any(token in stage for token in only):
+            return fn()
+        seconds, peak, result = measure(fn, repeat, memory)
+        records.append(
+            {
+                "stage": stage,
+                "rows": rows,
+                "seconds": seconds,
+                "rows_per_s": rows / seconds if seconds else None,
+                "peak_mb": None if peak is None else peak / 1e6,
+            }
+        )
+        return result
+
+    df = record("load_and_process", lambda: processor.load_and_process(path))
+    df = record("add_rig_normalized_rate", lambda: processor.add_rig_normalized_rate(df))
+    df = record(
+        "add_rig_normalized_rate[robust+percentile]",
+        lambda: processor.add_rig_normalized_rate(df, modes=("robust", "percentile")),
+    )
+    record(
+        "HierarchicalNormalizer[perforadora,drill_pattern]",
+        lambda: processor.hierarchical_normalizer(df).zscores(),
+    )
+    record("flag_anomalies", lambda: processor.flag_anomalies(df, copy=False))
+    classified = None
+    for metric in METRICS:
+        result = record(
+            f"classify_with_metric[{metric}]",
+            lambda m=metric: processor.classify_with_metric(df, DEFAULT_THRESHOLDS, m),
+        )
+        if metric == "duration":
+            classified = result
+    sweep = record(
+        "threshold_sweep[duration]",
+        lambda: processor.threshold_sweep(df, "duration", *SWEEP_GRID, ordered_only=False),
+    )
+    record(
+        "group_summary[perforadora]",
+        lambda: processor.group_summary(classified, "perforadora", "tasa_penetracion"),
+    )
+    trends = record(
+        "TrendEngine.trends[dia]",
+        lambda: TrendEngine(classified).trends(
+            {"indice_dureza": classified["indice_dureza"]}, "dia"
+        ),
+    )
+    utilisation = record(
+        "RigIntervals.utilisation", lambda: RigIntervals(classified).utilisation()
+    )
+    # Builders that plot something other than the classified frame.
+    special = {
+        "plot_rig_utilisation": lambda: Visualizer.plot_rig_utilisation(utilisation),
+        "plot_threshold_sweep": lambda: Visualizer.plot_threshold_sweep(sweep, "soft", "hard"),
+        "plot_trend": lambda: Visualizer.plot_trend(trends, "indice_dureza"),
+    }
+    for name in plot_builders():
+        builder = getattr(Visualizer, name)
+        record(f"Visualizer.{name}", special.get(name, lambda b=builder: b(classified)))
+    return records
+
+
+def run(rows=DEFAULT_ROWS, rigs=8, patterns=40, nan_rate=0.01, bad_line_rate=0.0,
+        repeat=3, memory=True, only=None, seed=0):
+    """Generate one dataset per size and benchmark it; returns all records."""
+    records = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in rows:
+            path = Path(tmp) / f"synthetic_{n}.csv"
+            write_synthetic_csv(
+                path, rows=n, rigs=rigs, patterns=patterns, seed=seed,
+                nan_rate=nan_rate, bad_line_rate=bad_line_rate,
+            )
+            records.extend(run_case(path, n, repeat=repeat, memory=memory, only=only))
+            path.unlink()
+    return records
+
+
+def regressions(records, baseline, tolerance):
+    """Records slower than their baseline counterpart by over `tolerance`."""
+    reference = {(r["stage"], r["rows"]): r["seconds"] for r in baseline}
+    slower = []
+    for r in records:
+        before = reference.get((r["stage"], r["rows"]))
+        if before and r["seconds"] > before * (1 + tolerance):
+            slower.append({**r, "baseline_seconds": before})
+    return slower
+
+
+def format_table(records):
+    lines = [f"{'stage':55} {'rows':>9} {'seconds':>9} {'rows/s':>12} {'peak MB':>9}"]
+    for r in records:
+        peak = "-" if r["peak_mb"] is None else f"{r['peak_mb']:.1f}"
+        lines.append(
+            f"{r['stage']:55} {r['rows']:>9} {r['seconds']:>9.4f} "
+            f"{r['rows_per_s'] or 0:>12,.0f} {peak:>9}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=list(DEFAULT_ROWS))
+    parser.add_argument("--rigs", type=int, default=8)
+    parser.add_argument("--patterns", type=int, default=40)
+    parser.add_argument("--nan-rate", type=float, default=0.01)
+    parser.add_argument("--bad-line-rate", type=float, default=0.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc run")
+    parser.add_argument("--only", nargs="+", help="benchmark only stages containing these strings")
+    parser.add_argument("--output", type=Path, help="write the records as JSON")
+    parser.add_argument("--baseline", type=Path, help="JSON from a previous --output")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.CRITICAL)
+    records = run(
+        rows=args.rows, rigs=args.rigs, patterns=args.patterns,
+        nan_rate=args.nan_rate, bad_line_rate=args.bad_line_rate,
+        repeat=args.repeat, memory=not args.no_memory, only=args.only,
+    )
+    print(format_table(records))
+    if args.output:
+        args.output.write_text(json.dumps(records, indent=2), encoding="utf-8")
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        slower = regressions(records, baseline, args.tolerance)
+        for r in slower:
+            print(
+                f"REGRESSION {r['stage']} @ {r['rows']}: "
+                f"{r['baseline_seconds']:.4f} s -> {r['seconds']:.4f} s"
+            )
+        if slower:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
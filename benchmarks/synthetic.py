@@ -0,0 +1,118 @@
+"""Synthetic drilling-export generator for the benchmarks.
+
+Produces CSVs with the same header vocabulary as the real rig exports
+(`tiempo inicio`, `tiempo final`, coordinates, `drill_pattern`,
+`perforadora`, `prof. por operador`, `material_operator`) and can inject
+malformed lines so the parser recovery paths get exercised.
+"""
+
+import numpy as np
+import pandas as pd
+
+HEADER = [
+    "tiempo inicio",
+    "tiempo final",
+    "este",
+    "norte",
+    "elevacion",
+    "drill_pattern",
+    "perforadora",
+    "pozo",
+    "prof. por operador",
+    "material_operator",
+]
+
+# Rough size of one generated line, used to turn a MB target into rows.
+APPROX_BYTES_PER_ROW = 95
+
+
+# Columns blanked at random by `nan_rate` (a missing `tiempo final`
+# yields a NaN `duracion`, a missing depth a NaN penetration rate).
+NAN_COLUMNS = ("tiempo final", "este", "norte", "elevacion", "prof. por operador")
+
+
+def synthetic_frame(rows, rigs=8, patterns=40, seed=0, start="2024-01-01", nan_rate=0.0):
+    """Random drilling rows with the raw (unprocessed) export schema.
+
+    `nan_rate` is the probability that each cell of `NAN_COLUMNS` is
+    left empty.
+    """
+    rng = np.random.default_rng(seed)
+    starts = pd.Timestamp(start) + pd.to_timedelta(
+        np.sort(rng.integers(0, 365 * 24 * 60, size=rows)), unit="min"
+    )
+    durations = pd.to_timedelta(rng.gamma(4.0, 6.0, size=rows).round(1), unit="min")
+    fmt = "%Y/%m/%d %H:%M:%S"
+    frame = pd.DataFrame(
+        {
+            "tiempo inicio": starts.strftime(fmt),
+            "tiempo final": (starts + durations).strftime(fmt),
+            "este": rng.uniform(0.0, 5_000.0, size=rows).round(3),
+            "norte": rng.uniform(0.0, 5_000.0, size=rows).round(3),
+            "elevacion": rng.uniform(2_500.0, 3_200.0, size=rows).round(2),
+            "drill_pattern": rng.integers(0, patterns, size=rows).astype(str),
+            "perforadora": rng.integers(0, rigs, size=rows).astype(str),
+            "pozo": np.arange(rows).astype(str),
+            "prof. por operador": rng.uniform(10.0, 18.0, size=rows).round(2),
+            "material_operator": rng.choice(
+                ["mineral", "lastre", "oxido", "sulfuro"], size=rows
+            ),
+        },
+        columns=HEADER,
+    ).assign(
+        drill_pattern=lambda d: "PW" + d["drill_pattern"],
+        perforadora=lambda d: "PF" + d["perforadora"],
+        pozo=lambda d: "P" + d["pozo"],
+    )
+    if nan_rate:
+        for column in NAN_COLUMNS:
+            frame.loc[rng.random(rows) < nan_rate, column] = np.nan
+    return frame
+
+
+def write_synthetic_csv(
+    path,
+    rows=None,
+    size_mb=None,
+    bad_lines=0,
+    rigs=8,
+    patterns=40,
+    seed=0,
+    chunk_rows=500_000,
+    nan_rate=0.0,
+    bad_line_rate=None,
+):
+    """Write a synthetic export to `path`, chunk by chunk.
+
+    Exactly one of `rows` / `size_mb` should be given. `bad_lines`
+    malformed rows (one extra field) are spread evenly over the file;
+    `bad_line_rate`, when given, overrides it as a share of `rows`.
+    `nan_rate` is forwarded to `synthetic_frame`.
+
+    Returns:
+        The number of well-formed data rows written.
+    """
+    if rows is None:
+        rows = int(size_mb * 1024 * 1024 / APPROX_BYTES_PER_ROW)
+    if bad_line_rate is not None:
+        bad_lines = int(round(rows * bad_line_rate))
+    # Never the first data row: an extra field there turns the first
+    # column into the index for every pandas engine.
+    bad_positions = set(np.linspace(1, rows - 1, bad_lines, dtype=int).tolist()) if bad_lines else set()
+    written = 0
+    with open(path, "w", encoding="utf-8", newline="") as fh:
+        fh.write(",".join(HEADER) + "\n")
+        for offset in range(0, rows, chunk_rows):
+            n = min(chunk_rows, rows - offset)
+            frame = synthetic_frame(
+                n, rigs=rigs, patterns=patterns, seed=seed + offset, nan_rate=nan_rate
+            )
+            text = frame.to_csv(header=False, index=False, lineterminator="\n")
+            if bad_positions:
+                lines = text.split("\n")
+                for position in sorted(p - offset for p in bad_positions if offset <= p < offset + n):
+                    lines[position] += ",campo_extra"
+                text = "\n".join(lines)
+            fh.write(text)
+            written += n
+    return written - len(bad_positions)
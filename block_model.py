@@ -0,0 +1,248 @@
+"""Inverse-distance-weighted block model of `indice_dureza`.
+
+Mine planning works on a regular 3-D grid of blocks, while the hardness
+index is measured at scattered holes (`este` / `norte` / `elevacion`).
+`interpolate_idw` estimates every block centre from the holes within a
+search radius, keeping at most `max_neighbours` of the closest ones and
+weighting each by `1 / distance ** power`.
+
+Blocks are processed in chunks of `chunk_size` flat block ids: a chunk
+generates its own centres, asks the `SpatialIndex` for all (block, hole)
+pairs inside the radius in one vectorized call and reduces them with
+`np.bincount`. Memory therefore depends on the chunk size and the hole
+density, not on the grid size, and a 10M-block grid is just more chunks
+(optionally spread over a process pool).
+
+The result is a float32 array of shape `(nz, ny, nx)` (level, norte,
+este) that `save_block_model` writes as a compressed `.npz` together
+with the grid definition.
+"""
+
+import math
+from concurrent.futures import ProcessPoolExecutor
+from typing import TypedDict
+
+import numpy as np
+
+from spatial_index import MAX_INDEX_CELLS, SpatialIndex
+
+# Blocks per chunk; with ~100 candidate holes per block this keeps each
+# chunk's pair arrays around 100 MB.
+DEFAULT_CHUNK_BLOCKS = 50_000
+
+DEFAULT_MAX_NEIGHBOURS = 16
+DEFAULT_IDW_POWER = 2.0
+
+# Refuse grids larger than this many blocks (a block size typo would
+# otherwise allocate gigabytes for the output array).
+MAX_BLOCKS = 200_000_000
+
+
+class BlockGrid(TypedDict):
+    """Regular block grid definition.
+
+    `origin` is the lower corner `(x, y, z)` of block `(0, 0, 0)`,
+    `block_size` the block extent along each axis and `shape` the block
+    counts `(nx, ny, nz)`. Flat block ids run `x` fastest, then `y`,
+    then `z`, matching a `(nz, ny, nx)` array.
+    """
+
+    origin: tuple
+    block_size: tuple
+    shape: tuple
+
+
+def block_grid(x, y, z, block_size) -> BlockGrid:
+    """Grid of `block_size` blocks covering every finite hole position.
+
+    Block edges are aligned to multiples of the block size, so grids
+    built from different subsets of the same mine line up.
+    """
+    block_size = tuple(float(s) for s in block_size)
+    if len(block_size) != 3 or not all(s > 0 for s in block_size):
+        raise ValueError("block_size debe tener tres dimensiones positivas (x, y, z).")
+    coords = [np.asarray(c, dtype=float) for c in (x, y, z)]
+    finite = np.isfinite(coords[0]) & np.isfinite(coords[1]) & np.isfinite(coords[2])
+    if not finite.any():
+        raise ValueError("No hay pozos con coordenadas válidas para definir la grilla de bloques.")
+    origin, shape = [], []
+    for values, size in zip(coords, block_size):
+        values = values[finite]
+        low = math.floor(values.min() / size) * size
+        origin.append(low)
+        shape.append(int((values.max() - low) // size) + 1)
+    grid = BlockGrid(origin=tuple(origin), block_size=block_size, shape=tuple(shape))
+    _check_size(grid)
+    return grid
+
+
+def _check_size(grid):
+    total = math.prod(grid["shape"])
+    if total > MAX_BLOCKS:
+        raise ValueError(
+            f"La grilla de bloques ({'x'.join(map(str, grid['shape']))}) supera "
+            f"{MAX_BLOCKS} bloques; aumenta block_size."
+        )
+    return total
+
+
+def block_centers(grid, start, stop):
+    """Centre coordinates `(x, y, z)` of the flat block ids `start:stop`."""
+    nx, ny, _ = grid["shape"]
+    ids = np.arange(start, stop, dtype=np.int64)
+    ix = ids % nx
+    iy = (ids // nx) % ny
+    iz = ids // (nx * ny)
+    return tuple(
+        origin + (index + 0.5) * size
+        for origin, size, index in zip(grid["origin"], grid["block_size"], (ix, iy, iz))
+    )
+
+
+def _idw_chunk(index, values, grid, start, stop, radius, max_neighbours, power):
+    """IDW estimates for the flat block ids `start:stop` (float32)."""
+    bx, by, bz = block_centers(grid, start, stop)
+    n = stop - start
+    queries, rows, distances = index.pairs_within_radius(bx, by, radius, qz=bz)
+    result = np.full(n, np.nan, dtype=np.float32)
+    if len(queries) == 0:
+        return result
+
+    # Pairs come sorted by (block, distance): keep each block's first
+    # `max_neighbours`.
+    first = np.flatnonzero(np.r_[True, queries[1:] != queries[:-1]])
+    counts = np.diff(np.r_[first, len(queries)])
+    rank = np.arange(len(queries)) - np.repeat(first, counts)
+    keep = rank < max_neighbours
+    queries, rows, distances = queries[keep], rows[keep], distances[keep]
+    hole_values = values[rows]
+
+    # A hole exactly at the block centre takes over the estimate.
+    exact = distances == 0
+    with np.errstate(divide="ignore"):
+        weights = np.where(exact, 0.0, 1.0 / distances**power)
+    weight_sum = np.bincount(queries, weights=weights, minlength=n)
+    weighted = np.bincount(queries, weights=weights * hole_values, minlength=n)
+    estimated = weight_sum > 0
+    result[estimated] = weighted[estimated] / weight_sum[estimated]
+    if exact.any():
+        exact_count = np.bincount(queries[exact], minlength=n)
+        exact_sum = np.bincount(queries[exact], weights=hole_values[exact], minlength=n)
+        hit = exact_count > 0
+        result[hit] = exact_sum[hit] / exact_count[hit]
+    return result
+
+
+# Per-process state of the pool workers (set once by `_init_worker`, so
+# the index is pickled once per worker instead of once per chunk).
+_WORKER_STATE = {}
+
+
+def _init_worker(index, values, grid, radius, max_neighbours, power):
+    _WORKER_STATE.update(
+        index=index, values=values, grid=grid, radius=radius,
+        max_neighbours=max_neighbours, power=power,
+    )
+
+
+def _worker_chunk(bounds):
+    state = _WORKER_STATE
+    return _idw_chunk(
+        state["index"], state["values"], state["grid"], bounds[0], bounds[1],
+        state["radius"], state["max_neighbours"], state["power"],
+    )
+
+
+def interpolate_idw(
+    df,
+    grid,
+    radius,
+    max_neighbours=DEFAULT_MAX_NEIGHBOURS,
+    power=DEFAULT_IDW_POWER,
+    value="indice_dureza",
+    chunk_size=DEFAULT_CHUNK_BLOCKS,
+    workers=None,
+):
+    """Estimate `value` at every block centre by inverse distance weighting.
+
+    Args:
+        df: Processed DataFrame with `este`, `norte`, `elevacion` and
+            the `value` column. Holes with a missing coordinate or value
+            are ignored.
+        grid: `BlockGrid` to fill (see `block_grid`).
+        radius: 3-D search radius in coordinate units.
+        max_neighbours: Closest holes used per block.
+        power: Distance exponent of the weights.
+        value: Column to interpolate.
+        chunk_size: Blocks evaluated per vectorized step; bounds memory.
+        workers: Number of worker processes; `None` or 1 runs in
+            process.
+
+    Returns:
+        float32 array of shape `(nz, ny, nx)`, NaN for blocks without a
+        hole inside the radius.
+    """
+    if not radius > 0:
+        raise ValueError("El radio de búsqueda debe ser positivo.")
+    if max_neighbours < 1:
+        raise ValueError("max_neighbours debe ser al menos 1.")
+    if chunk_size < 1:
+        raise ValueError("chunk_size debe ser al menos 1.")
+    total = _check_size(grid)
+    x = df["este"].to_numpy(dtype=float, na_value=np.nan)
+    y = df["norte"].to_numpy(dtype=float, na_value=np.nan)
+    z = df["elevacion"].to_numpy(dtype=float, na_value=np.nan)
+    v = df[value].to_numpy(dtype=float, na_value=np.nan)
+    usable = np.isfinite(x) & np.isfinite(y) & np.isfinite(z) & np.isfinite(v)
+    x, y, z, v = x[usable], y[usable], z[usable], v[usable]
+
+    # Cells of about one radius make every query a 3x3 window; widen
+    # them when the extent would need more cells than the index allows.
+    cell_size = radius
+    if len(x):
+        area = max(np.ptp(x), 1e-9) * max(np.ptp(y), 1e-9)
+        cell_size = max(radius, math.sqrt(area / MAX_INDEX_CELLS) * 1.01)
+    index = SpatialIndex(x, y, z, cell_size=cell_size)
+
+    bounds = [(start, min(start + chunk_size, total)) for start in range(0, total, chunk_size)]
+    if workers is not None and workers > 1 and len(bounds) > 1:
+        initargs = (index, v, grid, radius, max_neighbours, power)
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=initargs) as pool:
+            pieces = list(pool.map(_worker_chunk, bounds))
+    else:
+        pieces = [
+            _idw_chunk(index, v, grid, start, stop, radius, max_neighbours, power)
+            for start, stop in bounds
+        ]
+    nx, ny, nz = grid["shape"]
+    if not pieces:
+        return np.zeros((nz, ny, nx), dtype=np.float32)
+    return np.concatenate(pieces).reshape(nz, ny, nx)
+
+
+def save_block_model(path, grid, values):
+    """Write a block model as a compressed `.npz` (float32 values + grid)."""
+    values = np.asarray(values, dtype=np.float32)
+    nx, ny, nz = grid["shape"]
+    if values.shape != (nz, ny, nx):
+        raise ValueError(
+            f"La forma de los valores {values.shape} no coincide con la grilla {(nz, ny, nx)}."
+        )
+    np.savez_compressed(
+        path,
+        values=values,
+        origin=np.asarray(grid["origin"], dtype=float),
+        block_size=np.asarray(grid["block_size"], dtype=float),
+        shape=np.asarray(grid["shape"], dtype=np.int64),
+    )
+
+
+def load_block_model(path):
+    """Read a file written by `save_block_model` as `(grid, values)`."""
+    with np.load(path) as data:
+        grid = BlockGrid(
+            origin=tuple(float(v) for v in data["origin"]),
+            block_size=tuple(float(v) for v in data["block_size"]),
+            shape=tuple(int(v) for v in data["shape"]),
+        )
+        return grid, data["values"]
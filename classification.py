@@ -14,6 +14,20 @@ The contracts exported here are the canonical parity surface:
     - `hardness_index_with_metric(value, thresholds, metric) -> float | None`.
     - `rig_mean_penetration(rates: list[float]) -> float | None`.
     - `rig_normalized_penetration(rate, rig_avg, rig_std) -> float`.
+    - `rig_median_penetration(rates) -> float | None` and
+      `rig_mad_penetration(rates) -> float | None`.
+    - `rig_robust_normalized_penetration(rate, rig_median, rig_mad) -> float`.
+    - `rig_percentile_rank(rate, rig_rates) -> float | None`.
+
+Vectorized counterparts (`penetration_rate_array`, `classify_codes`,
+`classify_array`, `labels_from_codes`, `hardness_index_array`,
+`rig_normalized_penetration_array`,
+`rig_robust_normalized_penetration_array`) accept array-likes and return NumPy arrays so
+the pandas adapter can classify a whole column in one call. They are a
+Python-only performance layer: each one evaluates the same comparisons
+and the same floating-point expressions as its scalar twin, so results
+are identical element for element (including boundaries and NaN).
+NumPy is the only third-party import allowed here.
 
 The legacy helpers `classify_duracion` and `hardness_index` are kept
 unchanged so existing callers (tests, fixtures, downstream UI) keep
@@ -27,6 +41,8 @@ from typing import Literal, TypedDict
 
 import math
 
+import numpy as np
+
 
 class MetricThresholds(TypedDict):
     """Three-cutoff threshold set for a single metric.
@@ -52,7 +68,24 @@ class Thresholds(TypedDict):
     rate: MetricThresholds
 
 
-Metric = Literal["duration", "penetration_rate", "rig_normalized_penetration"]
+Metric = Literal[
+    "duration",
+    "penetration_rate",
+    "rig_normalized_penetration",
+    "rig_robust_penetration",
+    "rig_percentile_penetration",
+]
+
+# Metrics classified with the `rate` cutoffs (higher = softer): the raw
+# rate and its three per-rig normalizations (mean/std z-score,
+# median/MAD robust z-score, within-rig percentile rank in [0, 1]).
+RATE_METRICS: tuple = (
+    "penetration_rate",
+    "rig_normalized_penetration",
+    "rig_robust_penetration",
+    "rig_percentile_penetration",
+)
+METRICS: tuple = ("duration",) + RATE_METRICS
 
 
 # Default thresholds — preserve pre-change behaviour for the duration metric.
@@ -80,11 +113,26 @@ DURATION_INDEX_UPPER_SATURATION: float = 60.0
 # threshold). Rate values above this saturate at index 0 (softest rock).
 RATE_INDEX_UPPER_SATURATION: float = 2.0
 
+# Hardness categories ordered from softest to hardest. The vectorized
+# helpers return integer codes that index into this tuple; `-1` marks a
+# missing (`None`) input.
+HARDNESS_LABELS: tuple = (
+    "roca suave",
+    "roca media",
+    "roca dura",
+    "roca muy dura",
+)
+MISSING_CODE: int = -1
+
 # Epsilon used to guard against zero-variance rigs in z-score
 # normalization. Matches the 1e-9 boundary asserted by the parity
 # fixture.
 STD_EPSILON: float = 1e-9
 
+# MAD -> standard deviation for normally distributed values, so robust
+# z-scores are on the same scale as the mean/std ones.
+MAD_SCALE: float = 1.4826
+
 
 def classify_duracion(minutos):
     """Classify hardness category from a duration value (legacy helper).
@@ -155,15 +203,15 @@ def classify_with_metric(value, thresholds, metric):
     Duration metric uses strict `<` boundaries — exact cutoffs fall into
     the harder bucket (e.g. `T == 16` returns `"roca media"`). Rate and
     rig-normalized-penetration metrics are reversed because higher rate
-    means softer rock; exact cutoffs also fall into the harder bucket
+    means softer rock (the same holds for the robust z-score and the
+    percentile rank); exact cutoffs also fall into the harder bucket
     (e.g. `rate == 1.0` with defaults returns `"roca media"`).
 
     Args:
         value: Numeric value to classify. `None` propagates as `None`.
         thresholds: A `Thresholds` TypedDict (both `duration` and `rate`
             sub-dicts must be present).
-        metric: One of `"duration"`, `"penetration_rate"`, or
-            `"rig_normalized_penetration"`.
+        metric: One of the `METRICS` names.
 
     Returns:
         The hardness category as one of `"roca suave"`, `"roca media"`,
@@ -171,7 +219,7 @@ def classify_with_metric(value, thresholds, metric):
         not classifiable.
 
     Raises:
-        ValueError: When `metric` is not one of the three supported
+        ValueError: When `metric` is not one of the supported
             values. Surfacing this here keeps the function honest about
             its contract without swallowing programmer errors.
     """
@@ -188,7 +236,7 @@ def classify_with_metric(value, thresholds, metric):
         if value < hard:
             return "roca dura"
         return "roca muy dura"
-    if metric in ("penetration_rate", "rig_normalized_penetration"):
+    if metric in RATE_METRICS:
         soft = thresholds["rate"]["soft"]
         medium = thresholds["rate"]["medium"]
         hard = thresholds["rate"]["hard"]
@@ -201,7 +249,7 @@ def classify_with_metric(value, thresholds, metric):
         return "roca muy dura"
     raise ValueError(
         f"Unknown metric {metric!r}; expected one of "
-        "'duration', 'penetration_rate', 'rig_normalized_penetration'."
+        + ", ".join(repr(m) for m in METRICS) + "."
     )
 
 
@@ -221,7 +269,7 @@ def hardness_index_with_metric(value, thresholds, metric):
     Args:
         value: Numeric value to map. `None` propagates as `None`.
         thresholds: A `Thresholds` TypedDict.
-        metric: One of the three `Metric` literals.
+        metric: One of the `Metric` literals.
 
     Returns:
         A `float` in `[0, 100]` or `None` when the value is not
@@ -250,7 +298,7 @@ def hardness_index_with_metric(value, thresholds, metric):
                 / (DURATION_INDEX_UPPER_SATURATION - hard)
             )
         return 100.0
-    if metric in ("penetration_rate", "rig_normalized_penetration"):
+    if metric in RATE_METRICS:
         soft = thresholds["rate"]["soft"]
         medium = thresholds["rate"]["medium"]
         hard = thresholds["rate"]["hard"]
@@ -270,7 +318,7 @@ def hardness_index_with_metric(value, thresholds, metric):
         return 75.0 + 25.0 * (hard - value) / hard
     raise ValueError(
         f"Unknown metric {metric!r}; expected one of "
-        "'duration', 'penetration_rate', 'rig_normalized_penetration'."
+        + ", ".join(repr(m) for m in METRICS) + "."
     )
 
 
@@ -327,4 +375,359 @@ def rig_normalized_penetration(rate, rig_avg, rig_std):
         return 0.0
     if not math.isfinite(rig_avg) or not math.isfinite(rig_std):
         return 0.0
-    return (rate - rig_avg) / rig_std
\ No newline at end of file
+    return (rate - rig_avg) / rig_std
+
+
+def _finite_rates(rates):
+    """Sorted finite entries of `rates` (`None` and NaN/inf skipped)."""
+    return sorted(r for r in rates if r is not None and math.isfinite(r))
+
+
+def _sorted_median(values):
+    """Median of a non-empty sorted list: mean of the middle pair."""
+    count = len(values)
+    return (values[(count - 1) // 2] + values[count // 2]) / 2.0
+
+
+def rig_median_penetration(rates):
+    """Median of a rig's finite penetration rates.
+
+    Skips `None` and non-finite entries like `rig_mean_penetration`.
+    An even count averages the two middle values.
+
+    Args:
+        rates: Iterable of numeric rate values.
+
+    Returns:
+        The median as a float, or `None` when no finite value is present.
+    """
+    values = _finite_rates(rates or [])
+    if not values:
+        return None
+    return _sorted_median(values)
+
+
+def rig_mad_penetration(rates):
+    """Median absolute deviation of a rig's finite penetration rates.
+
+    Unscaled: the median of `|rate - median|`. Multiply by `MAD_SCALE`
+    to compare it with a standard deviation.
+
+    Args:
+        rates: Iterable of numeric rate values.
+
+    Returns:
+        The MAD as a float, or `None` when no finite value is present.
+    """
+    values = _finite_rates(rates or [])
+    if not values:
+        return None
+    median = _sorted_median(values)
+    return _sorted_median(sorted(abs(v - median) for v in values))
+
+
+def rig_robust_normalized_penetration(rate, rig_median, rig_mad):
+    """Robust z-score of a rate against a rig's median and MAD.
+
+    `(rate - median) / (MAD_SCALE * mad)`: one broken hole barely moves
+    the median or the MAD, unlike the mean and std behind
+    `rig_normalized_penetration`. Same guards as that function: `0.0`
+    for `None` or non-finite inputs and when the scaled MAD is at or
+    below `STD_EPSILON` (more than half the rig's rates are equal).
+
+    Args:
+        rate: A penetration rate in m/min.
+        rig_median: The rig's median penetration rate.
+        rig_mad: The rig's (unscaled) median absolute deviation.
+
+    Returns:
+        The robust z-score as a float.
+    """
+    if rate is None or rig_median is None or rig_mad is None:
+        return 0.0
+    if not math.isfinite(rate):
+        return 0.0
+    if not math.isfinite(rig_median) or not math.isfinite(rig_mad):
+        return 0.0
+    scale = MAD_SCALE * rig_mad
+    if scale <= STD_EPSILON:
+        return 0.0
+    return (rate - rig_median) / scale
+
+
+def rig_percentile_rank(rate, rig_rates):
+    """Share of a rig's finite rates below `rate`, ties counting half.
+
+    The mid-rank percentile `(below + 0.5 * equal) / count` in
+    `[0, 1]`: the rig's slowest hole scores near 0, its median hole
+    0.5. Unlike the z-scores, a missing rate stays missing.
+
+    Args:
+        rate: A penetration rate in m/min.
+        rig_rates: Iterable of the rig's rates (`None` and non-finite
+            entries are skipped).
+
+    Returns:
+        The percentile rank as a float, or `None` when `rate` is `None`
+        or non-finite, or the rig has no finite rate.
+    """
+    if rate is None or not math.isfinite(rate):
+        return None
+    values = _finite_rates(rig_rates or [])
+    if not values:
+        return None
+    below = sum(1 for v in values if v < rate)
+    equal = sum(1 for v in values if v == rate)
+    return (below + 0.5 * equal) / len(values)
+
+
+# ---------------------------------------------------------------------------
+# Vectorized helpers (Python-only; mirror the scalar contracts above).
+# ---------------------------------------------------------------------------
+
+# `HARDNESS_LABELS` plus a trailing `None` so `MISSING_CODE` (-1) maps
+# to `None` through plain fancy indexing.
+_LABEL_LOOKUP = np.array(HARDNESS_LABELS + (None,), dtype=object)
+
+
+def _as_float_array(values):
+    """Return `(float64 array, missing mask)` for an array-like input.
+
+    `None` entries (only possible in object arrays) are reported in the
+    mask and stored as `NaN` so the scalar `None -> None` contract can
+    be restored by the caller.
+    """
+    arr = np.asarray(values)
+    if arr.dtype == object:
+        missing = np.equal(arr, None)
+        arr = np.where(missing, np.nan, arr).astype(np.float64)
+    else:
+        missing = np.zeros(arr.shape, dtype=bool)
+        arr = arr.astype(np.float64, copy=False)
+    return arr, missing
+
+
+def _metric_cutoffs(thresholds, metric):
+    """Return `(soft, medium, hard)` for `metric` or raise `ValueError`."""
+    if metric == "duration":
+        cutoffs = thresholds["duration"]
+    elif metric in RATE_METRICS:
+        cutoffs = thresholds["rate"]
+    else:
+        raise ValueError(
+            f"Unknown metric {metric!r}; expected one of "
+            + ", ".join(repr(m) for m in METRICS) + "."
+        )
+    return (
+        float(cutoffs["soft"]),
+        float(cutoffs["medium"]),
+        float(cutoffs["hard"]),
+    )
+
+
+def penetration_rate_array(depth_m, duration_min):
+    """Vectorized `penetration_rate`.
+
+    Cells the scalar function maps to `None` (non-finite depth or
+    duration, non-positive duration) become `NaN`.
+
+    Args:
+        depth_m: Array-like of drilled depths in meters.
+        duration_min: Array-like of durations in minutes.
+
+    Returns:
+        A `float64` `np.ndarray` of rates in m/min.
+    """
+    depth, _ = _as_float_array(depth_m)
+    duration, _ = _as_float_array(duration_min)
+    usable = np.isfinite(depth) & np.isfinite(duration) & (duration > 0)
+    rate = np.full(np.broadcast(depth, duration).shape, np.nan)
+    np.divide(depth, duration, out=rate, where=usable)
+    return rate
+
+
+def classify_codes(values, thresholds, metric):
+    """Vectorized `classify_with_metric` returning `int8` category codes.
+
+    Codes index into `HARDNESS_LABELS`; `None` inputs map to
+    `MISSING_CODE`. The buckets are assigned hardest-first so the
+    softest matching bucket wins, which reproduces the first-match
+    `if` chain of the scalar function even when the slider thresholds
+    are not monotonic. `NaN` fails every comparison and therefore lands
+    in `"roca muy dura"`, exactly like the scalar path.
+
+    Args:
+        values: Array-like of numeric values.
+        thresholds: A `Thresholds` TypedDict.
+        metric: One of the `Metric` literals.
+
+    Returns:
+        An `np.ndarray` of `int8` codes with the shape of `values`.
+
+    Raises:
+        ValueError: When `metric` is not supported.
+    """
+    soft, medium, hard = _metric_cutoffs(thresholds, metric)
+    arr, missing = _as_float_array(values)
+    codes = np.full(arr.shape, 3, dtype=np.int8)
+    if metric == "duration":
+        codes[arr < hard] = 2
+        codes[arr < medium] = 1
+        codes[arr < soft] = 0
+    else:
+        codes[arr > hard] = 2
+        codes[arr > medium] = 1
+        codes[arr > soft] = 0
+    codes[missing] = MISSING_CODE
+    return codes
+
+
+def classify_array(values, thresholds, metric):
+    """Vectorized `classify_with_metric` returning category labels.
+
+    Args:
+        values: Array-like of numeric values.
+        thresholds: A `Thresholds` TypedDict.
+        metric: One of the `Metric` literals.
+
+    Returns:
+        An object `np.ndarray` holding the same strings (or `None`) the
+        scalar function returns for each element.
+
+    Raises:
+        ValueError: When `metric` is not supported.
+    """
+    return labels_from_codes(classify_codes(values, thresholds, metric))
+
+
+def labels_from_codes(codes):
+    """Map `classify_codes` output back to category labels (or `None`)."""
+    return _LABEL_LOOKUP[np.asarray(codes)]
+
+
+def hardness_index_array(values, thresholds, metric):
+    """Vectorized `hardness_index_with_metric`.
+
+    Every segment formula is evaluated with the same expression as the
+    scalar function and selected with `np.select` using the scalar
+    branch order, so outputs are bit-identical. `None` inputs become
+    `NaN`, which is how pandas stores the scalar `None` in a float
+    column.
+
+    Args:
+        values: Array-like of numeric values.
+        thresholds: A `Thresholds` TypedDict.
+        metric: One of the `Metric` literals.
+
+    Returns:
+        A `float64` `np.ndarray` with the shape of `values`.
+
+    Raises:
+        ValueError: When `metric` is not supported.
+    """
+    soft, medium, hard = _metric_cutoffs(thresholds, metric)
+    value, missing = _as_float_array(values)
+    # Segments not selected for an element may divide by zero when the
+    # sliders collapse two cutoffs; those lanes are discarded by
+    # `np.select`, so the warnings are noise.
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if metric == "duration":
+            upper = DURATION_INDEX_UPPER_SATURATION
+            conditions = [
+                value <= 0,
+                value <= soft,
+                value <= medium,
+                value <= hard,
+                value <= upper,
+            ]
+            choices = [
+                0.0,
+                25.0 * (value / soft),
+                25.0 + 25.0 * ((value - soft) / (medium - soft)),
+                50.0 + 25.0 * ((value - medium) / (hard - medium)),
+                75.0 + 25.0 * ((value - hard) / (upper - hard)),
+            ]
+            index = np.select(conditions, choices, default=100.0)
+        else:
+            upper = RATE_INDEX_UPPER_SATURATION
+            conditions = [
+                value > upper,
+                value > soft,
+                value > medium,
+                value > hard,
+            ]
+            choices = [
+                0.0,
+                25.0 * (upper - value) / (upper - soft),
+                25.0 + 25.0 * (soft - value) / (soft - medium),
+                50.0 + 25.0 * (medium - value) / (medium - hard),
+            ]
+            index = np.select(
+                conditions,
+                choices,
+                default=75.0 + 25.0 * (hard - value) / hard,
+            )
+    index[missing] = np.nan
+    return index
+
+
+def rig_normalized_penetration_array(rate, rig_avg, rig_std):
+    """Vectorized `rig_normalized_penetration`.
+
+    Inputs broadcast against each other, so per-row rates can be paired
+    with per-row (gathered) rig statistics. Every lane the scalar
+    function maps to `0.0` — non-finite rate, mean or std, or
+    `std <= STD_EPSILON` — is `0.0` here too.
+
+    Args:
+        rate: Array-like of penetration rates in m/min.
+        rig_avg: Array-like of rig means aligned with `rate`.
+        rig_std: Array-like of rig standard deviations aligned with `rate`.
+
+    Returns:
+        A `float64` `np.ndarray` of z-scores.
+    """
+    rate, _ = _as_float_array(rate)
+    avg, _ = _as_float_array(rig_avg)
+    std, _ = _as_float_array(rig_std)
+    usable = (
+        np.isfinite(rate)
+        & np.isfinite(avg)
+        & np.isfinite(std)
+        & (std > STD_EPSILON)
+    )
+    z = np.zeros(usable.shape)
+    with np.errstate(invalid="ignore"):
+        np.divide(rate - avg, std, out=z, where=usable)
+    return z
+
+
+def rig_robust_normalized_penetration_array(rate, rig_median, rig_mad):
+    """Vectorized `rig_robust_normalized_penetration`.
+
+    Inputs broadcast against each other like
+    `rig_normalized_penetration_array`; every lane the scalar function
+    maps to `0.0` is `0.0` here too.
+
+    Args:
+        rate: Array-like of penetration rates in m/min.
+        rig_median: Array-like of rig medians aligned with `rate`.
+        rig_mad: Array-like of (unscaled) rig MADs aligned with `rate`.
+
+    Returns:
+        A `float64` `np.ndarray` of robust z-scores.
+    """
+    rate, _ = _as_float_array(rate)
+    median, _ = _as_float_array(rig_median)
+    mad, _ = _as_float_array(rig_mad)
+    scale = MAD_SCALE * mad
+    usable = (
+        np.isfinite(rate)
+        & np.isfinite(median)
+        & np.isfinite(mad)
+        & (scale > STD_EPSILON)
+    )
+    z = np.zeros(usable.shape)
+    with np.errstate(invalid="ignore"):
+        np.divide(rate - median, scale, out=z, where=usable)
+    return z
@@ -0,0 +1,243 @@
+"""Classify-once cache for the Streamlit rerun loop.
+
+Every widget interaction reruns `streamlit_app.main`. Reclassifying the
+whole dataset on each rerun is wasted work when only a plot checkbox or
+a filter changed, so this module memoizes the full-dataset
+classification arrays keyed on `(dataset fingerprint, thresholds,
+metric)` and builds filtered views by boolean-mask indexing into them.
+Per-group summary tables (`group_summary`) are memoized as well, keyed
+additionally on the filter mask, so redrawing the per-rig charts after
+an unrelated widget change is a dictionary lookup.
+
+Only compact arrays are cached — `int8` category codes and the float
+`indice_dureza` — never DataFrames, so an entry costs ~9 bytes per row.
+The processed DataFrame itself is never mutated.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from classification import Metric, Thresholds, labels_from_codes
+from data_processor import DataProcessor, hardness_categorical
+from group_summary import group_summary
+
+# Default number of (dataset, thresholds, metric) combinations kept.
+DEFAULT_MAX_ENTRIES = 16
+
+# Default number of summary tables kept (they are a few rows each).
+DEFAULT_MAX_SUMMARIES = 64
+
+
+def dataset_fingerprint(df: pd.DataFrame) -> str:
+    """Content hash of a DataFrame (values, index and column names).
+
+    Computed once per processed dataset (it is O(rows)) and passed to
+    `ClassificationCache` so reruns only pay for a dictionary lookup.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update("\x1f".join(map(str, df.columns)).encode("utf-8"))
+    row_hashes = pd.util.hash_pandas_object(df, index=True).to_numpy()
+    digest.update(row_hashes.tobytes())
+    return digest.hexdigest()
+
+
+def thresholds_key(thresholds: Thresholds, metric: Metric) -> tuple:
+    """Hashable key for the cutoffs that affect `metric`.
+
+    Only the sub-dict the metric reads participates, so moving a rate
+    slider does not invalidate cached duration classifications.
+    """
+    group = "duration" if metric == "duration" else "rate"
+    cutoffs = thresholds[group]
+    return (
+        metric,
+        float(cutoffs["soft"]),
+        float(cutoffs["medium"]),
+        float(cutoffs["hard"]),
+    )
+
+
+def mask_key(mask) -> str | None:
+    """Digest of a boolean row mask (`None` for every row)."""
+    if mask is None:
+        return None
+    packed = np.packbits(np.asarray(mask, dtype=bool))
+    return hashlib.blake2b(packed.tobytes(), digest_size=16).hexdigest()
+
+
+def _remember(entries: OrderedDict, key, value, max_entries: int) -> None:
+    entries[key] = value
+    entries.move_to_end(key)
+    while len(entries) > max_entries:
+        entries.popitem(last=False)
+
+
+class ClassificationCache:
+    """Thread-safe LRU cache of full-dataset classification arrays.
+
+    A single instance can be shared across Streamlit sessions (via
+    `st.cache_resource`): entries are immutable arrays and the LRU
+    bookkeeping is guarded by a lock.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        processor=None,
+        max_summaries: int = DEFAULT_MAX_SUMMARIES,
+    ):
+        if max_entries < 1 or max_summaries < 1:
+            raise ValueError("max_entries y max_summaries deben ser al menos 1.")
+        self.max_entries = max_entries
+        self.max_summaries = max_summaries
+        self._processor = processor if processor is not None else DataProcessor()
+        self._entries: OrderedDict = OrderedDict()
+        self._summaries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._summaries.clear()
+
+    def classify(
+        self,
+        df: pd.DataFrame,
+        thresholds: Thresholds,
+        metric: Metric,
+        fingerprint: str | None = None,
+    ):
+        """Return cached `(codes, indice_dureza)` arrays for the whole `df`.
+
+        Args:
+            df: The processed (unfiltered) DataFrame.
+            thresholds: A `Thresholds` TypedDict.
+            metric: One of the `Metric` literals.
+            fingerprint: Precomputed `dataset_fingerprint(df)`. Computed
+                on the fly when omitted, which costs a full hash pass.
+
+        Returns:
+            A `(codes, indexes)` tuple of read-only arrays of length
+            `len(df)`.
+        """
+        if fingerprint is None:
+            fingerprint = dataset_fingerprint(df)
+        key = (fingerprint, len(df), *thresholds_key(thresholds, metric))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+
+        codes, indexes = self._processor.classification_codes(df, thresholds, metric)
+        codes.setflags(write=False)
+        indexes.setflags(write=False)
+        entry = (codes, indexes)
+        with self._lock:
+            self.misses += 1
+            _remember(self._entries, key, entry, self.max_entries)
+        return entry
+
+    def view(
+        self,
+        df: pd.DataFrame,
+        mask,
+        thresholds: Thresholds,
+        metric: Metric,
+        fingerprint: str | None = None,
+        compact: bool = False,
+    ) -> pd.DataFrame:
+        """Filtered rows of `df` with `dureza` / `indice_dureza` attached.
+
+        Equivalent to `DataProcessor.classify_with_metric(df[mask], ...)`
+        but the classification comes from the cache and is sliced with
+        the same boolean mask as the rows.
+
+        Args:
+            df: The processed (unfiltered) DataFrame.
+            mask: Boolean array-like aligned with `df`, or `None` for
+                every row.
+            thresholds: A `Thresholds` TypedDict.
+            metric: One of the `Metric` literals.
+            fingerprint: Precomputed `dataset_fingerprint(df)`.
+            compact: Attach `dureza` as an ordered categorical (see
+                `data_processor.hardness_categorical`) instead of
+                object labels.
+
+        Returns:
+            A new DataFrame; `df` is left untouched.
+        """
+        codes, indexes = self.classify(df, thresholds, metric, fingerprint)
+        if mask is None:
+            result = df.copy(deep=False)
+        else:
+            mask = np.asarray(mask, dtype=bool)
+            result = df.loc[mask]
+            codes = codes[mask]
+            indexes = indexes[mask]
+        result["dureza"] = hardness_categorical(codes) if compact else labels_from_codes(codes)
+        result["indice_dureza"] = indexes
+        return result
+
+    def summary(
+        self,
+        df: pd.DataFrame,
+        mask,
+        thresholds: Thresholds,
+        metric: Metric,
+        by: str,
+        value: str,
+        fingerprint: str | None = None,
+    ) -> pd.DataFrame:
+        """Cached `group_summary` of the filtered, classified rows.
+
+        The same table as `DataProcessor.group_summary` on
+        `view(df, mask, thresholds, metric)`, keyed on `(dataset, filter
+        mask, thresholds, metric, by, value)`. `by="dureza"` and
+        `value="indice_dureza"` read the cached classification arrays.
+
+        Returns:
+            A copy of the cached table (one row per group).
+
+        Raises:
+            ValueError: When `by` or `value` is neither a column of `df`
+                nor a classification output.
+        """
+        for column in (by, value):
+            if column not in df.columns and column not in ("dureza", "indice_dureza"):
+                raise ValueError(f"El resumen requiere la columna '{column}'.")
+        if fingerprint is None:
+            fingerprint = dataset_fingerprint(df)
+        key = (
+            fingerprint, len(df), *thresholds_key(thresholds, metric),
+            mask_key(mask), by, value,
+        )
+        with self._lock:
+            summary = self._summaries.get(key)
+            if summary is not None:
+                self._summaries.move_to_end(key)
+                return summary.copy()
+
+        codes, indexes = self.classify(df, thresholds, metric, fingerprint)
+        keys = hardness_categorical(codes) if by == "dureza" else df[by].array
+        if value == "indice_dureza":
+            values = indexes
+        else:
+            values = df[value].to_numpy(dtype=float, na_value=np.nan)
+        if mask is not None:
+            mask = np.asarray(mask, dtype=bool)
+            keys, values, codes = keys[mask], values[mask], codes[mask]
+        summary = group_summary(keys, values, codes, name=by)
+        with self._lock:
+            _remember(self._summaries, key, summary, self.max_summaries)
+        return summary.copy()
@@ -0,0 +1,251 @@
+"""CSV parsing strategy for drilling exports.
+
+The fast path parses the whole file with the first available strict
+engine (pyarrow, then pandas' C engine). Only when that fails because of
+malformed lines does a recovery step run, and it touches just the
+offending rows:
+
+1. pyarrow re-reads the file, skipping each invalid row and handing its
+   text to a callback (no warning-text scraping).
+2. Each skipped row is located in the raw bytes to recover its physical
+   line number.
+3. Rows with *fewer* fields than the header are re-parsed with the
+   tolerant python engine (missing fields become NaN) and spliced back
+   in file order; rows with *more* fields are dropped. That mirrors the
+   historical full-file `engine="python", on_bad_lines="warn"` result.
+
+Without pyarrow, or when the targeted step cannot place a row, the C
+engine's tolerant mode is used, and the python engine is the last
+resort. Whatever path runs, the outcome is described by a `ParseReport`.
+"""
+
+import importlib.util
+import io
+import os
+import re
+import warnings
+from typing import TypedDict
+
+import numpy as np
+import pandas as pd
+
+PYARROW_AVAILABLE: bool = importlib.util.find_spec("pyarrow") is not None
+
+# Strict engines tried in order on the fast path.
+DEFAULT_PARSER_ENGINES: tuple = ("pyarrow", "c")
+
+_SKIPPING_LINE = re.compile(r"Skipping line (\d+)")
+_BLANK_LINE_BREAK = re.compile(rb"\n(?=\r?\n)")
+
+
+class ParseReport(TypedDict):
+    """Structured outcome of `read_csv_with_report`.
+
+    `engine` names the path that produced the frame (`"pyarrow"`,
+    `"c"`, `"pyarrow+python"` for targeted recovery, `"c-tolerant"` or
+    `"python-tolerant"`). Line numbers are 1-based physical lines, the
+    header being line 1. `skipped_lines` can be shorter than
+    `skipped_count` on the python last-resort path, which cannot tell
+    where a dropped row came from.
+    """
+
+    engine: str
+    rows: int
+    recovered_lines: list
+    skipped_lines: list
+    skipped_count: int
+
+
+class _RecoveryFailed(Exception):
+    """Targeted recovery could not place a malformed row."""
+
+
+def _report(engine, df, recovered=(), skipped=(), skipped_count=None):
+    skipped = sorted(skipped)
+    return {
+        "engine": engine,
+        "rows": len(df),
+        "recovered_lines": sorted(recovered),
+        "skipped_lines": skipped,
+        "skipped_count": len(skipped) if skipped_count is None else skipped_count,
+    }
+
+
+def _rewind(source):
+    if hasattr(source, "seek"):
+        source.seek(0)
+
+
+def _read_bytes(source) -> bytes:
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as fh:
+            return fh.read()
+    _rewind(source)
+    data = source.read()
+    return data.encode("utf-8") if isinstance(data, str) else data
+
+
+def skipped_lines_from_warnings(captured) -> list:
+    """Line numbers from pandas' `"Skipping line N: ..."` parser warnings.
+
+    Used where pandas only reports bad lines through warnings (the C
+    engine's tolerant mode and the chunked reader).
+    """
+    lines = []
+    for w in captured:
+        # The C engine batches several lines into one warning message.
+        lines.extend(int(n) for n in _SKIPPING_LINE.findall(str(w.message)))
+    return lines
+
+
+def _locate_rows(data: bytes, texts):
+    """Physical line numbers and ordering keys of malformed rows.
+
+    Returns `(lines, blanks)` aligned with `texts`, where `blanks` is
+    the number of empty lines above each row (parsers skip those, so
+    they do not shift the row ordinals). Identical texts are matched to
+    successive occurrences. Raises `_RecoveryFailed` when a text cannot
+    be found (e.g. a compressed file or quoted multi-line fields).
+    """
+    offsets = []
+    next_start: dict = {}
+    for text in texts:
+        needle = b"\n" + text.encode("utf-8")
+        start = next_start.get(text, 0)
+        while True:
+            offset = data.find(needle, start)
+            if offset < 0:
+                raise _RecoveryFailed(text)
+            end = offset + len(needle)
+            if end == len(data) or data[end:end + 1] in (b"\n", b"\r"):
+                break
+            start = offset + 1
+        next_start[text] = offset + 1
+        offsets.append(offset)
+
+    order = np.argsort(offsets, kind="stable")
+    lines = [0] * len(texts)
+    blanks = [0] * len(texts)
+    newlines = 0
+    blank_lines = 0
+    previous = 0
+    for position in order:
+        offset = offsets[position]
+        # `offset` is the newline that ends the line above the row.
+        newlines += data.count(b"\n", previous, offset + 1)
+        blank_lines += len(_BLANK_LINE_BREAK.findall(data, previous, offset + 1))
+        previous = offset + 1
+        lines[position] = newlines + 1
+        blanks[position] = blank_lines
+    return lines, blanks
+
+
+def _read_targeted(source):
+    """pyarrow read that skips bad rows, then re-parses only those rows."""
+    bad_rows = []
+
+    def _collect(row):
+        bad_rows.append(row)
+        return "skip"
+
+    _rewind(source)
+    df = pd.read_csv(source, engine="pyarrow", on_bad_lines=_collect)
+    if not bad_rows:
+        return _report("pyarrow", df), df
+
+    data = _read_bytes(source)
+    texts = [row.text for row in bad_rows]
+    lines, blanks = _locate_rows(data, texts)
+    order = sorted(range(len(bad_rows)), key=lambda i: lines[i])
+
+    recovered_texts, recovered_keys, recovered_lines, skipped_lines = [], [], [], []
+    for rank, i in enumerate(order):
+        row = bad_rows[i]
+        if row.actual_columns > row.expected_columns:
+            skipped_lines.append(lines[i])
+            continue
+        # Good rows that precede this one: data lines above it, minus
+        # the header, the blank lines and the malformed rows above it.
+        good_before = lines[i] - 2 - blanks[i] - rank
+        recovered_texts.append(row.text)
+        recovered_keys.append(good_before - 0.5)
+        recovered_lines.append(lines[i])
+
+    if recovered_texts:
+        header = data.split(b"\n", 1)[0].decode("utf-8-sig").rstrip("\r")
+        recovered = pd.read_csv(
+            io.StringIO("\n".join([header, *recovered_texts])),
+            engine="python",
+        )
+        for column in df.columns:
+            if pd.api.types.is_datetime64_any_dtype(df[column]):
+                recovered[column] = pd.to_datetime(recovered[column])
+        keys = np.concatenate([np.arange(len(df), dtype=float), recovered_keys])
+        df = pd.concat([df, recovered], ignore_index=True)
+        df = df.iloc[np.argsort(keys, kind="stable")].reset_index(drop=True)
+
+    return _report(
+        "pyarrow+python", df, recovered=recovered_lines, skipped=skipped_lines
+    ), df
+
+
+def _read_tolerant_c(source):
+    _rewind(source)
+    with warnings.catch_warnings(record=True) as captured:
+        warnings.simplefilter("always")
+        df = pd.read_csv(source, engine="c", on_bad_lines="warn")
+    return _report("c-tolerant", df, skipped=skipped_lines_from_warnings(captured)), df
+
+
+def _read_tolerant_python(source):
+    dropped = []
+
+    def _drop(fields):
+        dropped.append(fields)
+        return None
+
+    _rewind(source)
+    df = pd.read_csv(source, engine="python", on_bad_lines=_drop)
+    return _report("python-tolerant", df, skipped_count=len(dropped)), df
+
+
+def read_csv_with_report(source, engines=DEFAULT_PARSER_ENGINES):
+    """Read a drilling CSV, recovering from malformed lines locally.
+
+    Args:
+        source: Path or file-like object accepted by `pd.read_csv`.
+            File-like objects must be seekable.
+        engines: Strict engines to try in order on the fast path
+            (`"pyarrow"` is ignored when pyarrow is not installed).
+
+    Returns:
+        `(df, report)` where `report` is a `ParseReport`.
+
+    Raises:
+        pd.errors.ParserError: When even the tolerant engines cannot
+            tokenize the file (e.g. an unterminated quote).
+    """
+    engines = [e for e in engines if e != "pyarrow" or PYARROW_AVAILABLE]
+    for engine in engines:
+        _rewind(source)
+        try:
+            df = pd.read_csv(source, engine=engine)
+        except pd.errors.ParserError:
+            break
+        except (ValueError, TypeError):
+            # Engine-specific limitation (e.g. pyarrow type inference on
+            # a mixed column): try the next strict engine.
+            continue
+        return df, _report(engine, df)
+
+    if "pyarrow" in engines:
+        try:
+            report, df = _read_targeted(source)
+            return df, report
+        except (_RecoveryFailed, pd.errors.ParserError, ValueError, UnicodeDecodeError):
+            pass
+    try:
+        report, df = _read_tolerant_c(source)
+    except pd.errors.ParserError:
+        report, df = _read_tolerant_python(source)
+    return df, report
@@ -1,6 +1,6 @@
 import logging
-import math
 
+import numpy as np
 import pandas as pd
 
 # Workaround: pandas 3.0 defaults to pyarrow-backed string columns
@@ -20,17 +20,33 @@ except Exception:
 # logic side-effect-free so a future TS port can mirror it.
 from classification import (
     DEFAULT_THRESHOLDS,
+    HARDNESS_LABELS,
     Thresholds,
     Metric,
+    classify_array,
+    classify_codes,
     classify_duracion,
-    classify_with_metric,
     hardness_index,
-    hardness_index_with_metric,
-    penetration_rate,
-    rig_mean_penetration,
-    rig_normalized_penetration,
+    hardness_index_array,
+    labels_from_codes,
+    penetration_rate_array,
+    rig_normalized_penetration_array,
+    rig_robust_normalized_penetration_array,
 )
 
+from csv_parsing import (
+    DEFAULT_PARSER_ENGINES,
+    read_csv_with_report,
+    skipped_lines_from_warnings,
+)
+from anomaly_detection import AnomalyDetector, anomaly_report, frame_keys
+from datetime_parsing import KNOWN_DATETIME_FORMATS, MAX_REPORTED_ROWS, parse_datetime_column
+from group_statistics import RunningGroupStats, SortedGroups, grouped_moments, moments_to_std
+from group_summary import group_summary
+from hierarchical_normalization import DEFAULT_SHRINKAGE_PRIOR, HierarchicalNormalizer
+from threshold_calibration import calibrate_thresholds
+from threshold_sweep import sweep_thresholds
+
 # Configuración básica para logging
 logging.basicConfig(filename="app.log", level=logging.DEBUG,
                     format="%(asctime)s %(levelname)s %(message)s")
@@ -45,6 +61,35 @@ DEPTH_COLUMN_CANDIDATES = (
     "mts plan",
 )
 
+# Source column for each classification metric.
+METRIC_COLUMNS = {
+    "duration": "duracion",
+    "penetration_rate": "tasa_penetracion",
+    "rig_normalized_penetration": "tasa_penetracion_normalizada",
+    "rig_robust_penetration": "tasa_penetracion_robusta",
+    "rig_percentile_penetration": "tasa_penetracion_percentil",
+}
+
+# Per-rig normalization modes of `add_rig_normalized_rate` and the
+# metric that classifies each one's column: mean/std z-score, median/MAD
+# robust z-score and within-rig percentile rank.
+RIG_NORMALIZATION_MODES = {
+    "zscore": "rig_normalized_penetration",
+    "robust": "rig_robust_penetration",
+    "percentile": "rig_percentile_penetration",
+}
+
+# Rows per chunk for the streaming readers.
+DEFAULT_CHUNKSIZE = 100_000
+
+# In compact mode, string columns with at most this share of distinct
+# values become categoricals.
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
+# `dureza` as an ordered categorical over the label table; the category
+# index is pinned to object dtype so no Arrow strings sneak in.
+HARDNESS_DTYPE = pd.CategoricalDtype(pd.Index(HARDNESS_LABELS, dtype=object), ordered=True)
+
 
 def _resolve_depth_column(columns):
     """Return the first depth column present in `columns`, else `None`."""
@@ -56,37 +101,210 @@ def _resolve_depth_column(columns):
 
 class DataProcessor:
     REQUIRED_COLUMNS = ['tiempo inicio', 'tiempo final']
+    # Strict engines tried in order before any bad-line recovery.
+    PARSER_ENGINES = DEFAULT_PARSER_ENGINES
+    # Known rig-export datetime layouts, sniffed in order (see
+    # `datetime_parsing`); month-first wins ambiguous dates. Use
+    # `DAYFIRST_DATETIME_FORMATS` for day-first exports.
+    DATETIME_FORMATS = KNOWN_DATETIME_FORMATS
+    # Anomaly stage (see `anomaly_detection`): `"mad"` or `"iqr"`, the
+    # cutoff (None = the method's default) and whether flagged rows are
+    # left out of the per-rig rate statistics.
+    ANOMALY_METHOD = "mad"
+    ANOMALY_THRESHOLD = None
+    EXCLUDE_ANOMALIES_FROM_RIG_STATS = False
+    # Hierarchical normalization (see `hierarchical_normalization`):
+    # group keys from coarsest to finest and the shrinkage pseudo-count.
+    HIERARCHY_KEYS = ("perforadora", "drill_pattern")
+    SHRINKAGE_PRIOR = DEFAULT_SHRINKAGE_PRIOR
 
-    def load_and_process(self, file_path):
+    def load_and_process(self, file_path, compact: bool = False):
+        """Read and process a drilling CSV.
+
+        With `compact=True` the result goes through `compact_dtypes`
+        (categorical `dureza` / rig / pattern, exact `float32`).
+        """
         logging.info(f"Iniciando carga del archivo: {file_path}")
         try:
-            try:
-                df = pd.read_csv(file_path)
-            except pd.errors.ParserError:
-                import warnings as _warnings
-
-                with _warnings.catch_warnings(record=True) as captured:
-                    _warnings.simplefilter("always")
-                    df = pd.read_csv(
-                        file_path,
-                        engine="python",
-                        on_bad_lines="warn",
-                    )
-                bad_lines = sum(
-                    1
-                    for w in captured
-                    if "Skipping" in str(w.message)
-                )
-                if bad_lines:
-                    logging.warning(
-                        "Se descartaron %d filas con esquema inválido "
-                        "(campos extra o faltantes respecto al header).",
-                        bad_lines,
-                    )
+            df, report = self.read_csv(file_path)
         except Exception as e:
             logging.exception("Error leyendo el archivo")
             raise Exception(f"Error al leer el archivo: {e}")
 
+        df = self._derive_columns(df)
+        # The parse report travels with the frame (attrs survive the
+        # Streamlit cache pickling) so the UI can surface skipped rows.
+        df.attrs["parse_report"] = report
+        if compact:
+            df = compact_dtypes(df)
+        logging.info("Archivo procesado exitosamente.")
+        return df
+
+    def read_csv(self, file_path):
+        """Parse the raw CSV with the `PARSER_ENGINES` strategy.
+
+        Clean files take the fast strict path (pyarrow, then the C
+        engine). Malformed lines trigger a targeted recovery that only
+        re-parses the offending rows; see `csv_parsing`.
+
+        Returns:
+            `(df, report)` where `report` is a `ParseReport` listing the
+            engine used and the recovered / skipped line numbers.
+        """
+        df, report = read_csv_with_report(file_path, self.PARSER_ENGINES)
+        logging.debug(f"CSV leído con el motor {report['engine']!r}.")
+        if report["skipped_count"]:
+            logging.warning(
+                "Se descartaron %d filas con esquema inválido "
+                "(campos extra o faltantes respecto al header). Líneas: %s",
+                report["skipped_count"],
+                report["skipped_lines"][:20],
+            )
+        if report["recovered_lines"]:
+            logging.info(
+                "Se recuperaron %d filas con campos faltantes. Líneas: %s",
+                len(report["recovered_lines"]),
+                report["recovered_lines"][:20],
+            )
+        return df, report
+
+    def iter_process_chunks(
+        self, file_path, chunksize=DEFAULT_CHUNKSIZE, rig_stats=None, anomaly_detector=None
+    ):
+        """Stream a CSV in chunks, yielding each one fully processed.
+
+        Every chunk gets the same derived columns as `load_and_process`
+        (`duracion`, `tasa_penetracion`, `dureza`, `indice_dureza`), so
+        peak memory is bounded by `chunksize` rows rather than by the
+        file size. Malformed lines are skipped by the C engine and
+        logged per chunk instead of re-reading the whole file.
+
+        Args:
+            file_path: Path or file-like object accepted by `pd.read_csv`.
+            chunksize: Rows per chunk.
+            rig_stats: Optional `RunningGroupStats`; when given and the
+                `perforadora` column exists, each chunk's rates are
+                folded into it so per-rig z-scores can be computed once
+                the stream ends.
+            anomaly_detector: Optional `AnomalyDetector`; when given,
+                each chunk is folded into it and then flagged (bool
+                `anomalia` column) against everything seen so far. With
+                `EXCLUDE_ANOMALIES_FROM_RIG_STATS` the flagged rates
+                stay out of `rig_stats`.
+
+        Yields:
+            Processed DataFrame chunks. Their index continues across
+            chunks, as in a single `pd.read_csv` call.
+        """
+        import warnings as _warnings
+
+        logging.info(f"Iniciando carga por bloques del archivo: {file_path}")
+        try:
+            reader = pd.read_csv(file_path, chunksize=chunksize, on_bad_lines="warn")
+        except Exception as e:
+            logging.exception("Error leyendo el archivo")
+            raise Exception(f"Error al leer el archivo: {e}")
+
+        # The first chunk sniffs each time column's format; later chunks
+        # try that format first instead of re-sniffing from scratch.
+        time_formats = None
+        first_row = 0
+        with reader:
+            while True:
+                try:
+                    with _warnings.catch_warnings(record=True) as captured:
+                        _warnings.simplefilter("always")
+                        chunk = next(reader)
+                except StopIteration:
+                    break
+                except Exception as e:
+                    logging.exception("Error leyendo el archivo")
+                    raise Exception(f"Error al leer el archivo: {e}")
+                _log_bad_lines(captured)
+
+                # Row positions in the parse reports count from the
+                # start of the file, not of the chunk.
+                chunk = self._derive_columns(chunk, time_formats, first_row)
+                first_row += len(chunk)
+                if time_formats is None:
+                    time_formats = _pinned_formats(
+                        chunk.attrs["datetime_report"], self.DATETIME_FORMATS
+                    )
+                if anomaly_detector is not None:
+                    anomaly_detector.update(
+                        frame_keys(chunk), chunk["duracion"], chunk["tasa_penetracion"]
+                    )
+                    chunk = self.flag_anomalies(chunk, anomaly_detector, copy=False)
+                if rig_stats is not None and "perforadora" in chunk.columns:
+                    rig_stats.update(chunk["perforadora"], self._rig_stat_rates(chunk))
+                yield chunk
+        logging.info("Archivo procesado exitosamente por bloques.")
+
+    def load_and_process_streaming(
+        self,
+        file_path,
+        chunksize=DEFAULT_CHUNKSIZE,
+        columns=None,
+        compact: bool = False,
+        anomalies: bool = False,
+    ):
+        """Chunked counterpart of `load_and_process` returning a compact frame.
+
+        Chunks come from `iter_process_chunks`; only `columns` (default:
+        every column) are kept from each one, so the wide raw columns of
+        the CSV are dropped as soon as their chunk is processed. When
+        `perforadora` is present the per-rig statistics are accumulated
+        incrementally (Welford/Chan) and `tasa_penetracion_normalizada`
+        is added at the end without a second pass over the file.
+
+        Args:
+            file_path: Path or file-like object accepted by `pd.read_csv`.
+            chunksize: Rows per chunk.
+            columns: Optional iterable of (lower-case) column names to
+                keep. Missing names are ignored.
+            compact: Apply `compact_dtypes` to the concatenated frame.
+            anomalies: Run the anomaly stage on every chunk (see
+                `iter_process_chunks`) and keep its `anomalia` column.
+
+        Returns:
+            The concatenated, processed DataFrame. Its
+            `attrs["datetime_report"]` merges the chunks' reports, with
+            row positions counted from the start of the file.
+        """
+        rig_stats = RunningGroupStats()
+        detector = self.anomaly_detector() if anomalies else None
+        parts = []
+        for chunk in self.iter_process_chunks(
+            file_path, chunksize, rig_stats=rig_stats, anomaly_detector=detector
+        ):
+            if columns is not None:
+                keep = [c for c in columns if c in chunk.columns]
+                if detector is not None and "anomalia" not in keep:
+                    keep.append("anomalia")
+                chunk = chunk[keep]
+            parts.append(chunk)
+        df = pd.concat(parts)
+        df.attrs["datetime_report"] = _merge_datetime_reports(
+            [part.attrs["datetime_report"] for part in parts]
+        )
+
+        if "perforadora" in df.columns and "tasa_penetracion" in df.columns:
+            # PARITY-DEBT: webapp/src/utils/dataProcessor.ts:addRigNormalizedRate
+            df["tasa_penetracion_normalizada"] = rig_stats.normalize(
+                df["perforadora"], df["tasa_penetracion"]
+            )
+        return compact_dtypes(df) if compact else df
+
+    def _derive_columns(self, df, time_formats=None, first_row=0):
+        """Normalize headers and add the derived columns in place.
+
+        Shared by `load_and_process` and the chunked readers so every
+        ingestion path produces the same schema. `time_formats` optionally
+        maps each time column to its candidate formats (default:
+        `DATETIME_FORMATS`). The per-column `DatetimeParseReport`s are
+        stored in `df.attrs["datetime_report"]`, with row positions
+        offset by `first_row`.
+        """
         # Estandarizar nombres de columnas a minúsculas y sin espacios extremos.
         df.columns = [col.strip().lower() for col in df.columns]
         logging.debug(f"Columnas del archivo: {df.columns.tolist()}")
@@ -98,8 +316,7 @@ class DataProcessor:
                 raise ValueError(f"El archivo no contiene la columna requerida '{col}'.")
 
         try:
-            df['tiempo inicio'] = pd.to_datetime(df['tiempo inicio'])
-            df['tiempo final'] = pd.to_datetime(df['tiempo final'])
+            df.attrs["datetime_report"] = self._parse_times(df, time_formats or {}, first_row)
             df['duracion'] = (df['tiempo final'] - df['tiempo inicio']).dt.total_seconds() / 60.0
         except Exception as e:
             logging.exception("Error en el cálculo de la duración")
@@ -119,112 +336,515 @@ class DataProcessor:
                 "tasa_penetracion queda como NaN."
             )
         else:
-            df['tasa_penetracion'] = [
-                # PARITY-DEBT: webapp/src/utils/dataProcessor.ts:applyPenetrationRate
-                penetration_rate(depth, dur)
-                for depth, dur in zip(df[depth_column], df['duracion'])
-            ]
+            # PARITY-DEBT: webapp/src/utils/dataProcessor.ts:applyPenetrationRate
+            df['tasa_penetracion'] = penetration_rate_array(
+                df[depth_column].to_numpy(), df['duracion'].to_numpy()
+            )
 
         try:
             # Default classification using the legacy boundaries. The
             # downstream UI calls `classify_with_metric` again with the
             # user-tuned thresholds so this default pass only seeds the
-            # columns for the very first render.
-            df['dureza'] = df['duracion'].apply(self.classify_duracion)
-            df['indice_dureza'] = df['duracion'].apply(self.hardness_index)
+            # columns for the very first render. `DEFAULT_THRESHOLDS`
+            # reproduces `classify_duracion` / `hardness_index` exactly,
+            # so the vectorized helpers replace the per-row `apply`.
+            duracion = df['duracion'].to_numpy()
+            df['dureza'] = classify_array(duracion, DEFAULT_THRESHOLDS, "duration")
+            df['indice_dureza'] = hardness_index_array(
+                duracion, DEFAULT_THRESHOLDS, "duration"
+            )
         except Exception as e:
             logging.exception("Error al clasificar la duración y calcular el índice de dureza")
             raise Exception(f"Error al procesar los índices: {e}")
-
-        logging.info("Archivo procesado exitosamente.")
         return df
 
+    def _parse_times(self, df, time_formats, first_row=0):
+        """Parse the time columns in place with an explicit, sniffed format.
+
+        Rows that match no known format are parsed by per-element
+        inference and logged; rows that still fail become `NaT` (so their
+        `duracion` is NaN) and are logged instead of failing the whole
+        file.
+        """
+        reports = {}
+        for col in ('tiempo inicio', 'tiempo final'):
+            formats = time_formats.get(col, self.DATETIME_FORMATS)
+            df[col], report = parse_datetime_column(df[col], formats, first_row)
+            reports[col] = report
+            if report["format"] is not None:
+                logging.debug(f"Formato de '{col}': {report['format']!r}.")
+            if report["ambiguous"]:
+                logging.warning(
+                    "Fechas ambiguas en '%s' (día/mes intercambiables); se usó %r. "
+                    "Ajusta DATETIME_FORMATS si el archivo es día primero.",
+                    col,
+                    report["format"],
+                )
+            if report["inferred_count"]:
+                logging.warning(
+                    "%d fechas de '%s' no siguen ningún formato conocido y se "
+                    "interpretaron una a una (revisa el orden día/mes). Filas: %s",
+                    report["inferred_count"],
+                    col,
+                    report["inferred_rows"][:20],
+                )
+            if report["failed_count"]:
+                logging.warning(
+                    "No se pudieron interpretar %d fechas en '%s'. Filas: %s",
+                    report["failed_count"],
+                    col,
+                    report["failed_rows"][:20],
+                )
+        return reports
+
     def classify_duracion(self, minutos):
         return classify_duracion(minutos)
 
     def hardness_index(self, T):
         return hardness_index(T)
 
-    def classify_with_metric(self, df, thresholds: Thresholds, metric: Metric) -> pd.DataFrame:
+    def classify_with_metric(
+        self,
+        df,
+        thresholds: Thresholds,
+        metric: Metric,
+        copy: bool = True,
+        compact: bool = False,
+    ) -> pd.DataFrame:
         """Reclassify a DataFrame copy using the supplied metric and thresholds.
 
-        Returns a copy — never mutates the cached DataFrame. The
-        `dureza` and `indice_dureza` columns are populated by calling
+        Never mutates the cached DataFrame. The `dureza` and
+        `indice_dureza` columns are populated by the vectorized twins of
         the pure functions in `classification.py` so this adapter stays
         a thin shim around the parity surface.
+
+        With `copy=False` the result is a lightweight view: a shallow
+        frame that shares every input column with `df` and only owns the
+        two derived columns (see `_derived_view`). Use
+        `classification_codes` when only the arrays are needed.
+
+        With `compact=True`, `dureza` is an ordered categorical built
+        straight from the int8 codes (see `hardness_categorical`)
+        instead of an object column of repeated strings.
         """
-        result = df.copy()
-        if metric == "duration":
-            values = result["duracion"]
-        elif metric == "penetration_rate":
-            values = result["tasa_penetracion"]
-        elif metric == "rig_normalized_penetration":
-            if "tasa_penetracion_normalizada" not in result.columns:
-                raise ValueError(
-                    "rig_normalized_penetration requires the "
-                    "'tasa_penetracion_normalizada' column. Call "
-                    "add_rig_normalized_rate first."
-                )
-            values = result["tasa_penetracion_normalizada"]
-        else:
-            raise ValueError(f"Unknown metric {metric!r}")
+        codes, indexes = self.classification_codes(df, thresholds, metric)
+        labels = hardness_categorical(codes) if compact else labels_from_codes(codes)
+        return _derived_view(df, {"dureza": labels, "indice_dureza": indexes}, copy=copy)
+
+    def classification_codes(self, df, thresholds: Thresholds, metric: Metric):
+        """Return `(codes, indice_dureza)` arrays for `df` without copying it.
+
+        `codes` are `int8` indexes into `HARDNESS_LABELS` (see
+        `classification.classify_codes`). This is the allocation-light
+        entry point used by `classify_with_metric` and by the rerun
+        cache in `classification_cache.py`.
+
+        Raises:
+            ValueError: When `metric` is unknown or its source column is
+                missing.
+        """
+        values = _metric_values(df, metric)
 
         # PARITY-DEBT: webapp/src/utils/dataProcessor.ts:processCsvData —
         # the TS counterpart will read `thresholds[metric]` and apply the
-        # same pure helpers. Keep these two call sites in lockstep.
-        result["dureza"] = [
-            classify_with_metric(v, thresholds, metric) for v in values
-        ]
-        result["indice_dureza"] = [
-            hardness_index_with_metric(v, thresholds, metric) for v in values
-        ]
+        # same pure helpers. The array helpers mirror
+        # `classify_with_metric` / `hardness_index_with_metric` element
+        # for element; keep both call paths in lockstep.
+        return (
+            classify_codes(values, thresholds, metric),
+            hardness_index_array(values, thresholds, metric),
+        )
+
+    def threshold_sweep(
+        self, df, metric: Metric, soft, medium, hard, ordered_only: bool = True
+    ) -> pd.DataFrame:
+        """Hardness distribution of `df` over a grid of candidate cutoffs.
+
+        Sweeps the metric's three cutoffs (`soft`, `medium`, `hard` are
+        lists of candidate values) in one sorted pass instead of one
+        `classify_with_metric` call per combination; see
+        `threshold_sweep.sweep_thresholds` for the result table.
+
+        Raises:
+            ValueError: When `metric` is unknown or its source column is
+                missing, as in `classification_codes`.
+        """
+        values = _metric_values(df, metric)
+        return sweep_thresholds(values, metric, soft, medium, hard, ordered_only)
+
+    def calibrate_thresholds(
+        self,
+        df,
+        metric: Metric,
+        method: str = "quantile",
+        base: Thresholds = DEFAULT_THRESHOLDS,
+        **kwargs,
+    ) -> Thresholds:
+        """Propose cutoffs for `metric` from the data in `df`.
+
+        Replaces the metric's group of `base` with cutoffs at fixed row
+        shares (`"quantile"`) or at Fisher natural breaks (`"jenks"`);
+        `kwargs` (`quantiles`, `bins`) are passed to
+        `threshold_calibration.calibrate_thresholds`.
+
+        Raises:
+            ValueError: When `metric` is unknown or its source column is
+                missing, or the column cannot be split into four
+                categories.
+        """
+        values = _metric_values(df, metric)
+        return calibrate_thresholds(values, metric, method, base, **kwargs)
+
+    def group_summary(self, df, by: str, value: str) -> pd.DataFrame:
+        """Count, mean, quartiles and hardness mix of `value` per `by`.
+
+        One grouped pass over `df` (see `group_summary.group_summary`);
+        the per-category counts come from the `dureza` column when
+        present. Meant for `SUMMARY_GROUPS` (`perforadora`,
+        `drill_pattern`, `dureza`) but any column works.
+
+        Raises:
+            ValueError: When `by` or `value` is not a column of `df`.
+        """
+        for column in (by, value):
+            if column not in df.columns:
+                raise ValueError(f"El resumen requiere la columna '{column}'.")
+        codes = None
+        if "dureza" in df.columns:
+            codes = pd.Categorical(df["dureza"], dtype=HARDNESS_DTYPE).codes
+        keys = pd.Categorical(df["dureza"], dtype=HARDNESS_DTYPE) if by == "dureza" else df[by]
+        values = df[value].to_numpy(dtype=float, na_value=np.nan)
+        return group_summary(keys, values, codes, name=by)
+
+    def anomaly_detector(self) -> AnomalyDetector:
+        """Empty `AnomalyDetector` configured from the class attributes."""
+        return AnomalyDetector(self.ANOMALY_METHOD, self.ANOMALY_THRESHOLD)
+
+    def flag_anomalies(self, df: pd.DataFrame, detector=None, copy: bool = True) -> pd.DataFrame:
+        """Add the bool `anomalia` column (see `anomaly_detection`).
+
+        Rows are scored against `detector` when given (e.g. one fed
+        chunk by chunk by `iter_process_chunks`), otherwise against a
+        fresh detector built from `df` itself. The `AnomalyReport` is
+        stored in `attrs["anomaly_report"]`.
+
+        Raises:
+            ValueError: When `df` lacks `duracion` or `tasa_penetracion`.
+        """
+        for column in ("duracion", "tasa_penetracion"):
+            if column not in df.columns:
+                raise ValueError(f"La detección de anomalías requiere la columna '{column}'.")
+        keys = frame_keys(df)
+        if detector is None:
+            detector = self.anomaly_detector().update(
+                keys, df["duracion"], df["tasa_penetracion"]
+            )
+        reasons = detector.reasons(keys, df["duracion"], df["tasa_penetracion"])
+        result = _derived_view(df, {"anomalia": reasons > 0}, copy=copy)
+        result.attrs["anomaly_report"] = anomaly_report(reasons)
         return result
 
-    def add_rig_normalized_rate(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _rig_stat_rates(self, df, exclude_anomalies=None):
+        """`tasa_penetracion` for the per-rig statistics (NaN when excluded)."""
+        rates = df["tasa_penetracion"].to_numpy(dtype=float, na_value=np.nan)
+        if exclude_anomalies is None:
+            exclude_anomalies = self.EXCLUDE_ANOMALIES_FROM_RIG_STATS
+        if exclude_anomalies and "anomalia" in df.columns:
+            rates = np.where(df["anomalia"].to_numpy(dtype=bool), np.nan, rates)
+        return rates
+
+    def add_rig_normalized_rate(
+        self,
+        df: pd.DataFrame,
+        copy: bool = True,
+        exclude_anomalies=None,
+        modes=("zscore",),
+    ) -> pd.DataFrame:
         """Add `tasa_penetracion_normalizada` per-rig z-score column.
 
         When the `perforadora` column is absent the result is returned
         unchanged — no exception, no synthetic column. When it is
         present, each row receives a z-score against its own rig's mean
-        and standard deviation using the pure
+        and standard deviation with the same semantics as the pure
         `rig_normalized_penetration` helper.
 
-        Rows with a missing `tasa_penetracion` value contribute to the
-        per-rig statistics as 0.0 weight (the pure helper returns 0.0
-        for non-finite inputs anyway, so the aggregate is consistent).
+        Only finite `tasa_penetracion` values contribute to the per-rig
+        statistics (as `rig_mean_penetration` does); rows with a missing
+        rate, or without a rig, get 0.0.
+
+        `copy=False` returns a shallow view that shares the input
+        columns, as in `classify_with_metric`.
+
+        With `exclude_anomalies` (default:
+        `EXCLUDE_ANOMALIES_FROM_RIG_STATS`) the rows flagged in an
+        `anomalia` column are left out of the per-rig statistics; they
+        still receive a z-score against them.
+
+        `modes` picks the `RIG_NORMALIZATION_MODES` columns to add
+        (`"zscore"`, `"robust"`, `"percentile"`; see
+        `rig_normalizations`), each under its `METRIC_COLUMNS` name.
         """
         if "perforadora" not in df.columns:
             return df
+        normalized = self.rig_normalizations(df, modes, exclude_anomalies)
+        return _derived_view(
+            df,
+            {METRIC_COLUMNS[RIG_NORMALIZATION_MODES[m]]: v for m, v in normalized.items()},
+            copy=copy,
+        )
+
+    def rig_normalized_rates(
+        self, df: pd.DataFrame, exclude_anomalies=None, mode: str = "zscore"
+    ) -> np.ndarray:
+        """Per-rig z-scores of `tasa_penetracion` as a bare `float64` array.
+
+        The array behind `add_rig_normalized_rate`; `df` must contain
+        `perforadora`. `mode` selects another normalization (see
+        `rig_normalizations`).
+        """
+        return self.rig_normalizations(df, (mode,), exclude_anomalies)[mode]
+
+    def rig_normalizations(self, df: pd.DataFrame, modes, exclude_anomalies=None) -> dict:
+        """Several per-rig normalizations of `tasa_penetracion` at once.
+
+        The rigs are factorized and, for the robust modes, the rates
+        sorted by `(rig, rate)` only once, however many modes are asked
+        for:
+
+        - `"zscore"`: `rig_normalized_penetration` (mean/std);
+        - `"robust"`: `rig_robust_normalized_penetration` (median/MAD);
+        - `"percentile"`: `rig_percentile_rank`, NaN for a missing rate
+          or rig.
 
-        result = df.copy()
-        grouped = result.groupby("perforadora")["tasa_penetracion"]
+        Returns:
+            A dict mapping each mode to a `float64` array aligned with
+            the rows of `df`.
 
+        Raises:
+            ValueError: On an unknown mode.
+        """
+        for mode in modes:
+            if mode not in RIG_NORMALIZATION_MODES:
+                raise ValueError(f"Modo de normalización no soportado: {mode!r}")
+        codes, rigs = pd.factorize(df["perforadora"])
+        rates = df["tasa_penetracion"].to_numpy(dtype=float, na_value=np.nan)
+        reference = self._rig_stat_rates(df, exclude_anomalies)
+        # Rows without a rig (code -1) gather NaN statistics, which the
+        # vectorized helpers map to 0.0 like the scalar ones do.
+        has_rig = codes >= 0
+        normalized = {}
+
+        if "zscore" in modes:
+            # PARITY-DEBT: webapp/src/utils/dataProcessor.ts:addRigNormalizedRate
+            # — the TS port must mirror this groupby + std+epsilon guard (and
+            # has no anomaly exclusion yet).
+            _counts, means, stds = _grouped_rate_stats(codes, reference, len(rigs))
+            row_means = np.where(has_rig, means[codes], np.nan)
+            row_stds = np.where(has_rig, stds[codes], np.nan)
+            normalized["zscore"] = rig_normalized_penetration_array(rates, row_means, row_stds)
+
+        if "robust" in modes or "percentile" in modes:
+            # PARITY-DEBT: webapp/src/utils/dataProcessor.ts:addRigNormalizedRate
+            # — the TS port has only the mean/std mode; these mirror
+            # `rig_median_penetration` / `rig_mad_penetration` /
+            # `rig_percentile_rank` element for element.
+            groups = SortedGroups(codes, reference, len(rigs))
+        if "robust" in modes:
+            medians = groups.median()
+            mads = groups.mad(medians)
+            normalized["robust"] = rig_robust_normalized_penetration_array(
+                rates,
+                np.where(has_rig, medians[codes], np.nan),
+                np.where(has_rig, mads[codes], np.nan),
+            )
+        if "percentile" in modes:
+            ranks = groups.own_percentile_ranks()
+            # Rates left out of the statistics are ranked against them.
+            outside = np.flatnonzero(has_rig & np.isfinite(rates) & ~np.isfinite(reference))
+            if len(outside):
+                ranks[outside] = groups.percentile_ranks(codes[outside], rates[outside])
+            normalized["percentile"] = ranks
+        return {mode: normalized[mode] for mode in modes}
+
+    def hierarchical_normalizer(
+        self, df: pd.DataFrame, keys=None, prior=None, exclude_anomalies=None
+    ) -> HierarchicalNormalizer:
+        """Shrunk `tasa_penetracion` statistics over a key hierarchy.
+
+        `keys` (default `HIERARCHY_KEYS`) are columns or `TIME_KEYS`
+        buckets, coarsest first; `prior` defaults to `SHRINKAGE_PRIOR`.
+        Flagged anomalies are left out of the statistics as in
+        `add_rig_normalized_rate`. Build it once per dataset and reuse
+        it: z-scores and group tables are lookups from then on.
+        """
         # PARITY-DEBT: webapp/src/utils/dataProcessor.ts:addRigNormalizedRate
-        # — the TS port must mirror this groupby + std+epsilon guard.
-        means = grouped.transform(lambda s: rig_mean_penetration(s.tolist()))
-        # pandas std with ddof=1 matches the spec's "std <= ε → 0.0" guard
-        # because we delegate the epsilon check to the pure helper.
-        stds = grouped.transform(lambda s: _safe_std(s.tolist()))
-
-        result["tasa_penetracion_normalizada"] = [
-            rig_normalized_penetration(rate, avg, std)
-            for rate, avg, std in zip(
-                result["tasa_penetracion"], means, stds
+        # — the TS port only normalizes per rig, without shrinkage.
+        return HierarchicalNormalizer(
+            df,
+            self.HIERARCHY_KEYS if keys is None else keys,
+            prior=self.SHRINKAGE_PRIOR if prior is None else prior,
+            reference=self._rig_stat_rates(df, exclude_anomalies),
+        )
+
+    def add_hierarchical_normalized_rate(
+        self, df: pd.DataFrame, keys=None, prior=None, copy: bool = True, exclude_anomalies=None
+    ) -> pd.DataFrame:
+        """Add `tasa_penetracion_jerarquica`: z-scores per nested group.
+
+        Each row is standardized against the shrunk statistics of its
+        finest group (see `hierarchical_normalizer`); rows missing a
+        finer key fall back to their coarser group. `copy=False` returns
+        a shallow view, as in `add_rig_normalized_rate`.
+
+        Raises:
+            ValueError: When a key is neither a column nor a time bucket.
+        """
+        normalizer = self.hierarchical_normalizer(df, keys, prior, exclude_anomalies)
+        return _derived_view(df, {"tasa_penetracion_jerarquica": normalizer.zscores()}, copy=copy)
+
+
+def _pinned_formats(reports, formats):
+    """Per-column format lists with each sniffed format tried first."""
+    pinned = {}
+    for col, report in reports.items():
+        fmt = report["format"]
+        if fmt is not None:
+            pinned[col] = (fmt, *(f for f in formats if f != fmt))
+    return pinned
+
+
+def _merge_datetime_reports(chunk_reports):
+    """One `DatetimeParseReport` per time column from per-chunk reports.
+
+    The format is the first chunk's (later chunks are pinned to it);
+    counts add up and row lists are concatenated up to
+    `MAX_REPORTED_ROWS`.
+    """
+    merged = {}
+    for reports in chunk_reports:
+        for col, report in reports.items():
+            total = merged.setdefault(col, {
+                "format": report["format"],
+                "ambiguous": False,
+                "fallback_rows": 0,
+                "inferred_rows": [],
+                "inferred_count": 0,
+                "failed_rows": [],
+                "failed_count": 0,
+            })
+            total["ambiguous"] = total["ambiguous"] or report["ambiguous"]
+            for key in ("fallback_rows", "inferred_count", "failed_count"):
+                total[key] += report[key]
+            for key in ("inferred_rows", "failed_rows"):
+                total[key] = (total[key] + report[key])[:MAX_REPORTED_ROWS]
+    return merged
+
+
+def _log_bad_lines(captured):
+    """Log the malformed lines the chunked CSV reader skipped.
+
+    `captured` is the list recorded by `warnings.catch_warnings`.
+    Returns the skipped line numbers.
+    """
+    bad_lines = skipped_lines_from_warnings(captured)
+    if bad_lines:
+        logging.warning(
+            "Se descartaron %d filas con esquema inválido "
+            "(campos extra o faltantes respecto al header). Líneas: %s",
+            len(bad_lines),
+            bad_lines[:20],
+        )
+    return bad_lines
+
+
+def hardness_categorical(codes) -> pd.Categorical:
+    """`dureza` as an ordered categorical from `classify_codes` output.
+
+    Missing codes (`-1`) become NaN, matching the `None` label.
+    """
+    return pd.Categorical.from_codes(np.asarray(codes), dtype=HARDNESS_DTYPE)
+
+
+def compact_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """Shallow copy of `df` with a compact in-memory representation.
+
+    - `dureza` becomes a `HARDNESS_DTYPE` categorical (int8 codes).
+    - Other object columns holding low-cardinality strings (rig, drill
+      pattern, ...) become categoricals with object-dtype categories.
+    - `float64` columns become `float32` only when every value survives
+      the round trip unchanged, so classifications cannot shift.
+
+    Nothing is converted to Arrow-backed strings (see the
+    `future.infer_string` workaround at the top of this module).
+    """
+    compact = {}
+    for col in df.columns:
+        values = df[col]
+        if col == "dureza" and values.dtype == object:
+            compact[col] = pd.Categorical(values, dtype=HARDNESS_DTYPE)
+        elif values.dtype == np.float64:
+            narrowed = values.to_numpy().astype(np.float32)
+            if np.array_equal(narrowed.astype(np.float64), values.to_numpy(), equal_nan=True):
+                compact[col] = narrowed
+        elif values.dtype == object and pd.api.types.infer_dtype(values) == "string":
+            uniques = values.dropna().unique()
+            if len(uniques) <= CATEGORY_MAX_UNIQUE_RATIO * len(values):
+                categories = pd.Index(np.sort(uniques), dtype=object)
+                compact[col] = pd.Categorical(values, categories=categories)
+    return _derived_view(df, compact, copy=False)
+
+
+def _metric_values(df: pd.DataFrame, metric: Metric):
+    """The source column of `metric` as a float array (missing -> NaN).
+
+    Raises:
+        ValueError: When `metric` is unknown or its source column is
+            missing.
+    """
+    if metric not in METRIC_COLUMNS:
+        raise ValueError(f"Unknown metric {metric!r}")
+    column = METRIC_COLUMNS[metric]
+    if column not in df.columns:
+        if metric in RIG_NORMALIZATION_MODES.values():
+            raise ValueError(
+                f"{metric} requires the '{column}' column. Call "
+                "add_rig_normalized_rate first."
             )
-        ]
-        return result
+        raise ValueError(
+            f"La métrica {metric!r} requiere la columna '{column}'."
+        )
+    return df[column].to_numpy(dtype=float, na_value=np.nan)
+
+
+def _derived_view(df: pd.DataFrame, derived: dict, copy: bool = True) -> pd.DataFrame:
+    """Return `df` plus `derived` columns without mutating `df`.
+
+    `copy=True` deep-copies `df` first (the historical behaviour).
+    `copy=False` builds a shallow frame: the input columns are shared
+    with `df` and only the derived arrays are new memory. Assigning a
+    column on the shallow frame never touches `df`; in-place edits of
+    shared columns are isolated by pandas copy-on-write, always on from
+    pandas 3.0. On pandas 2 the calling process has to enable
+    `mode.copy_on_write` itself (the Streamlit app does); see the README.
+    """
+    result = df.copy(deep=copy)
+    for column, values in derived.items():
+        result[column] = values
+    return result
+
 
+def _grouped_rate_stats(codes, rates, n_groups):
+    """Per-group count, mean and sample std (ddof=1) of finite rates.
 
-def _safe_std(values) -> float:
-    """Population std of finite values, NaN-free.
+    `codes` are integer group codes as returned by `pd.factorize`
+    (`-1` for a missing key, which is ignored). Non-finite rates are
+    skipped. Groups with no finite rate get a NaN mean; groups with
+    fewer than two get a 0.0 std so the `STD_EPSILON` guard maps their
+    rows to 0.0. The moments come from `group_statistics.grouped_moments`
+    (one `np.bincount` pass each).
 
-    Returns 0.0 when fewer than two finite values exist. We use a small
-    helper instead of `pd.Series.std` so the parity contract stays
-    explicit about which entries contribute.
+    Returns:
+        `(counts, means, stds)` arrays of length `n_groups`.
     """
-    finite = [v for v in values if v is not None and math.isfinite(v)]
-    if len(finite) < 2:
-        return 0.0
-    mean = sum(finite) / len(finite)
-    variance = sum((v - mean) ** 2 for v in finite) / (len(finite) - 1)
-    return math.sqrt(variance)
\ No newline at end of file
+    counts, means, m2 = grouped_moments(codes, rates, n_groups)
+    return counts, means, moments_to_std(counts, m2)
@@ -0,0 +1,196 @@
+"""Explicit-format parsing for the `tiempo inicio` / `tiempo final` columns.
+
+`pd.to_datetime` without a format has to infer one, and falls back to
+per-element parsing when rows disagree; on long rig exports that
+dominates load time. Here the format is sniffed once from a sample of
+rows against a list of known rig-export formats, the column is parsed
+with that explicit format (pandas memoizes repeated strings via
+`cache=True`), and only the rows that do not match go through the slow
+per-element path. Rows that path parses are reported (per-element
+inference can read day and month in the other order than the sniffed
+format), and rows that still cannot be parsed become `NaT` and are
+reported instead of failing the whole file.
+"""
+
+from typing import TypedDict
+
+import numpy as np
+import pandas as pd
+
+# Formats seen in rig exports, tried in order. Day-first and month-first
+# layouts are ambiguous when every day is <= 12; the first matching entry
+# wins, so the month-first layouts come first, as in `pd.to_datetime`'s
+# own inference (how these columns were parsed before explicit formats).
+# A sample that only some day-first rows can parse (a day > 12) still
+# picks the day-first layout.
+KNOWN_DATETIME_FORMATS: tuple = (
+    "%Y/%m/%d %H:%M",
+    "%Y/%m/%d %H:%M:%S",
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%d %H:%M:%S.%f",
+    "%m/%d/%Y %H:%M",
+    "%m/%d/%Y %H:%M:%S",
+    "%m-%d-%Y %H:%M",
+    "%m-%d-%Y %H:%M:%S",
+    "%d/%m/%Y %H:%M",
+    "%d/%m/%Y %H:%M:%S",
+    "%d-%m-%Y %H:%M",
+    "%d-%m-%Y %H:%M:%S",
+)
+
+# The same formats with day-first layouts preferred, for exports known to
+# be day-first (e.g. `DataProcessor.DATETIME_FORMATS = DAYFIRST_DATETIME_FORMATS`).
+DAYFIRST_DATETIME_FORMATS: tuple = (
+    *KNOWN_DATETIME_FORMATS[:6],
+    *KNOWN_DATETIME_FORMATS[10:],
+    *KNOWN_DATETIME_FORMATS[6:10],
+)
+
+# Rows sampled (evenly spaced) to sniff a column's format.
+SNIFF_SAMPLE_SIZE = 200
+
+# At most this many failing row positions are kept in a report.
+MAX_REPORTED_ROWS = 1_000
+
+
+class DatetimeParseReport(TypedDict):
+    """Outcome of `parse_datetime_column`.
+
+    `format` is the sniffed explicit format (`None` when no known format
+    matched the sample, or when the column was already datetime), and
+    `ambiguous` is true when another candidate parses the same sampled
+    rows to different dates (day/month order decided by priority only).
+    `fallback_rows` counts rows the sniffed format did not parse;
+    `inferred_rows` lists the positions (0-based, at most
+    `MAX_REPORTED_ROWS`) of those that matched no known format either and
+    were parsed by per-element inference, and `inferred_count` their
+    total. `failed_rows` / `failed_count` do the same for the rows that
+    ended as `NaT`.
+    """
+
+    format: str | None
+    ambiguous: bool
+    fallback_rows: int
+    inferred_rows: list
+    inferred_count: int
+    failed_rows: list
+    failed_count: int
+
+
+def _sample(values: pd.Series, size: int) -> pd.Series:
+    present = values.dropna()
+    if len(present) <= size:
+        return present
+    positions = np.linspace(0, len(present) - 1, size, dtype=np.int64)
+    return present.iloc[positions]
+
+
+def sniff_datetime_format(values, formats=KNOWN_DATETIME_FORMATS, sample_size=SNIFF_SAMPLE_SIZE):
+    """Return the format in `formats` that parses most of a row sample.
+
+    Args:
+        values: Array-like of datetime strings.
+        formats: Candidate `strftime` formats, in priority order (ties
+            go to the earlier one).
+        sample_size: Number of evenly spaced non-null rows to test.
+
+    Returns:
+        The best format, or `None` when no candidate parses any sampled
+        value.
+    """
+    sample = _sample(pd.Series(values, copy=False), sample_size)
+    best, best_count = None, 0
+    for fmt in formats:
+        count = int(pd.to_datetime(sample, format=fmt, errors="coerce").notna().sum())
+        if count > best_count:
+            best, best_count = fmt, count
+            if count == len(sample):
+                break
+    return best
+
+
+def is_ambiguous_format(values, fmt, formats=KNOWN_DATETIME_FORMATS, sample_size=SNIFF_SAMPLE_SIZE):
+    """Whether another format in `formats` reads the sample as well as `fmt`
+    but to different dates (e.g. `05/10/2024` as May 10 or October 5)."""
+    sample = _sample(pd.Series(values, copy=False), sample_size)
+    chosen = pd.to_datetime(sample, format=fmt, errors="coerce")
+    for other in formats:
+        if other == fmt:
+            continue
+        parsed = pd.to_datetime(sample, format=other, errors="coerce")
+        same_rows = (parsed.notna() == chosen.notna()).all()
+        if same_rows and (parsed[chosen.notna()] != chosen[chosen.notna()]).any():
+            return True
+    return False
+
+
+def parse_datetime_column(values, formats=KNOWN_DATETIME_FORMATS, first_row=0):
+    """Parse a datetime column with a sniffed explicit format.
+
+    Args:
+        values: A pandas Series of strings (or already-parsed datetimes).
+        formats: Candidate formats for `sniff_datetime_format`.
+        first_row: Position of the first value in the whole file, added
+            to the reported row positions (for chunked reads).
+
+    Returns:
+        `(parsed, report)` where `parsed` is a `datetime64` Series
+        aligned with `values` and `report` a `DatetimeParseReport`.
+
+    Raises:
+        ValueError: When no non-null value in the column can be parsed,
+            which means the column does not hold dates at all.
+    """
+    values = pd.Series(values, copy=False)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values, {
+            "format": None,
+            "ambiguous": False,
+            "fallback_rows": 0,
+            "inferred_rows": [],
+            "inferred_count": 0,
+            "failed_rows": [],
+            "failed_count": 0,
+        }
+
+    present = values.notna()
+    fmt = sniff_datetime_format(values, formats)
+    if fmt is None:
+        parsed = pd.Series(pd.NaT, index=values.index, dtype="datetime64[us]")
+    else:
+        parsed = pd.to_datetime(values, format=fmt, errors="coerce", cache=True)
+
+    pending = parsed.isna() & present
+    fallback_rows = int(pending.sum())
+    inferred = np.zeros(0, dtype=np.int64)
+    if fallback_rows:
+        # Slow path, restricted to the rows the sniffed format missed:
+        # the other known formats first, then per-element inference.
+        for other in formats:
+            if other == fmt or not pending.any():
+                continue
+            retried = pd.to_datetime(values[pending], format=other, errors="coerce")
+            parsed[retried.dropna().index] = retried.dropna()
+            pending = parsed.isna() & present
+        if pending.any():
+            parsed[pending] = pd.to_datetime(
+                values[pending].astype(str).str.strip(), format="mixed", errors="coerce"
+            )
+            inferred = np.flatnonzero((pending & parsed.notna()).to_numpy())
+
+    failed = np.flatnonzero((parsed.isna() & present).to_numpy())
+    if len(failed) and len(failed) == int(present.sum()):
+        raise ValueError(
+            f"Ningún valor de la columna '{values.name}' tiene un formato de fecha reconocible."
+        )
+    return parsed, {
+        "format": fmt,
+        "ambiguous": fmt is not None and is_ambiguous_format(values, fmt, formats),
+        "fallback_rows": fallback_rows,
+        "inferred_rows": (first_row + inferred[:MAX_REPORTED_ROWS]).tolist(),
+        "inferred_count": int(len(inferred)),
+        "failed_rows": (first_row + failed[:MAX_REPORTED_ROWS]).tolist(),
+        "failed_count": int(len(failed)),
+    }
@@ -0,0 +1,100 @@
+"""Deterministic level-of-detail decimation for the scatter plots.
+
+Plotting every hole of a 300k-row export as its own marker stalls the
+browser and inflates the Streamlit websocket payload. `grid_decimate`
+picks a subset of at most `budget` rows that still covers the whole
+`este`/`norte` extent: the plane is split into a grid of roughly
+`budget` cells and each occupied cell keeps the same number of rows
+(its `k` highest-priority ones), with `k` as large as the budget allows.
+Dense areas are thinned, isolated holes always survive.
+
+The selection depends only on the input values (ties go to the earlier
+row), so repeated renders of the same data draw the same points.
+"""
+
+import math
+
+import numpy as np
+
+# Default maximum number of markers per scatter trace set.
+DEFAULT_POINT_BUDGET = 50_000
+
+
+def _grid_cells(x, y, budget):
+    """Cell id per point on a grid of at most `budget` cells."""
+    x_min, x_max = x.min(), x.max()
+    y_min, y_max = y.min(), y.max()
+    width = max(x_max - x_min, 0.0)
+    height = max(y_max - y_min, 0.0)
+    if width == 0 and height == 0:
+        return np.zeros(len(x), dtype=np.int64)
+    # Square-ish cells: split the budget according to the aspect ratio.
+    if width == 0:
+        nx, ny = 1, budget
+    elif height == 0:
+        nx, ny = budget, 1
+    else:
+        nx = min(budget, max(1, int(math.sqrt(budget * width / height))))
+        ny = max(1, budget // nx)
+    col = np.minimum(((x - x_min) / (width or 1.0) * nx).astype(np.int64), nx - 1)
+    row = np.minimum(((y - y_min) / (height or 1.0) * ny).astype(np.int64), ny - 1)
+    return row * nx + col
+
+
+def _per_cell_quota(counts, budget):
+    """Largest `k` with `sum(min(counts, k)) <= budget` (at least 1)."""
+    counts = np.sort(counts)
+    # Kept rows when every cell is capped at counts[i]: the cells below
+    # keep all of theirs, the rest keep counts[i] each.
+    below = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    kept = below + counts * (len(counts) - np.arange(len(counts)))
+    fits = np.flatnonzero(kept <= budget)
+    if len(fits) == 0:
+        return max(1, budget // len(counts))
+    i = fits[-1]
+    if i == len(counts) - 1:
+        return int(counts[-1])
+    # Between counts[i] and counts[i + 1], each step adds one row to
+    # every cell above i.
+    extra = (budget - kept[i]) // (len(counts) - i - 1)
+    return int(min(counts[i] + extra, counts[i + 1]))
+
+
+def grid_decimate(x, y, budget=DEFAULT_POINT_BUDGET, priority=None):
+    """Indices of at most `budget` rows spread over the x/y extent.
+
+    Args:
+        x, y: Coordinate arrays. Rows with a non-finite coordinate are
+            never selected (they cannot be drawn anyway).
+        budget: Maximum number of rows to keep.
+        priority: Optional array; inside each cell higher values are
+            kept first (e.g. distance of `indice_dureza` from the
+            middle, so extreme-hardness holes survive). NaN counts as
+            the lowest priority.
+
+    Returns:
+        Sorted `int64` row positions. When every drawable row fits in
+        the budget they are all returned.
+    """
+    if budget < 1:
+        raise ValueError("El presupuesto de puntos debe ser al menos 1.")
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    drawable = np.flatnonzero(np.isfinite(x) & np.isfinite(y))
+    if len(drawable) <= budget:
+        return drawable
+
+    cells = _grid_cells(x[drawable], y[drawable], budget)
+    if priority is None:
+        rank_key = np.zeros(len(drawable))
+    else:
+        rank_key = np.asarray(priority, dtype=float)[drawable]
+        rank_key = np.where(np.isnan(rank_key), -np.inf, rank_key)
+    # Sort by cell, then priority (descending), then row order.
+    order = np.lexsort((drawable, -rank_key, cells))
+    sorted_cells = cells[order]
+    starts = np.flatnonzero(np.r_[True, sorted_cells[1:] != sorted_cells[:-1]])
+    counts = np.diff(np.r_[starts, len(order)])
+    quota = _per_cell_quota(counts, budget)
+    rank_in_cell = np.arange(len(order)) - np.repeat(starts, counts)
+    return np.sort(drawable[order[rank_in_cell < quota]])
@@ -0,0 +1,140 @@
+"""Precomputed row indexes for the sidebar filters.
+
+Filtering the processed frame with `isin` and datetime comparisons
+scans every row on each Streamlit rerun. `FilterIndex` does that work
+once per dataset:
+
+- `tiempo inicio` is argsorted, so a date range is two `searchsorted`
+  calls and a slice of the ordering;
+- every categorical filter column (`perforadora`, `drill_pattern`) keeps
+  the ascending row positions of each value, so a multiselect is a
+  union of precomputed arrays;
+- the sorted distinct values of those columns are kept for the
+  multiselect options.
+
+Filters combine by intersecting row-position arrays, starting from the
+smallest one. All results are row *positions*, sorted ascending, like
+`SpatialIndex`.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Categorical columns indexed when present.
+FILTER_COLUMNS: tuple = ("perforadora", "drill_pattern")
+
+
+class FilterIndex:
+    """Date and categorical row indexes over a processed DataFrame.
+
+    Values of the categorical columns are compared as strings (as the
+    multiselects show them); missing values never match a selection.
+    Rows with a missing `tiempo inicio` never match a date range.
+    """
+
+    def __init__(self, df, time_column="tiempo inicio", columns=FILTER_COLUMNS):
+        self.size = len(df)
+        self.time_column = time_column
+        times = pd.to_datetime(df[time_column]).to_numpy(dtype="datetime64[ns]")
+        dated = np.flatnonzero(~np.isnat(times))
+        order = np.argsort(times[dated], kind="stable")
+        self._time_order = dated[order]
+        self._sorted_times = times[self._time_order]
+
+        self._values = {}
+        self._rows = {}
+        for column in columns:
+            if column not in df.columns:
+                continue
+            series = df[column]
+            present = np.flatnonzero(series.notna().to_numpy())
+            labels = series.iloc[present].astype(str).to_numpy(dtype=object)
+            codes, uniques = pd.factorize(labels, sort=True)
+            # A stable sort by code keeps each value's rows ascending.
+            by_code = np.argsort(codes, kind="stable")
+            bounds = np.searchsorted(codes[by_code], np.arange(len(uniques) + 1))
+            grouped = present[by_code]
+            self._values[column] = [str(value) for value in uniques]
+            self._rows[column] = {
+                str(value): grouped[bounds[i]:bounds[i + 1]]
+                for i, value in enumerate(uniques)
+            }
+
+    @property
+    def min_time(self):
+        """Earliest `tiempo inicio` as a `pd.Timestamp` (`NaT` if none)."""
+        return pd.Timestamp(self._sorted_times[0]) if len(self._sorted_times) else pd.NaT
+
+    @property
+    def max_time(self):
+        """Latest `tiempo inicio` as a `pd.Timestamp` (`NaT` if none)."""
+        return pd.Timestamp(self._sorted_times[-1]) if len(self._sorted_times) else pd.NaT
+
+    def has_column(self, column):
+        """Whether `column` was present and indexed."""
+        return column in self._values
+
+    def values(self, column):
+        """Sorted distinct values (as strings) of an indexed column."""
+        return self._values[column]
+
+    def date_range(self, start, end):
+        """Rows with `start <= tiempo inicio <= end` (inclusive)."""
+        lo = np.searchsorted(
+            self._sorted_times, pd.Timestamp(start).to_datetime64().astype("datetime64[ns]"), "left"
+        )
+        hi = np.searchsorted(
+            self._sorted_times, pd.Timestamp(end).to_datetime64().astype("datetime64[ns]"), "right"
+        )
+        if lo == 0 and hi == self.size:
+            # Every row is dated and inside the range (the default view).
+            return np.arange(self.size, dtype=np.int64)
+        return np.sort(self._time_order[lo:hi])
+
+    def rows_for(self, column, selected):
+        """Rows whose `column` value is one of `selected`."""
+        groups = self._rows[column]
+        pieces = [groups[str(value)] for value in selected if str(value) in groups]
+        if not pieces:
+            return np.zeros(0, dtype=np.int64)
+        # The per-value arrays are disjoint, so this is a plain merge.
+        return np.sort(np.concatenate(pieces))
+
+    def select(self, start=None, end=None, selections=None, extra=()):
+        """Rows matching every given filter.
+
+        Args:
+            start, end: Inclusive `tiempo inicio` bounds; both `None`
+                skips the date filter.
+            selections: `{column: values}`; empty value lists are
+                ignored (they mean "all" in the multiselects).
+            extra: Further sorted row-position arrays to intersect
+                (e.g. a `SpatialIndex` region).
+
+        Returns:
+            Sorted row positions; every row when no filter applies.
+        """
+        parts = [np.asarray(rows, dtype=np.int64) for rows in extra]
+        if start is not None or end is not None:
+            parts.append(self.date_range(
+                start if start is not None else self.min_time,
+                end if end is not None else self.max_time,
+            ))
+        for column, selected in (selections or {}).items():
+            if selected and column in self._rows:
+                parts.append(self.rows_for(column, selected))
+        if not parts:
+            return np.arange(self.size, dtype=np.int64)
+        parts.sort(key=len)
+        rows = parts[0]
+        for other in parts[1:]:
+            if len(rows) == 0:
+                break
+            rows = rows[self.mask(other)[rows]]
+        return rows
+
+    def mask(self, rows):
+        """Boolean array of length `size` that is true at `rows`."""
+        result = np.zeros(self.size, dtype=bool)
+        result[rows] = True
+        return result
@@ -0,0 +1,439 @@
+"""Mergeable per-group moments for streaming and batch rig statistics.
+
+`add_rig_normalized_rate` needs each rig's mean and sample std of
+`tasa_penetracion`. When the data arrives in pieces (CSV chunks, shift
+files, worker processes) those statistics are accumulated as
+`(count, mean, M2)` triples and combined with Chan et al.'s parallel
+form of Welford's update, so no piece ever has to be revisited.
+
+Semantics match the batch adapter: only finite values count, the std
+uses `ddof=1` and is `0.0` below two samples, and a group with no
+finite value has a NaN mean.
+
+Robust statistics (median, MAD, quartiles) have no such exact merge, so
+`RunningGroupQuantiles` keeps a fixed log-spaced histogram per group
+instead: chunks and workers add their bin counts, and the quantiles are
+read back by interpolating the cumulative counts, to within one bin
+(about 1% relative) of the exact values. When the rows are all in
+memory, `SortedGroups` sorts them by `(group, value)` once and reads
+exact medians, MADs and percentile ranks off that order.
+"""
+
+from abc import ABC, abstractmethod
+
+import numpy as np
+import pandas as pd
+
+from classification import rig_normalized_penetration_array
+
+
+def grouped_moments(codes, values, n_groups):
+    """Per-group `(counts, means, m2)` of finite `values` in one pass.
+
+    `codes` are integer group codes as returned by `pd.factorize`
+    (`-1` for a missing key, which is ignored). `m2` is the sum of
+    squared deviations from the group mean (two-pass, for stability).
+    Groups without a finite value get `count=0`, `mean=NaN`, `m2=0`.
+    """
+    codes = np.asarray(codes)
+    values = np.asarray(values, dtype=float)
+    valid = (codes >= 0) & np.isfinite(values)
+    group = codes[valid]
+    kept = values[valid]
+    counts = np.bincount(group, minlength=n_groups)
+    sums = np.bincount(group, weights=kept, minlength=n_groups)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        means = sums / counts
+    deviations = kept - means[group]
+    m2 = np.bincount(group, weights=deviations * deviations, minlength=n_groups)
+    return counts, means, m2
+
+
+def moments_to_std(counts, m2):
+    """Sample std (`ddof=1`) from counts and M2; `0.0` below two samples."""
+    counts = np.asarray(counts)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        variances = np.asarray(m2) / (counts - 1)
+    return np.where(counts >= 2, np.sqrt(np.maximum(variances, 0.0)), 0.0)
+
+
+def merge_moments(count_a, mean_a, m2_a, count_b, mean_b, m2_b):
+    """Combine two sets of `(count, mean, M2)` arrays (Chan et al.).
+
+    Empty sides are handled explicitly so a NaN mean from a group with
+    no finite value never poisons the other side.
+    """
+    count_a = np.asarray(count_a)
+    count_b = np.asarray(count_b)
+    total = count_a + count_b
+    both = (count_a > 0) & (count_b > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        delta = mean_b - mean_a
+        share = np.where(both, count_b / total, 0.0)
+        mean = np.where(
+            count_a == 0,
+            mean_b,
+            np.where(count_b == 0, mean_a, mean_a + delta * share),
+        )
+        m2 = m2_a + m2_b + np.where(both, delta * delta * count_a * share, 0.0)
+    return total, mean, m2
+
+
+def _group_sort(codes, values):
+    """Positions of `values` sorted by `(codes, value)`.
+
+    A float argsort, then a stable argsort of the integer codes, which
+    numpy runs as a radix sort for int16 (faster than `np.lexsort`).
+    """
+    by_value = np.argsort(values, kind="stable")
+    codes = codes[by_value]
+    if len(codes) and codes.max() < np.iinfo(np.int16).max:
+        codes = codes.astype(np.int16)
+    return by_value[np.argsort(codes, kind="stable")]
+
+
+class SortedGroups:
+    """Finite values sorted by `(group, value)` once, for exact order statistics.
+
+    The batch counterpart of `RunningGroupQuantiles`: medians, MADs and
+    percentile ranks of every group come from one sort of the rows, so a
+    caller needing several of them (e.g. the rig normalization modes)
+    pays for the sort only once. `codes` follow the `grouped_moments`
+    convention (`-1` ignored).
+    """
+
+    def __init__(self, codes, values, n_groups):
+        codes = np.asarray(codes, dtype=np.int64)
+        values = np.asarray(values, dtype=float)
+        rows = np.flatnonzero((codes >= 0) & np.isfinite(values))
+        order = _group_sort(codes[rows], values[rows])
+        self.size = len(values)
+        self.values = values[rows][order]
+        self.counts = np.bincount(codes[rows], minlength=n_groups)
+        self.starts = np.concatenate([[0], np.cumsum(self.counts)[:-1]]).astype(np.int64)
+        self._rows = rows[order]
+        self._codes = codes[rows][order]
+
+    def _median_of(self, values):
+        """Per-group median of `values` laid out like `self.values`."""
+        present = self.counts > 0
+        lower = self.starts + (self.counts - 1) // 2
+        upper = self.starts + self.counts // 2
+        median = np.full(len(self.counts), np.nan)
+        median[present] = (values[lower[present]] + values[upper[present]]) / 2.0
+        return median
+
+    def median(self) -> np.ndarray:
+        """Per-group median (mean of the middle pair); NaN when empty."""
+        return self._median_of(self.values)
+
+    def mad(self, median=None) -> np.ndarray:
+        """Per-group unscaled median absolute deviation; NaN when empty."""
+        if median is None:
+            median = self.median()
+        deviations = np.abs(self.values - median[self._codes])
+        return self._median_of(deviations[_group_sort(self._codes, deviations)])
+
+    def own_percentile_ranks(self) -> np.ndarray:
+        """`percentile_ranks` of the rows the groups were built from.
+
+        Aligned with those rows (NaN for the ones left out), and read
+        straight off the sorted layout: each run of equal values ranks
+        `(run start - group start + 0.5 * run length) / count`.
+        """
+        ranks = np.full(self.size, np.nan)
+        if len(self.values) == 0:
+            return ranks
+        new_run = np.ones(len(self.values), dtype=bool)
+        new_run[1:] = (self.values[1:] != self.values[:-1]) | (self._codes[1:] != self._codes[:-1])
+        run_starts = np.flatnonzero(new_run)
+        run_lengths = np.diff(np.append(run_starts, len(self.values)))
+        run = np.cumsum(new_run) - 1
+        below = run_starts[run] - self.starts[self._codes]
+        below_or_equal = below + run_lengths[run]
+        ranks[self._rows] = (below + below_or_equal) / (2.0 * self.counts[self._codes])
+        return ranks
+
+    def percentile_ranks(self, codes, values) -> np.ndarray:
+        """Mid-rank percentile of each row within its group, in `[0, 1]`.
+
+        `(below + 0.5 * equal) / count` against the group's values; NaN
+        for a missing key or value, or an empty group.
+        """
+        codes = np.asarray(codes, dtype=np.int64)
+        values = np.asarray(values, dtype=float)
+        ranks = np.full(len(values), np.nan)
+        rows = np.flatnonzero((codes >= 0) & np.isfinite(values))
+        # Sorted queries keep the binary searches cache-friendly.
+        rows = rows[_group_sort(codes[rows], values[rows])]
+        bounds = np.searchsorted(codes[rows], np.arange(len(self.counts) + 1))
+        for group in np.flatnonzero(self.counts):
+            lo, hi = bounds[group], bounds[group + 1]
+            if hi == lo:
+                continue
+            start = self.starts[group]
+            reference = self.values[start:start + self.counts[group]]
+            query = values[rows[lo:hi]]
+            below = np.searchsorted(reference, query, side="left")
+            below_or_equal = np.searchsorted(reference, query, side="right")
+            ranks[rows[lo:hi]] = (below + below_or_equal) / (2.0 * len(reference))
+        return ranks
+
+
+class _GroupSlots(ABC):
+    """Key -> slot bookkeeping shared by the running accumulators."""
+
+    def __init__(self):
+        self._slots: dict = {}
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    @property
+    def keys(self) -> list:
+        return list(self._slots)
+
+    @abstractmethod
+    def _grow(self, grow: int) -> None:
+        """Append `grow` empty slots to the per-group arrays."""
+
+    def _slot_indices(self, keys) -> np.ndarray:
+        """Slot index for each key, registering unseen keys."""
+        indices = np.empty(len(keys), dtype=np.int64)
+        size = len(self._slots)
+        for position, key in enumerate(keys):
+            slot = self._slots.get(key)
+            if slot is None:
+                slot = len(self._slots)
+                self._slots[key] = slot
+            indices[position] = slot
+        if len(self._slots) > size:
+            self._grow(len(self._slots) - size)
+        return indices
+
+    def row_slots(self, keys) -> np.ndarray:
+        """Row-aligned slot positions (`-1` for unknown or missing keys)."""
+        slots = pd.Series(keys, copy=False).map(self._slots)
+        return slots.fillna(-1).to_numpy(dtype=np.int64)
+
+
+class RunningGroupStats(_GroupSlots):
+    """Running per-group count / mean / std of a numeric column.
+
+    Groups are identified by hashable keys (rig names, or tuples for
+    composite keys). `update` folds in a batch of rows, `merge` folds in
+    another accumulator (e.g. from a worker process); both cost
+    O(rows in the batch) plus O(groups).
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._counts = np.zeros(0, dtype=np.int64)
+        self._means = np.zeros(0, dtype=float)
+        self._m2 = np.zeros(0, dtype=float)
+
+    def _grow(self, grow: int) -> None:
+        self._counts = np.concatenate([self._counts, np.zeros(grow, dtype=np.int64)])
+        self._means = np.concatenate([self._means, np.full(grow, np.nan)])
+        self._m2 = np.concatenate([self._m2, np.zeros(grow)])
+
+    def _fold(self, slots, counts, means, m2) -> None:
+        total, mean, merged_m2 = merge_moments(
+            self._counts[slots], self._means[slots], self._m2[slots],
+            counts, means, m2,
+        )
+        self._counts[slots] = total
+        self._means[slots] = mean
+        self._m2[slots] = merged_m2
+
+    def update(self, keys, values) -> "RunningGroupStats":
+        """Fold a batch of `(key, value)` rows into the running moments.
+
+        Rows with a missing key are ignored; non-finite values register
+        the key but do not contribute to its moments.
+        """
+        codes, uniques = pd.factorize(pd.Series(keys, copy=False))
+        if len(uniques) == 0:
+            return self
+        counts, means, m2 = grouped_moments(
+            codes, pd.Series(values, copy=False).to_numpy(dtype=float, na_value=np.nan),
+            len(uniques),
+        )
+        self._fold(self._slot_indices(list(uniques)), counts, means, m2)
+        return self
+
+    def merge(self, other: "RunningGroupStats") -> "RunningGroupStats":
+        """Fold another accumulator's moments into this one."""
+        if len(other) == 0:
+            return self
+        slots = self._slot_indices(other.keys)
+        self._fold(slots, other._counts, other._means, other._m2)
+        return self
+
+    def state(self) -> dict:
+        """JSON-serializable moments (`keys`, `counts`, `means`, `m2`)."""
+        return {
+            "keys": self.keys,
+            "counts": self._counts.tolist(),
+            "means": [None if np.isnan(m) else m for m in self._means.tolist()],
+            "m2": self._m2.tolist(),
+        }
+
+    @classmethod
+    def from_state(cls, state: dict) -> "RunningGroupStats":
+        """Rebuild an accumulator saved with `state`.
+
+        JSON turns tuple keys into lists; they are turned back into
+        tuples.
+        """
+        stats = cls()
+        keys = [tuple(k) if isinstance(k, list) else k for k in state["keys"]]
+        stats._slot_indices(keys)
+        stats._counts[:] = state["counts"]
+        stats._means[:] = [np.nan if m is None else m for m in state["means"]]
+        stats._m2[:] = state["m2"]
+        return stats
+
+    def to_frame(self) -> pd.DataFrame:
+        """Per-group `count`, `mean` and `std` indexed by key."""
+        return pd.DataFrame(
+            {
+                "count": self._counts,
+                "mean": self._means,
+                "std": moments_to_std(self._counts, self._m2),
+            },
+            index=pd.Index(self.keys, tupleize_cols=False),
+        )
+
+    def lookup(self, keys):
+        """Row-aligned `(means, stds)` for `keys`; unknown keys get NaN."""
+        positions = self.row_slots(keys)
+        if len(self) == 0:
+            missing = np.full(len(positions), np.nan)
+            return missing, missing.copy()
+        known = positions >= 0
+        stds = moments_to_std(self._counts, self._m2)
+        row_means = np.where(known, self._means[positions], np.nan)
+        row_stds = np.where(known, stds[positions], np.nan)
+        return row_means, row_stds
+
+    def normalize(self, keys, values) -> np.ndarray:
+        """Z-score `values` against their group's running mean and std.
+
+        Same guards as `rig_normalized_penetration`: non-finite inputs,
+        unknown groups and `std <= STD_EPSILON` map to 0.0.
+        """
+        means, stds = self.lookup(keys)
+        return rig_normalized_penetration_array(
+            pd.Series(values, copy=False).to_numpy(dtype=float, na_value=np.nan),
+            means,
+            stds,
+        )
+
+
+# Log-spaced histogram layout of `RunningGroupQuantiles`: `SKETCH_BINS`
+# bins over 10**-4 .. 10**6 (about 1.1% wide each). Durations in minutes
+# and rates in m/min both fall well inside; values outside are clipped
+# into the edge bins.
+SKETCH_BINS = 2048
+SKETCH_LOG10_RANGE: tuple = (-4.0, 6.0)
+SKETCH_EDGES = np.logspace(*SKETCH_LOG10_RANGE, SKETCH_BINS + 1)
+
+
+class RunningGroupQuantiles(_GroupSlots):
+    """Running per-group quantiles of a positive column (histogram sketch).
+
+    Only finite, strictly positive values are counted. `update` and
+    `merge` add bin counts (O(rows) plus O(groups x bins)); quantiles and
+    the MAD assume values spread uniformly inside each bin.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._hist = np.zeros((0, SKETCH_BINS), dtype=np.int64)
+
+    def _grow(self, grow: int) -> None:
+        self._hist = np.vstack([self._hist, np.zeros((grow, SKETCH_BINS), dtype=np.int64)])
+
+    def update(self, keys, values) -> "RunningGroupQuantiles":
+        """Fold a batch of `(key, value)` rows into the histograms."""
+        codes, uniques = pd.factorize(pd.Series(keys, copy=False))
+        if len(uniques) == 0:
+            return self
+        values = pd.Series(values, copy=False).to_numpy(dtype=float, na_value=np.nan)
+        kept = (codes >= 0) & np.isfinite(values) & (values > 0)
+        lo, hi = SKETCH_LOG10_RANGE
+        bins = (np.log10(values[kept]) - lo) * (SKETCH_BINS / (hi - lo))
+        bins = np.clip(bins.astype(np.int64), 0, SKETCH_BINS - 1)
+        counts = np.bincount(
+            codes[kept] * SKETCH_BINS + bins, minlength=len(uniques) * SKETCH_BINS
+        ).reshape(len(uniques), SKETCH_BINS)
+        slots = self._slot_indices(list(uniques))
+        np.add.at(self._hist, slots, counts)
+        return self
+
+    def merge(self, other: "RunningGroupQuantiles") -> "RunningGroupQuantiles":
+        """Fold another sketch's counts into this one."""
+        if len(other) == 0:
+            return self
+        slots = self._slot_indices(other.keys)
+        np.add.at(self._hist, slots, other._hist)
+        return self
+
+    def counts(self) -> np.ndarray:
+        """Values counted per group, in `keys` order."""
+        return self._hist.sum(axis=1)
+
+    def _cdf(self, x, cumulative):
+        """Per-group count of values below `x` (one point per group).
+
+        `cumulative` is the histogram's cumulative count with a leading
+        zero column.
+        """
+        x = np.clip(x, SKETCH_EDGES[0], SKETCH_EDGES[-1])
+        bin_ = np.clip(np.searchsorted(SKETCH_EDGES, x, side="right") - 1, 0, SKETCH_BINS - 1)
+        rows = np.arange(len(self))
+        share = (x - SKETCH_EDGES[bin_]) / (SKETCH_EDGES[bin_ + 1] - SKETCH_EDGES[bin_])
+        return cumulative[rows, bin_] + share * self._hist[rows, bin_]
+
+    def quantiles(self, q) -> np.ndarray:
+        """Array of shape `(groups, len(q))`; NaN for empty groups."""
+        q = np.atleast_1d(np.asarray(q, dtype=float))
+        cumulative = np.cumsum(self._hist, axis=1)
+        total = cumulative[:, -1:] if len(self) else np.zeros((0, 1))
+        result = np.full((len(self), len(q)), np.nan)
+        for j, quantile in enumerate(q):
+            target = quantile * total[:, 0]
+            # First bin whose cumulative count reaches the target.
+            bin_ = np.minimum((cumulative < target[:, None]).sum(axis=1), SKETCH_BINS - 1)
+            rows = np.arange(len(self))
+            before = cumulative[rows, bin_] - self._hist[rows, bin_]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                share = np.clip((target - before) / self._hist[rows, bin_], 0.0, 1.0)
+            share = np.nan_to_num(share)
+            value = SKETCH_EDGES[bin_] + share * (SKETCH_EDGES[bin_ + 1] - SKETCH_EDGES[bin_])
+            result[:, j] = np.where(total[:, 0] > 0, value, np.nan)
+        return result
+
+    def median_mad(self, iterations: int = 60):
+        """Per-group `(median, MAD)` (unscaled median absolute deviation).
+
+        The MAD is the half-width `d` of the interval around the median
+        holding half of the values, found by bisection on the sketch's
+        cumulative counts for every group at once.
+        """
+        median = self.quantiles([0.5])[:, 0]
+        total = self.counts()
+        cumulative = np.concatenate(
+            [np.zeros((len(self), 1)), np.cumsum(self._hist, axis=1)], axis=1
+        )
+        low = np.zeros(len(self))
+        high = np.full(len(self), SKETCH_EDGES[-1])
+        for _ in range(iterations):
+            mid = (low + high) / 2.0
+            inside = self._cdf(median + mid, cumulative) - self._cdf(median - mid, cumulative)
+            enough = inside >= total / 2.0
+            high = np.where(enough, mid, high)
+            low = np.where(enough, low, mid)
+        mad = np.where(total > 0, high, np.nan)
+        return median, mad
@@ -0,0 +1,264 @@
+"""Z-scores of a column against nested groups, shrunk toward the parent.
+
+Rig-level statistics mix rock from very different patterns and months.
+`HierarchicalNormalizer` standardizes each row against the finest group
+of a key hierarchy instead, e.g. `("perforadora", "drill_pattern")` or
+`("perforadora", "semana")`. Keys are column names or the calendar
+buckets in `TIME_KEYS`, derived from `tiempo inicio`.
+
+Everything is computed from integer codes:
+
+- every key is factorized once; level `j` of the hierarchy is the
+  (re-factorized) mixed-radix combination of the first `j` key codes,
+  and each group knows its parent group one level up;
+- each row counts at its deepest level with every key present (a hole
+  without a drill pattern still counts for its rig), and the moments of
+  every level come from those rows in a single `bincount` pass, rolled
+  up level by level with the exact pooled mean/M2 formula, so no row is
+  visited twice;
+- groups are then shrunk top-down toward their (already shrunk) parent,
+  with `prior` pseudo-observations of the parent:
+
+  `mean = (n * mean_g + prior * mean_parent) / (n + prior)`
+  `var = (M2_g + prior * var_parent) / (max(n - 1, 0) + prior)`
+
+  so a group with a handful of holes gets roughly its parent's
+  statistics, while a large group keeps its own. `prior=0` disables the
+  shrinkage.
+
+The z-scores follow `rig_normalized_penetration`: `0.0` for missing
+values and for a (shrunk) std at or below `STD_EPSILON`.
+"""
+
+import numpy as np
+import pandas as pd
+
+from classification import rig_normalized_penetration_array
+from group_statistics import grouped_moments, moments_to_std
+
+TIME_COLUMN = "tiempo inicio"
+
+# Calendar buckets usable as keys (weeks start on Monday).
+TIME_KEYS: tuple = ("dia", "semana", "mes")
+
+# Pseudo-observations of the parent group blended into every group.
+DEFAULT_SHRINKAGE_PRIOR = 30.0
+
+_NS_PER_DAY = 86_400 * 10**9
+
+
+def _time_codes(times, key):
+    """`(codes, labels)` of the calendar bucket `key` for each time."""
+    if not pd.api.types.is_datetime64_any_dtype(times):
+        times = pd.to_datetime(times)
+    stamps = times.to_numpy(dtype="datetime64[ns]")
+    missing = np.isnat(stamps)
+    if key == "mes":
+        buckets = stamps.astype("datetime64[M]").astype(np.int64)
+    else:
+        days = stamps.view(np.int64) // _NS_PER_DAY
+        # 1970-01-05 (day 4) is a Monday.
+        buckets = days if key == "dia" else (days + 3) // 7 * 7 - 3
+    codes, uniques = pd.factorize(np.where(missing, np.iinfo(np.int64).min, buckets), sort=True)
+    if missing.any():
+        # The sentinel sorts first: drop it and shift the codes down.
+        codes = np.where(missing, -1, codes - 1)
+        uniques = uniques[1:]
+    if key == "mes":
+        labels = uniques.astype("datetime64[M]").astype("datetime64[ns]")
+    else:
+        labels = (uniques * _NS_PER_DAY).view("datetime64[ns]")
+    return codes.astype(np.int64), pd.Index(labels)
+
+
+def _key_codes(df, key, time_column):
+    """`(codes, labels)` of one hierarchy key (`-1` for a missing key)."""
+    if key in df.columns:
+        codes, uniques = pd.factorize(df[key])
+        return codes.astype(np.int64), pd.Index(uniques)
+    if key in TIME_KEYS:
+        if time_column not in df.columns:
+            raise ValueError(f"La clave {key!r} requiere la columna '{time_column}'.")
+        return _time_codes(df[time_column], key)
+    raise ValueError(
+        f"Clave de agrupación no soportada: {key!r} "
+        f"(usa una columna o {', '.join(TIME_KEYS)})."
+    )
+
+
+def _rollup(parent, counts, means, m2, n_parents):
+    """Pool groups' `(count, mean, M2)` into their parents."""
+    totals = np.bincount(parent, weights=counts, minlength=n_parents)
+    weighted = np.bincount(parent, weights=counts * np.nan_to_num(means), minlength=n_parents)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pooled_means = weighted / totals
+    spread = counts * (np.nan_to_num(means) - pooled_means[parent]) ** 2
+    pooled_m2 = np.bincount(parent, weights=m2 + np.where(counts > 0, spread, 0.0), minlength=n_parents)
+    return totals, pooled_means, pooled_m2
+
+
+class HierarchicalNormalizer:
+    """Shrunk per-group statistics of one column over a key hierarchy.
+
+    Built once per dataset (and key set); `zscores` and `table` are then
+    plain lookups, so a new filter only selects rows from them.
+    """
+
+    def __init__(
+        self,
+        df,
+        keys,
+        value_column="tasa_penetracion",
+        prior=DEFAULT_SHRINKAGE_PRIOR,
+        reference=None,
+        time_column=TIME_COLUMN,
+    ):
+        """
+        Args:
+            df: Processed DataFrame.
+            keys: Group keys from coarsest to finest.
+            value_column: Column to standardize.
+            prior: Shrinkage pseudo-count (>= 0).
+            reference: Optional values for the statistics (aligned with
+                the rows, NaN = left out), e.g. the rates without the
+                flagged anomalies; defaults to `value_column`.
+        """
+        keys = tuple(keys)
+        if not keys:
+            raise ValueError("Se requiere al menos una clave de agrupación.")
+        if prior < 0:
+            raise ValueError("La constante de contracción no puede ser negativa.")
+        self.keys = keys
+        self.prior = float(prior)
+        self._values = df[value_column].to_numpy(dtype=float, na_value=np.nan)
+        if reference is None:
+            reference = self._values
+        reference = np.asarray(reference, dtype=float)
+
+        # Level codes: level 0 is the whole frame, level j the first j keys.
+        self._labels = []
+        self._key_row_codes = []
+        level_codes = [np.zeros(len(df), dtype=np.int64)]
+        self._parents = [np.zeros(1, dtype=np.int64)]
+        self._sizes = [1]
+        self._first_row = [np.zeros(1, dtype=np.int64)]
+        for key in keys:
+            codes, labels = _key_codes(df, key, time_column)
+            self._labels.append(labels)
+            self._key_row_codes.append(codes)
+            previous = level_codes[-1]
+            rows = np.flatnonzero((previous >= 0) & (codes >= 0))
+            # Mixed-radix (parent, key) code, re-factorized so the codes
+            # stay dense however many levels are stacked.
+            combined, uniques = pd.factorize(previous[rows] * len(labels) + codes[rows])
+            n_groups = len(uniques)
+            group = np.full(len(df), -1, dtype=np.int64)
+            group[rows] = combined
+            # A row of each group (its first), to read the group's parent
+            # and key labels from.
+            first = np.empty(n_groups, dtype=np.int64)
+            first[combined[::-1]] = rows[::-1]
+            parent = previous[first]
+            level_codes.append(group)
+            self._parents.append(parent)
+            self._sizes.append(n_groups)
+            self._first_row.append(first)
+        self._level_codes = level_codes
+
+        # Deepest level with every key present, and that level's group.
+        depth = np.zeros(len(df), dtype=np.int64)
+        for level, codes in enumerate(level_codes[1:], start=1):
+            depth[codes >= 0] = level
+        self._depth = depth
+
+        # One pass over the rows: moments at each row's deepest level.
+        own = []
+        for level, codes in enumerate(level_codes):
+            at_level = np.where(depth == level, codes, -1)
+            own.append(grouped_moments(at_level, reference, self._sizes[level]))
+
+        # Roll the moments up, finest level first.
+        stats = [None] * len(level_codes)
+        stats[-1] = own[-1]
+        for level in range(len(level_codes) - 1, 0, -1):
+            child_counts, child_means, child_m2 = stats[level]
+            own_counts, own_means, own_m2 = own[level - 1]
+            n_parents = self._sizes[level - 1]
+            parent = np.concatenate([self._parents[level], np.arange(n_parents)])
+            stats[level - 1] = _rollup(
+                parent,
+                np.concatenate([child_counts, own_counts]).astype(float),
+                np.concatenate([child_means, own_means]),
+                np.concatenate([child_m2, own_m2]),
+                n_parents,
+            )
+        self._raw = [
+            (np.asarray(c, dtype=np.int64), np.asarray(m, dtype=float), np.asarray(q, dtype=float))
+            for c, m, q in stats
+        ]
+
+        # Shrink top-down toward the (already shrunk) parent.
+        counts, means, m2 = self._raw[0]
+        shrunk = [(means, moments_to_std(counts, m2))]
+        for level in range(1, len(level_codes)):
+            counts, means, m2 = self._raw[level]
+            parent_means, parent_stds = shrunk[level - 1]
+            parent_means = parent_means[self._parents[level]]
+            parent_vars = parent_stds[self._parents[level]] ** 2
+            weight = counts + self.prior
+            with np.errstate(divide="ignore", invalid="ignore"):
+                mean = np.where(
+                    counts > 0,
+                    (counts * np.nan_to_num(means) + self.prior * parent_means) / weight,
+                    parent_means,
+                )
+                var = (m2 + self.prior * parent_vars) / (np.maximum(counts - 1, 0) + self.prior)
+            shrunk.append((mean, np.sqrt(np.where(np.isfinite(var), var, 0.0))))
+        self._shrunk = shrunk
+
+    def __len__(self) -> int:
+        """Groups at the finest level."""
+        return self._sizes[-1]
+
+    def row_statistics(self):
+        """Row-aligned shrunk `(means, stds)` of each row's deepest group."""
+        means = np.empty(len(self._depth))
+        stds = np.empty(len(self._depth))
+        for level, codes in enumerate(self._level_codes):
+            rows = self._depth == level
+            level_means, level_stds = self._shrunk[level]
+            means[rows] = level_means[codes[rows]]
+            stds[rows] = level_stds[codes[rows]]
+        return means, stds
+
+    def zscores(self) -> np.ndarray:
+        """Z-score of every row against its deepest group's shrunk statistics."""
+        means, stds = self.row_statistics()
+        return rig_normalized_penetration_array(self._values, means, stds)
+
+    def table(self, level=None) -> pd.DataFrame:
+        """One row per group of `level` (default: the finest).
+
+        Columns: the level's keys, `filas` (values in the statistics),
+        `media` / `std` (the group's own) and `media_ajustada` /
+        `std_ajustada` (after shrinkage).
+        """
+        level = len(self.keys) if level is None else level
+        if not 1 <= level <= len(self.keys):
+            raise ValueError(f"Nivel fuera de rango: {level!r}")
+        first = self._first_row[level]
+        columns = {}
+        for key, codes, labels in zip(self.keys, self._key_row_codes, self._labels):
+            if len(columns) == level:
+                break
+            columns[key] = labels[codes[first]]
+        counts, means, m2 = self._raw[level]
+        shrunk_means, shrunk_stds = self._shrunk[level]
+        columns.update(
+            filas=counts,
+            media=means,
+            std=np.where(counts > 0, moments_to_std(counts, m2), np.nan),
+            media_ajustada=shrunk_means,
+            std_ajustada=shrunk_stds,
+        )
+        return pd.DataFrame(columns)
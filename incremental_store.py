@@ -0,0 +1,332 @@
+"""Incremental ingestion of shift files into a growing processed store.
+
+Usage::
+
+    python incremental_store.py almacen/ turnos/turno_0612_noche.csv
+
+Each rig dumps a new CSV per shift. Reprocessing the whole history with
+`DataProcessor.load_and_process` makes every shift cost O(history);
+`IncrementalStore.append` processes only the new file and folds it in:
+
+- rows whose (`pozo`, `tiempo inicio`) key is already stored (or repeated
+  inside the batch) are dropped, keeping the first occurrence; keys are
+  kept as a sorted array of 64-bit hashes, so the check is a binary
+  search per new row;
+- the per-rig `tasa_penetracion` moments live in a `RunningGroupStats`
+  and are updated with the new rows only;
+- rigs that already had rows and whose moments changed are reported as
+  dirty: their stored z-scores moved.
+
+Stored parts are never rewritten. `tasa_penetracion_normalizada` is not
+kept in them but computed from the running moments when the whole store
+is read (`frame`), which is the only O(history) step.
+
+`save` writes a directory that `load` reopens in a later process: one
+Feather file per appended batch plus its key hashes (`.npy`), and an
+`estado.json` with the part sizes and the per-rig moments, written last
+so an interrupted save leaves the previous state readable. Saving only
+writes the parts added since the last save, and loading reads the state
+and the key hashes but not the parts, which are memory-mapped on demand.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import TypedDict
+
+import numpy as np
+import pandas as pd
+
+from csv_parsing import PYARROW_AVAILABLE
+from data_processor import DataProcessor
+from group_statistics import RunningGroupStats
+from processed_cache import restore_object_strings
+
+if PYARROW_AVAILABLE:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+
+# Columns identifying a drilled hole; repeated keys are duplicates.
+KEY_COLUMNS: tuple = ("pozo", "tiempo inicio")
+
+# Bump when the on-disk layout or the key hashing changes.
+STORE_FORMAT_VERSION = 2
+
+_STATE_FILE = "estado.json"
+
+
+class AppendReport(TypedDict):
+    """Outcome of `IncrementalStore.append`.
+
+    `added` rows were stored, `duplicates` were dropped because their key
+    was already present, and `dirty_rigs` lists the rigs whose previously
+    stored z-scores changed.
+    """
+
+    added: int
+    duplicates: int
+    dirty_rigs: list
+
+
+def _key_hashes(df):
+    """64-bit hash per row of the `KEY_COLUMNS` (`pozo` compared as text).
+
+    The parser yields `tiempo inicio` at second or microsecond resolution
+    depending on the file layout, and the hash of an instant depends on
+    the unit, so it is hashed in nanoseconds.
+    """
+    started = df["tiempo inicio"]
+    if pd.api.types.is_datetime64_any_dtype(started):
+        started = started.dt.as_unit("ns")
+    keys = pd.DataFrame({
+        "pozo": df["pozo"].astype(str),
+        "tiempo inicio": started,
+    })
+    return pd.util.hash_pandas_object(keys, index=False).to_numpy()
+
+
+def _part_name(number):
+    return f"parte_{number:06d}"
+
+
+def _atomic_write(path, write):
+    """Call `write(tmp_path)` and move the result onto `path`."""
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp_name)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def _save_array(path, values):
+    # A file object, so `np.save` does not append ".npy" to the name.
+    with open(path, "wb") as fh:
+        np.save(fh, values)
+
+
+class IncrementalStore:
+    """Append-only processed store with running per-rig statistics."""
+
+    def __init__(self, processor=None):
+        self.processor = processor or DataProcessor()
+        self.rig_stats = RunningGroupStats()
+        # Each part is a DataFrame, or the Feather path of a saved part
+        # not read yet.
+        self._parts: list = []
+        self._sizes: list = []
+        self._part_hashes: list = []
+        self._keys = np.zeros(0, dtype=np.uint64)
+        self._dirty: set = set()
+        self._size = 0
+        self._frame = None
+        self._directory = None
+        self._saved = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, processor=None) -> "IncrementalStore":
+        """A store seeded with an already processed history."""
+        store = cls(processor)
+        store.append_frame(df)
+        return store
+
+    @property
+    def dirty_rigs(self) -> list:
+        """Rigs whose z-scores changed since `frame` was last read."""
+        return sorted(self._dirty, key=str)
+
+    def append(self, source) -> AppendReport:
+        """Process a shift CSV (path or file-like) and append its new rows."""
+        logging.info(f"Ingesta incremental de: {source}")
+        return self.append_frame(self.processor.load_and_process(source))
+
+    def append_frame(self, df: pd.DataFrame) -> AppendReport:
+        """Append an already processed frame (see `append`).
+
+        Without a `pozo` column rows cannot be told apart, so no
+        deduplication is done (a warning is logged).
+        """
+        if {"pozo", "tiempo inicio"} <= set(df.columns):
+            hashes = _key_hashes(df)
+            fresh = ~pd.Series(hashes).duplicated().to_numpy()
+            if len(self._keys):
+                found = np.searchsorted(self._keys, hashes)
+                fresh &= self._keys[np.minimum(found, len(self._keys) - 1)] != hashes
+            hashes = hashes[fresh]
+            # Both runs are sorted, so the stable sort (timsort) is a merge.
+            self._keys = np.sort(np.concatenate([self._keys, np.sort(hashes)]), kind="stable")
+        else:
+            logging.warning(
+                "Sin columnas %s no se pueden detectar filas duplicadas.", list(KEY_COLUMNS)
+            )
+            fresh = np.ones(len(df), dtype=bool)
+            hashes = np.zeros(0, dtype=np.uint64)
+        new = df.loc[fresh].drop(columns="tasa_penetracion_normalizada", errors="ignore")
+        new.index = pd.RangeIndex(self._size, self._size + len(new))
+
+        dirty = []
+        if "perforadora" in new.columns and "tasa_penetracion" in new.columns:
+            rates = new["tasa_penetracion"].to_numpy(dtype=float, na_value=np.nan)
+            # Only rigs that gained a finite rate get new moments, and
+            # only those with earlier finite rates had z-scores to move.
+            changed = new["perforadora"][np.isfinite(rates)].dropna().unique()
+            prior_means, _ = self.rig_stats.lookup(changed)
+            dirty = changed[np.isfinite(prior_means)].tolist()
+            self._dirty.update(dirty)
+            self.rig_stats.update(new["perforadora"], new["tasa_penetracion"])
+
+        if len(new):
+            self._parts.append(new)
+            self._sizes.append(len(new))
+            self._part_hashes.append(hashes)
+            self._size += len(new)
+            self._frame = None
+        report = AppendReport(
+            added=len(new), duplicates=int(len(df) - len(new)), dirty_rigs=dirty
+        )
+        logging.info(
+            "Ingesta incremental: %d filas nuevas, %d duplicadas.",
+            report["added"],
+            report["duplicates"],
+        )
+        return report
+
+    def _part(self, number) -> pd.DataFrame:
+        part = self._parts[number]
+        if isinstance(part, Path):
+            table = feather.read_table(part, memory_map=True)
+            part = table.to_pandas(split_blocks=True)
+            restore_object_strings(part)
+            start = sum(self._sizes[:number])
+            part.index = pd.RangeIndex(start, start + len(part))
+            self._parts[number] = part
+        return part
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """The whole store as one DataFrame, with current z-scores.
+
+        Concatenates every part and scores it against the running
+        moments, so it costs O(history); the result is cached until the
+        next `append`. Treat it as read-only.
+        """
+        if self._frame is None:
+            if not self._parts:
+                return pd.DataFrame()
+            parts = [self._part(number) for number in range(len(self._parts))]
+            frame = pd.concat(parts) if len(parts) > 1 else parts[0].copy(deep=False)
+            if "perforadora" in frame.columns and "tasa_penetracion" in frame.columns:
+                # PARITY-DEBT: webapp/src/utils/dataProcessor.ts:addRigNormalizedRate
+                frame["tasa_penetracion_normalizada"] = self.rig_stats.normalize(
+                    frame["perforadora"], frame["tasa_penetracion"]
+                )
+            self._frame = frame
+        self._dirty.clear()
+        return self._frame
+
+    def save(self, directory) -> None:
+        """Write the store to `directory` (see the module docstring).
+
+        Only parts added since the last `save` / `load` of the same
+        directory are written.
+
+        Raises:
+            ValueError: When pyarrow is not installed.
+        """
+        if not PYARROW_AVAILABLE:
+            raise ValueError("Se requiere pyarrow para guardar el almacén incremental.")
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        first = self._saved if directory == self._directory else 0
+        for number in range(first, len(self._parts)):
+            name = _part_name(number)
+            table = pa.Table.from_pandas(self._part(number), preserve_index=False)
+            _atomic_write(
+                directory / f"{name}.feather",
+                lambda tmp: feather.write_feather(table, tmp, compression="uncompressed"),
+            )
+            hashes = self._part_hashes[number]
+            if hashes is None:
+                hashes = np.load(self._directory / f"{name}.npy")
+            _atomic_write(directory / f"{name}.npy", lambda tmp: _save_array(tmp, hashes))
+        state = {
+            "version": STORE_FORMAT_VERSION,
+            "sizes": self._sizes,
+            "rig_stats": self.rig_stats.state(),
+        }
+        _atomic_write(
+            directory / _STATE_FILE,
+            lambda tmp: Path(tmp).write_text(json.dumps(state), encoding="utf-8"),
+        )
+        self._directory = directory
+        self._saved = len(self._parts)
+        logging.info(f"Almacén incremental guardado en {directory} ({self._size} filas).")
+
+    @classmethod
+    def load(cls, directory, processor=None) -> "IncrementalStore":
+        """Reopen a store written by `save`.
+
+        Raises:
+            ValueError: When `directory` holds no store, or one written by
+                an incompatible version.
+        """
+        directory = Path(directory)
+        path = directory / _STATE_FILE
+        if not path.exists():
+            raise ValueError(f"No hay un almacén incremental en {directory}.")
+        state = json.loads(path.read_text(encoding="utf-8"))
+        if state.get("version") != STORE_FORMAT_VERSION:
+            raise ValueError(f"Versión de almacén no soportada: {state.get('version')!r}")
+        store = cls(processor)
+        store._sizes = list(state["sizes"])
+        store._size = sum(store._sizes)
+        store._parts = [
+            directory / f"{_part_name(n)}.feather" for n in range(len(store._sizes))
+        ]
+        # Saved parts' hashes only live on disk (read again if the store
+        # is saved somewhere else).
+        store._part_hashes = [None] * len(store._sizes)
+        hashes = [np.load(directory / f"{_part_name(n)}.npy") for n in range(len(store._sizes))]
+        if hashes:
+            store._keys = np.sort(np.concatenate(hashes), kind="stable")
+        store.rig_stats = RunningGroupStats.from_state(state["rig_stats"])
+        store._directory = directory
+        store._saved = len(store._sizes)
+        return store
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("store", type=Path, help="store directory (created if missing)")
+    parser.add_argument("inputs", nargs="+", type=Path, help="shift CSV files, in order")
+    args = parser.parse_args(argv)
+    if not PYARROW_AVAILABLE:
+        parser.error("se requiere pyarrow para guardar el almacén")
+
+    if (args.store / _STATE_FILE).exists():
+        store = IncrementalStore.load(args.store)
+    else:
+        store = IncrementalStore()
+    for path in args.inputs:
+        report = store.append(path)
+        print(
+            f"{path}: {report['added']} filas nuevas, {report['duplicates']} duplicadas"
+            + (f"; z-scores actualizados: {', '.join(sorted(map(str, report['dirty_rigs'])))}"
+               if report["dirty_rigs"] else "")
+        )
+    store.save(args.store)
+    print(f"{len(store)} filas ({len(store.rig_stats)} perforadoras) -> {args.store}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
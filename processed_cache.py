@@ -0,0 +1,195 @@
+"""Persistent on-disk cache of processed drilling data.
+
+`st.cache_data` only lives inside one server process and re-hashes the
+whole upload on every lookup. This cache survives restarts and is shared
+by every process pointing at the same directory: the processed frame is
+written once as an uncompressed Feather (Arrow IPC) file named after the
+content hash of the raw CSV, and reloading a known file memory-maps that
+file instead of re-parsing the CSV.
+
+Files are stored with the compact dtypes of
+`DataProcessor.load_and_process(..., compact=True)` — `datetime64`
+times, `float32` for float columns that round-trip exactly, and
+dictionary-encoded (categorical) low-cardinality strings — and the
+directory is kept under a byte budget by evicting the least recently
+used files.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+from csv_parsing import PYARROW_AVAILABLE
+
+if PYARROW_AVAILABLE:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+
+# Bump when `DataProcessor` output changes so stale files are ignored.
+CACHE_FORMAT_VERSION = "2"
+
+DEFAULT_CACHE_DIR = Path(".cache") / "procesados"
+DEFAULT_MAX_BYTES = 1 << 30
+
+_SUFFIX = ".feather"
+_ATTRS_KEY = b"clasificador.attrs"
+
+
+def content_key(data: bytes, salt: str = "") -> str:
+    """Hex digest identifying raw CSV bytes plus processing settings."""
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(f"{CACHE_FORMAT_VERSION}\x1f{salt}\x1f".encode("utf-8"))
+    digest.update(data)
+    return digest.hexdigest()
+
+
+def _read_source(source) -> bytes:
+    if isinstance(source, (str, os.PathLike)):
+        return Path(source).read_bytes()
+    source.seek(0)
+    data = source.read()
+    source.seek(0)
+    return data.encode("utf-8") if isinstance(data, str) else data
+
+
+def restore_object_strings(df: pd.DataFrame) -> None:
+    """Turn pyarrow's string columns back into object dtype, in place.
+
+    pyarrow always materializes Arrow strings as pandas' `str` dtype;
+    `data_processor` disables those (see the `future.infer_string`
+    workaround there), so cached frames must not reintroduce them.
+    """
+    for col in df.columns:
+        values = df[col]
+        if isinstance(values.dtype, pd.StringDtype):
+            df[col] = values.astype(object)
+        elif isinstance(values.dtype, pd.CategoricalDtype) and isinstance(
+            values.cat.categories.dtype, pd.StringDtype
+        ):
+            df[col] = values.cat.rename_categories(values.cat.categories.astype(object))
+
+
+class ProcessedDataCache:
+    """Content-addressed Feather cache with a size-bounded directory.
+
+    Without pyarrow the cache is disabled: `get` always misses and `put`
+    does nothing, so callers fall back to plain processing.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        if max_bytes < 1:
+            raise ValueError("max_bytes debe ser positivo.")
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.enabled = PYARROW_AVAILABLE
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}{_SUFFIX}"
+
+    def get(self, key: str) -> pd.DataFrame | None:
+        """Memory-map the cached frame for `key`, or `None` on a miss."""
+        path = self._path(key)
+        if not self.enabled or not path.exists():
+            return None
+        try:
+            table = feather.read_table(path, memory_map=True)
+            df = table.to_pandas(split_blocks=True)
+        except (OSError, pa.ArrowException):
+            logging.warning(f"Archivo de caché ilegible, se descarta: {path}")
+            path.unlink(missing_ok=True)
+            return None
+        restore_object_strings(df)
+        raw_attrs = (table.schema.metadata or {}).get(_ATTRS_KEY)
+        if raw_attrs:
+            df.attrs.update(json.loads(raw_attrs))
+        # Touch so eviction sees the file as recently used.
+        os.utime(path)
+        return df
+
+    def put(self, key: str, df: pd.DataFrame) -> bool:
+        """Store `df` (already compacted) under `key`; `False` if skipped."""
+        if not self.enabled:
+            return False
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=True)
+            attrs = json.dumps(df.attrs, default=str).encode("utf-8")
+            table = table.replace_schema_metadata(
+                {**(table.schema.metadata or {}), _ATTRS_KEY: attrs}
+            )
+        except (pa.ArrowException, TypeError, ValueError) as e:
+            logging.warning(f"No se pudo convertir el DataFrame para la caché: {e}")
+            return False
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(fd)
+        try:
+            # Uncompressed so reloads can be memory-mapped.
+            feather.write_feather(table, tmp_name, compression="uncompressed")
+            os.replace(tmp_name, self._path(key))
+        except OSError as e:
+            Path(tmp_name).unlink(missing_ok=True)
+            logging.warning(f"No se pudo escribir la caché: {e}")
+            return False
+        self.evict(keep=key)
+        return True
+
+    def evict(self, keep: str | None = None) -> list:
+        """Delete least recently used files until the directory fits.
+
+        The file for `keep` is never removed, even if it alone exceeds
+        `max_bytes`. Returns the paths removed.
+        """
+        if not self.directory.exists():
+            return []
+        entries = []
+        for path in self.directory.glob(f"*{_SUFFIX}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        removed = []
+        for _, size, path in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            if keep is not None and path == self._path(keep):
+                continue
+            path.unlink(missing_ok=True)
+            total -= size
+            removed.append(path)
+        if removed:
+            logging.info(f"Caché de datos procesados: {len(removed)} archivos eliminados.")
+        return removed
+
+    def load(self, source, processor) -> pd.DataFrame:
+        """Processed frame for a CSV, from the cache when possible.
+
+        Args:
+            source: Path or seekable file-like object with the raw CSV.
+            processor: A `DataProcessor`; its parser and datetime
+                settings are part of the key.
+
+        Returns:
+            The processed frame with compact dtypes. `attrs["fingerprint"]`
+            is set to the content key, which identifies the dataset for
+            `ClassificationCache` without another hash pass.
+        """
+        data = _read_source(source)
+        key = content_key(
+            data, salt=repr((processor.PARSER_ENGINES, processor.DATETIME_FORMATS))
+        )
+        df = self.get(key)
+        if df is not None:
+            logging.info(f"Datos procesados leídos desde la caché ({key[:12]}).")
+        else:
+            df = processor.load_and_process(source, compact=True)
+            self.put(key, df)
+        df.attrs["fingerprint"] = key
+        return df
@@ -0,0 +1,198 @@
+"""Idle gaps, overlaps and per-shift utilisation of each rig.
+
+`RigIntervals` sorts the holes by rig and `tiempo inicio` once (see
+`time_series.rig_time_order`) and derives everything from differences
+between consecutive sorted intervals:
+
+- the end of the rig's previous work is the running maximum of
+  `tiempo final` over the earlier holes (so a long hole that contains
+  shorter ones still counts), and `start - previous end` is the idle
+  gap when positive and an overlap when negative;
+- a hole is *overlapped* when it starts before that previous end, or
+  ends after the next hole of the same rig starts. One rig cannot drill
+  two holes at once, so these rows are timestamp errors to review;
+- the part of each hole not already covered by earlier ones is the
+  rig's busy time (the union of its intervals), which is split over
+  fixed shifts with `bincount`, giving the drilling hours and the
+  utilisation of every rig in every shift.
+
+Holes with a missing start, end or rig, or an end before the start,
+are left out.
+"""
+
+from typing import TypedDict
+
+import numpy as np
+import pandas as pd
+
+from time_series import GROUP_COLUMN, TIME_COLUMN, rig_time_order
+
+END_COLUMN = "tiempo final"
+
+# Shift layout: 12-hour shifts starting at 08:00 and 20:00.
+SHIFT_HOURS = 12
+SHIFT_START_HOUR = 8
+
+_NS_PER_MINUTE = 60 * 10**9
+
+
+class OverlapReport(TypedDict):
+    """Summary of overlapping holes for the data-quality warning.
+
+    `overlap_rows` holds up to 20 row positions (in the original
+    frame) of overlapped holes; `rigs` the rigs with at least one.
+    """
+
+    overlap_count: int
+    overlap_rows: list
+    rigs: list
+
+
+class RigIntervals:
+    """Per-rig interval analysis of a processed DataFrame."""
+
+    def __init__(
+        self,
+        df,
+        start_column=TIME_COLUMN,
+        end_column=END_COLUMN,
+        group_column=GROUP_COLUMN,
+    ):
+        self.size = len(df)
+        self.group_column = group_column
+        rows, starts, codes, self.groups = rig_time_order(df, start_column, group_column)
+        ends = df[end_column]
+        if not pd.api.types.is_datetime64_any_dtype(ends):
+            ends = pd.to_datetime(ends)
+        ends = ends.to_numpy(dtype="datetime64[ns]")[rows]
+        valid = ~np.isnat(ends)
+        ends = ends.view(np.int64)
+        valid &= ends >= starts
+        self._rows = rows[valid]
+        self._starts = starts[valid]
+        self._ends = ends[valid]
+        self._codes = codes[valid]
+        counts = np.bincount(self._codes, minlength=len(self.groups))
+        self._bounds = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+
+        # Running max of the earlier ends within each rig (the first hole
+        # of a rig has no previous work).
+        previous_end = np.full(len(self._ends), np.iinfo(np.int64).min)
+        for lo, hi in zip(self._bounds[:-1], self._bounds[1:]):
+            if hi - lo > 1:
+                previous_end[lo + 1:hi] = np.maximum.accumulate(self._ends[lo:hi - 1])
+        self._first = previous_end == np.iinfo(np.int64).min
+        self._previous_end = np.where(self._first, self._starts, previous_end)
+
+        same_rig_next = np.append(self._codes[1:] == self._codes[:-1], False)
+        next_start = np.append(self._starts[1:], 0)
+        self._overlapped = (self._starts < self._previous_end) | (
+            same_rig_next & (self._ends > next_start)
+        )
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def table(self) -> pd.DataFrame:
+        """One row per hole, sorted by rig and start.
+
+        Columns: `fila` (position in the original frame), the rig,
+        `inicio`, `fin`, `inactividad_min` (idle minutes since the rig's
+        previous work, NaN for its first hole), `solape_min` (minutes
+        overlapping earlier holes) and `solapado`.
+        """
+        gap = (self._starts - self._previous_end) / _NS_PER_MINUTE
+        gap = np.where(self._first, np.nan, gap)
+        return pd.DataFrame({
+            "fila": self._rows,
+            self.group_column: self.groups[self._codes],
+            "inicio": self._starts.view("datetime64[ns]"),
+            "fin": self._ends.view("datetime64[ns]"),
+            "inactividad_min": np.where(gap < 0, 0.0, gap),
+            "solape_min": np.where(gap > 0, 0.0, np.nan_to_num(-gap)),
+            "solapado": self._overlapped,
+        })
+
+    def overlap_mask(self):
+        """Boolean array aligned with the frame's rows: overlapped holes."""
+        mask = np.zeros(self.size, dtype=bool)
+        mask[self._rows[self._overlapped]] = True
+        return mask
+
+    def overlap_report(self) -> OverlapReport:
+        """Count, first row positions and rigs of the overlapped holes."""
+        rows = np.sort(self._rows[self._overlapped])
+        return OverlapReport(
+            overlap_count=int(len(rows)),
+            overlap_rows=rows[:20].tolist(),
+            rigs=[str(g) for g in self.groups[np.unique(self._codes[self._overlapped])]],
+        )
+
+    def utilisation(self, shift_hours=SHIFT_HOURS, shift_start_hour=SHIFT_START_HOUR):
+        """Drilling hours and utilisation of every rig in every shift.
+
+        Overlapping holes are counted once (union of the intervals). A
+        hole that crosses a shift change is split between both shifts.
+        Every shift between a rig's first and last hole gets a row, idle
+        ones included.
+
+        Returns:
+            A DataFrame with the rig, `turno` (shift start), `pozos`
+            (holes started in the shift), `horas_perforacion` and
+            `utilizacion` (drilling hours / shift hours, 0-1).
+        """
+        if shift_hours <= 0:
+            raise ValueError("La duración del turno debe ser positiva.")
+        columns = [self.group_column, "turno", "pozos", "horas_perforacion", "utilizacion"]
+        if len(self) == 0:
+            return pd.DataFrame(columns=columns)
+        length = int(shift_hours * 3_600 * 10**9)
+        first_day = pd.Timestamp(self._starts.min()).normalize()
+        origin = (first_day + pd.Timedelta(hours=shift_start_hour)).value
+        # Latest shift change at or before the first hole.
+        origin += (self._starts.min() - origin) // length * length
+
+        # Busy segment of each hole: the part after the rig's previous work.
+        busy_from = np.maximum(self._starts, self._previous_end)
+        busy_to = np.maximum(self._ends, busy_from)
+        first_shift = (busy_from - origin) // length
+        last_shift = np.maximum((busy_to - origin - 1) // length, first_shift)
+        n_shifts = int(last_shift.max()) + 1
+        n_groups = len(self.groups)
+
+        # Split every segment at the shift changes it crosses.
+        pieces = last_shift - first_shift + 1
+        segment = np.repeat(np.arange(len(busy_from)), pieces)
+        shift = first_shift[segment] + (
+            np.arange(len(segment)) - np.repeat(np.cumsum(pieces) - pieces, pieces)
+        )
+        lo = np.maximum(busy_from[segment], origin + shift * length)
+        hi = np.minimum(busy_to[segment], origin + (shift + 1) * length)
+        busy = np.bincount(
+            self._codes[segment] * n_shifts + shift,
+            weights=(hi - lo).astype(float),
+            minlength=n_groups * n_shifts,
+        )
+        started = np.bincount(
+            self._codes * n_shifts + (self._starts - origin) // length,
+            minlength=n_groups * n_shifts,
+        )
+
+        # Keep each rig's shifts from its first to its last hole.
+        present = np.flatnonzero(self._bounds[:-1] < self._bounds[1:])
+        rig_first = (self._starts[self._bounds[present]] - origin) // length
+        rig_last = np.maximum.reduceat(last_shift, self._bounds[present])
+        spans = rig_last - rig_first + 1
+        rig = np.repeat(present, spans)
+        shift = np.repeat(rig_first, spans) + (
+            np.arange(spans.sum()) - np.repeat(np.cumsum(spans) - spans, spans)
+        )
+        key = rig * n_shifts + shift
+        hours = busy[key] / 3.6e12
+        return pd.DataFrame({
+            self.group_column: self.groups[rig],
+            "turno": (origin + shift * length).view("datetime64[ns]"),
+            "pozos": started[key],
+            "horas_perforacion": hours,
+            "utilizacion": hours / shift_hours,
+        })
@@ -0,0 +1,144 @@
+"""Gridded aggregation of hole values over `este` / `norte`.
+
+`grid_aggregate` bins holes into square cells of `cell_size` metres and
+reduces a value column per cell (count, mean, median, max) with
+`np.bincount` and one sort, so the cost is O(n log n) in the number of
+holes and the output size depends only on the grid resolution. Cell
+edges are aligned to multiples of `cell_size`, so the same cell keeps
+the same position when the data is filtered.
+"""
+
+import math
+from typing import TypedDict
+
+import numpy as np
+
+GRID_STATISTICS: tuple = ("count", "mean", "median", "max")
+
+# Longest side, in cells, of the automatic grid (`cell_size=None`).
+DEFAULT_GRID_RESOLUTION = 200
+
+# Refuse grids larger than this many cells (a cell size typo in metres
+# vs kilometres would otherwise allocate gigabytes).
+MAX_GRID_CELLS = 4_000_000
+
+
+class GridAggregate(TypedDict, total=False):
+    """Output of `grid_aggregate`.
+
+    `x_centers` / `y_centers` are the cell centres; every statistic is a
+    `(len(y_centers), len(x_centers))` array (row = norte, column =
+    este). `count` counts holes per cell; the value statistics ignore
+    non-finite values and are NaN for cells without one.
+    """
+
+    cell_size: float
+    x_centers: np.ndarray
+    y_centers: np.ndarray
+    count: np.ndarray
+    mean: np.ndarray
+    median: np.ndarray
+    max: np.ndarray
+
+
+def auto_cell_size(x, y, resolution=DEFAULT_GRID_RESOLUTION) -> float:
+    """Cell size giving about `resolution` cells along the longest side."""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    finite = np.isfinite(x) & np.isfinite(y)
+    if not finite.any():
+        return 1.0
+    extent = max(np.ptp(x[finite]), np.ptp(y[finite]))
+    return float(extent / resolution) if extent > 0 else 1.0
+
+
+def grid_aggregate(x, y, values=None, cell_size=None, statistics=("count", "mean")):
+    """Aggregate `values` per square grid cell.
+
+    Args:
+        x, y: Coordinates (`este`, `norte`). Rows with a non-finite
+            coordinate are ignored.
+        values: Value per row (e.g. `indice_dureza`); required for any
+            statistic other than `"count"`.
+        cell_size: Cell side in coordinate units; `None` picks
+            `auto_cell_size`.
+        statistics: Subset of `GRID_STATISTICS`.
+
+    Returns:
+        A `GridAggregate` with the requested statistics.
+
+    Raises:
+        ValueError: On an unknown statistic, a non-positive cell size,
+            a missing `values` array or a grid above `MAX_GRID_CELLS`.
+    """
+    unknown = set(statistics) - set(GRID_STATISTICS)
+    if unknown:
+        raise ValueError(f"Estadísticas no soportadas: {sorted(unknown)}")
+    if values is None and set(statistics) - {"count"}:
+        raise ValueError("Se requieren valores para calcular estadísticas distintas de 'count'.")
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if cell_size is None:
+        cell_size = auto_cell_size(x, y)
+    if not cell_size > 0:
+        raise ValueError("cell_size debe ser positivo.")
+
+    located = np.isfinite(x) & np.isfinite(y)
+    x, y = x[located], y[located]
+    if len(x) == 0:
+        empty = np.zeros((0, 0))
+        result = {"cell_size": float(cell_size), "x_centers": np.zeros(0), "y_centers": np.zeros(0)}
+        result.update({stat: empty.copy() for stat in statistics})
+        return result
+
+    x0 = math.floor(x.min() / cell_size) * cell_size
+    y0 = math.floor(y.min() / cell_size) * cell_size
+    ix = ((x - x0) // cell_size).astype(np.int64)
+    iy = ((y - y0) // cell_size).astype(np.int64)
+    nx, ny = int(ix.max()) + 1, int(iy.max()) + 1
+    if nx * ny > MAX_GRID_CELLS:
+        raise ValueError(
+            f"La grilla resultante ({nx}x{ny}) supera {MAX_GRID_CELLS} celdas; "
+            "aumenta cell_size."
+        )
+    cells = iy * nx + ix
+    n_cells = nx * ny
+
+    result = {
+        "cell_size": float(cell_size),
+        "x_centers": x0 + (np.arange(nx) + 0.5) * cell_size,
+        "y_centers": y0 + (np.arange(ny) + 0.5) * cell_size,
+    }
+    if "count" in statistics:
+        result["count"] = np.bincount(cells, minlength=n_cells).reshape(ny, nx)
+
+    if values is not None and set(statistics) - {"count"}:
+        values = np.asarray(values, dtype=float)[located]
+        finite = np.isfinite(values)
+        cells_v, values_v = cells[finite], values[finite]
+        counts_v = np.bincount(cells_v, minlength=n_cells)
+        occupied = counts_v > 0
+        if "mean" in statistics:
+            sums = np.bincount(cells_v, weights=values_v, minlength=n_cells)
+            mean = np.full(n_cells, np.nan)
+            mean[occupied] = sums[occupied] / counts_v[occupied]
+            result["mean"] = mean.reshape(ny, nx)
+        if "median" in statistics or "max" in statistics:
+            # One sort by (cell, value): each cell's values are a
+            # contiguous ascending run starting at `starts`.
+            order = np.lexsort((values_v, cells_v))
+            ordered = values_v[order]
+            starts = np.concatenate([[0], np.cumsum(counts_v)[:-1]])
+            occupied_starts = starts[occupied]
+            occupied_counts = counts_v[occupied]
+            if "max" in statistics:
+                maximum = np.full(n_cells, np.nan)
+                maximum[occupied] = ordered[occupied_starts + occupied_counts - 1]
+                result["max"] = maximum.reshape(ny, nx)
+            if "median" in statistics:
+                low = ordered[occupied_starts + (occupied_counts - 1) // 2]
+                high = ordered[occupied_starts + occupied_counts // 2]
+                median = np.full(n_cells, np.nan)
+                median[occupied] = (low + high) / 2.0
+                result["median"] = median.reshape(ny, nx)
+    return result
@@ -1,6 +1,15 @@
 import streamlit as st
 import pandas as pd
-from data_processor import DataProcessor
+import numpy as np
+from data_processor import METRIC_COLUMNS, RIG_NORMALIZATION_MODES, DataProcessor
+from classification_cache import ClassificationCache, dataset_fingerprint, mask_key, thresholds_key
+from filter_index import FilterIndex
+from hierarchical_normalization import TIME_KEYS, HierarchicalNormalizer
+from processed_cache import ProcessedDataCache
+from rig_intervals import RigIntervals
+from spatial_index import SpatialIndex
+from threshold_calibration import snap_cutoffs
+from time_series import TREND_WINDOWS, TrendEngine
 from visualizer import Visualizer
 import plotly.express as px
 from typing import Optional
@@ -12,11 +21,19 @@ from io import BytesIO
 # mirror the data flow without re-implementing UI state.
 from classification import (
     DEFAULT_THRESHOLDS,
+    RATE_METRICS,
     Thresholds,
     DEFAULT_DURATION_THRESHOLDS,
     DEFAULT_RATE_THRESHOLDS,
 )
 
+# Las vistas `copy=False` comparten columnas con el dataset cacheado y
+# dependen de copy-on-write para que una edición no lo modifique. En
+# pandas 3 siempre está activo; en pandas 2 lo activa la app para su
+# propio proceso (importar `data_processor` no cambia opciones globales).
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
 # Configuración para que la página use todo el ancho
 st.set_page_config(layout="wide", page_title="Clasificador de Pozos", page_icon=":material/analytics:")
 
@@ -33,10 +50,192 @@ def cargar_datos(uploaded_file: BytesIO) -> pd.DataFrame:
         pd.DataFrame: DataFrame procesado con las clasificaciones de dureza.
     """
     data_processor = DataProcessor()
-    df_processed: pd.DataFrame = data_processor.load_and_process(uploaded_file)
+    cache_disco = obtener_cache_disco()
+    if cache_disco.enabled:
+        # El caché en disco fija `attrs["fingerprint"]` con el hash del
+        # contenido, así que no hace falta otra pasada de hash.
+        return cache_disco.load(uploaded_file, data_processor)
+    df_processed: pd.DataFrame = data_processor.load_and_process(uploaded_file, compact=True)
+    # La huella se calcula una sola vez por archivo; los reruns la leen
+    # desde `attrs` para consultar el caché de clasificación.
+    df_processed.attrs["fingerprint"] = dataset_fingerprint(df_processed)
     return df_processed
 
 
+@st.cache_resource
+def obtener_cache_disco() -> ProcessedDataCache:
+    """
+    Caché persistente (Feather) de datos procesados, compartido entre
+    procesos y reinicios del servidor.
+    """
+    return ProcessedDataCache()
+
+
+@st.cache_resource
+def obtener_cache_clasificacion() -> ClassificationCache:
+    """
+    Caché compartido de clasificaciones (LRU) entre reruns y sesiones.
+
+    Guarda solo los arreglos `dureza`/`indice_dureza` del dataset completo
+    por (huella, umbrales, métrica); los filtros se aplican con máscaras.
+    """
+    return ClassificationCache()
+
+
+@st.cache_resource(max_entries=4)
+def obtener_indice_espacial(huella: str, _df: pd.DataFrame) -> SpatialIndex:
+    """
+    Índice espacial (grilla) sobre este/norte/elevación, construido una
+    vez por dataset procesado. La huella identifica el dataset; el
+    DataFrame no se hashea (prefijo `_`).
+    """
+    return SpatialIndex.from_frame(_df)
+
+
+@st.cache_resource(max_entries=4)
+def obtener_indice_filtros(huella: str, _df: pd.DataFrame) -> FilterIndex:
+    """
+    Índices de filtros (fechas ordenadas, filas por perforadora y drill
+    pattern, opciones de los multiselect) construidos una vez por dataset.
+    """
+    return FilterIndex(_df)
+
+
+@st.cache_resource(max_entries=4)
+def obtener_motor_tendencias(huella: str, _df: pd.DataFrame) -> TrendEngine:
+    """
+    Orden por (perforadora, tiempo inicio) para las tendencias, calculado
+    una vez por dataset; los filtros se aplican con `subset`.
+    """
+    return TrendEngine(_df)
+
+
+@st.cache_resource(max_entries=4)
+def obtener_motor_filtrado(
+    huella: str, filtro: str, _df: pd.DataFrame, _filas: np.ndarray
+) -> TrendEngine:
+    """
+    Motor de tendencias restringido a las filas del filtro (`filtro` es
+    la huella de su máscara). Se conserva entre reruns, y con él los
+    inicios de ventana que ya calculó.
+    """
+    return obtener_motor_tendencias(huella, _df).subset(_filas)
+
+
+@st.cache_resource(max_entries=8)
+def obtener_tendencias(
+    huella: str,
+    filtro: str,
+    variable: str,
+    clave_valores: Optional[tuple],
+    ventana: str,
+    metodo: str,
+    _motor: TrendEngine,
+    _valores: np.ndarray,
+) -> pd.DataFrame:
+    """
+    Tendencias submuestreadas de una variable, por dataset, filtro,
+    ventana y método. `clave_valores` identifica los valores cuando no
+    son una columna del dataset (los umbrales del índice de dureza).
+    """
+    return _motor.trends({variable: _valores}, ventana, metodo)
+
+
+@st.cache_resource(max_entries=4)
+def obtener_intervalos(huella: str, _df: pd.DataFrame) -> RigIntervals:
+    """
+    Intervalos por perforadora (inactividad, solapes y utilización por
+    turno) calculados una vez por dataset.
+    """
+    return RigIntervals(_df)
+
+
+@st.cache_resource(max_entries=8)
+def obtener_utilizacion(huella: str, horas_turno: int, _intervalos: RigIntervals) -> pd.DataFrame:
+    """Utilización por perforadora y turno, una vez por dataset y duración de turno."""
+    return _intervalos.utilisation(shift_hours=horas_turno)
+
+
+@st.cache_resource(max_entries=4)
+def obtener_normalizaciones(
+    huella: str, excluir_anomalias: bool, _df: pd.DataFrame, _anomalias: np.ndarray
+) -> pd.DataFrame:
+    """
+    Vista liviana del dataset con las tres normalizaciones por
+    perforadora de la tasa (z-score, robusta y percentil). Las
+    estadísticas de cada perforadora se calculan una vez por dataset (y
+    por opción de excluir anomalías) y no cambian con los filtros.
+
+    Al excluir anomalías, la vista lleva la columna `anomalia` y una
+    huella propia, para que el caché de clasificación no reutilice las
+    clasificaciones hechas con las estadísticas completas.
+    """
+    df = _df
+    if excluir_anomalias:
+        df = _df.assign(anomalia=_anomalias)
+        df.attrs["fingerprint"] = f"{huella}:sin_anomalias"
+    return DataProcessor().add_rig_normalized_rate(
+        df, copy=False, modes=tuple(RIG_NORMALIZATION_MODES),
+        exclude_anomalies=excluir_anomalias,
+    )
+
+
+@st.cache_resource(max_entries=4)
+def obtener_normalizador(
+    huella: str, claves: tuple, previa: float, excluir_anomalias: bool, _df: pd.DataFrame
+) -> HierarchicalNormalizer:
+    """
+    Estadísticas de la tasa por grupos anidados (p. ej. perforadora ×
+    drill pattern × semana), contraídas hacia el grupo padre. Se
+    calculan una vez por dataset, claves, constante y opción de excluir
+    anomalías; los filtros solo seleccionan filas.
+    """
+    return DataProcessor().hierarchical_normalizer(
+        _df, keys=claves, prior=previa, exclude_anomalies=excluir_anomalias
+    )
+
+
+# Texto de cada métrica de clasificación del selector.
+ETIQUETAS_METRICA = {
+    "duration": "Duración",
+    "penetration_rate": "Tasa de penetración",
+    "rig_normalized_penetration": "Tasa normalizada por perforadora (z-score)",
+    "rig_robust_penetration": "Tasa normalizada por perforadora (mediana/MAD)",
+    "rig_percentile_penetration": "Percentil de tasa en su perforadora",
+}
+
+
+# Texto de cada motivo de `anomaly_detection.ANOMALY_REASONS`.
+MOTIVOS_ANOMALIA = {
+    "duracion_no_positiva": "duración no positiva",
+    "tasa_invalida": "tasa inválida",
+    "duracion_atipica": "duración atípica",
+    "tasa_atipica": "tasa atípica",
+}
+
+
+@st.cache_resource(max_entries=4)
+def obtener_anomalias(huella: str, _df: pd.DataFrame):
+    """
+    Marca de anomalías por fila (duración o tasa de penetración fuera de
+    lo típico de su perforadora) y su reporte, calculados una vez por
+    dataset.
+    """
+    marcado = DataProcessor().flag_anomalies(_df, copy=False)
+    return marcado["anomalia"].to_numpy(), marcado.attrs["anomaly_report"]
+
+
+def _parse_polygon(texto: str) -> list:
+    """Vértices `(este, norte)` desde líneas "este,norte" del text area."""
+    vertices = []
+    for linea in texto.strip().splitlines():
+        if not linea.strip():
+            continue
+        este, norte = (float(valor) for valor in linea.replace(";", ",").split(",")[:2])
+        vertices.append((este, norte))
+    return vertices
+
+
 def _build_thresholds_from_widgets(
     duration_soft: float,
     duration_medium: float,
@@ -65,6 +264,66 @@ def _build_thresholds_from_widgets(
     }
 
 
+# Las métricas de tasa comparten el grupo "rate" de `Thresholds` pero no
+# la escala: cada escala tiene sus propios sliders (y claves de estado).
+ESCALAS_TASA = {
+    "penetration_rate": "rate",
+    "rig_normalized_penetration": "zscore",
+    "rig_robust_penetration": "zscore",
+    "rig_percentile_penetration": "percentile",
+}
+
+# (mínimo, máximo, paso) de los sliders de umbrales; la calibración
+# ajusta sus propuestas a estos rangos antes de escribirlas.
+RANGOS_SLIDERS = {
+    "duration": (1.0, 120.0, 0.5),
+    "rate": (0.01, 10.0, 0.05),
+    "zscore": (-4.0, 4.0, 0.05),
+    "percentile": (0.0, 1.0, 0.01),
+}
+
+# Valores iniciales de cada escala; los z-scores y el percentil parten
+# de los cuartiles (de una normal estándar, en el caso del z-score).
+DEFAULTS_SLIDERS = {
+    "duration": DEFAULT_DURATION_THRESHOLDS,
+    "rate": DEFAULT_RATE_THRESHOLDS,
+    "zscore": {"soft": 0.65, "medium": 0.0, "hard": -0.65},
+    "percentile": {"soft": 0.75, "medium": 0.5, "hard": 0.25},
+}
+
+# Texto y unidad de los sliders de cada escala.
+ETIQUETAS_SLIDERS = {
+    "duration": ("Duration", "min"),
+    "rate": ("Rate", "m/min"),
+    "zscore": ("Rate z-score", "z"),
+    "percentile": ("Rate percentile", "0-1"),
+}
+
+
+def _calibrar_umbrales(
+    df: pd.DataFrame, filas: np.ndarray, metodo: str, metrica_tasa: str = "penetration_rate"
+) -> None:
+    """
+    Callback del botón "Calibrar umbrales": propone los cortes de
+    duración y tasa a partir de las filas filtradas y los escribe en el
+    estado de los sliders, que se muestran ya movidos en el rerun. Los
+    cortes de tasa se calculan sobre `metrica_tasa` (la tasa o una de
+    sus normalizaciones) y se ajustan a los sliders de su escala.
+    """
+    data_processor = DataProcessor()
+    vista = df.iloc[filas]
+    for grupo, metrica in (("duration", "duration"), ("rate", metrica_tasa)):
+        try:
+            propuesta = data_processor.calibrate_thresholds(vista, metrica, metodo)[grupo]
+        except ValueError as e:
+            st.sidebar.warning(f"No se pudo calibrar {grupo}: {e}")
+            continue
+        escala = ESCALAS_TASA[metrica] if grupo == "rate" else grupo
+        ajustados = snap_cutoffs(propuesta, *RANGOS_SLIDERS[escala], descending=grupo == "rate")
+        for corte, valor in ajustados.items():
+            st.session_state[f"threshold_{escala}_{corte}"] = float(valor)
+
+
 def main() -> None:
     """
     Función principal que ejecuta la aplicación Streamlit para clasificar y visualizar datos de pozos perforados.
@@ -91,11 +350,79 @@ def main() -> None:
             # Cargar y procesar datos con caché
             df_processed: pd.DataFrame = cargar_datos(uploaded_file)
             st.success("Archivo CSV cargado y procesado exitosamente.")
+            reporte_lectura = df_processed.attrs.get("parse_report")
+            if reporte_lectura and reporte_lectura["skipped_count"]:
+                lineas = ", ".join(map(str, reporte_lectura["skipped_lines"][:10]))
+                st.warning(
+                    f"Se descartaron {reporte_lectura['skipped_count']} filas "
+                    f"con campos extra respecto al encabezado (líneas: {lineas or '—'})."
+                )
+            reporte_fechas = df_processed.attrs.get("datetime_report") or {}
+            for columna, reporte in reporte_fechas.items():
+                if reporte.get("ambiguous"):
+                    st.info(
+                        f"Las fechas de '{columna}' admiten día y mes intercambiados; "
+                        f"se interpretaron con el formato {reporte['format']!r}."
+                    )
+                if reporte["inferred_count"]:
+                    filas = ", ".join(map(str, reporte["inferred_rows"][:10]))
+                    st.info(
+                        f"{reporte['inferred_count']} valores de '{columna}' no siguen ningún "
+                        f"formato conocido y se interpretaron uno a uno; revisa el orden "
+                        f"día/mes (filas: {filas})."
+                    )
+                if reporte["failed_count"]:
+                    filas = ", ".join(map(str, reporte["failed_rows"][:10]))
+                    st.warning(
+                        f"{reporte['failed_count']} valores de '{columna}' no tienen "
+                        f"un formato de fecha reconocible (filas: {filas})."
+                    )
+
+            # Dos pozos de la misma perforadora no pueden perforarse a la
+            # vez: los intervalos solapados son errores de registro.
+            intervalos = None
+            if "perforadora" in df_processed.columns:
+                intervalos = obtener_intervalos(df_processed.attrs.get("fingerprint", ""), df_processed)
+                reporte_solapes = intervalos.overlap_report()
+                if reporte_solapes["overlap_count"]:
+                    filas = ", ".join(map(str, reporte_solapes["overlap_rows"][:10]))
+                    st.warning(
+                        f"{reporte_solapes['overlap_count']} pozos se solapan en el tiempo con otro "
+                        f"de la misma perforadora ({', '.join(reporte_solapes['rigs'])}; filas: {filas})."
+                    )
+
+            # Lecturas de sensor inválidas o atípicas (mediana/MAD por
+            # perforadora); se pueden excluir de la vista más abajo.
+            anomalias, reporte_anomalias = obtener_anomalias(
+                df_processed.attrs.get("fingerprint", ""), df_processed
+            )
+            if reporte_anomalias["anomaly_count"]:
+                motivos = ", ".join(
+                    f"{MOTIVOS_ANOMALIA[motivo]}: {cantidad}"
+                    for motivo, cantidad in reporte_anomalias["by_reason"].items()
+                    if cantidad
+                )
+                st.warning(f"{reporte_anomalias['anomaly_count']} pozos con lecturas anómalas ({motivos}).")
+            # Excluirlas las saca de la vista y de las estadísticas por
+            # perforadora de las normalizaciones.
+            excluir_anomalias: bool = bool(reporte_anomalias["anomaly_count"]) and st.sidebar.checkbox(
+                "Excluir lecturas anómalas", value=False
+            )
 
             # Inicializar el adapter una sola vez — el resto de los
             # helpers (classify_with_metric, add_rig_normalized_rate)
             # son funciones puras sobre el DataFrame cacheado.
             data_processor = DataProcessor()
+            huella: str = df_processed.attrs.get("fingerprint", "")
+            indice_filtros = obtener_indice_filtros(huella, df_processed)
+            # Normalizaciones por perforadora (Phase B.3 + Phase D.1): se
+            # agregan al dataset completo para que el caché de
+            # clasificación pueda usarlas como métrica y los gráficos por
+            # perforadora tengan contra qué comparar.
+            if "perforadora" in df_processed.columns:
+                df_processed = obtener_normalizaciones(
+                    huella, excluir_anomalias, df_processed, anomalias
+                )
 
             # Filtros en la barra lateral
             with st.sidebar:
@@ -108,8 +435,8 @@ def main() -> None:
                 # y mutar el resultado cacheado corrompe invocaciones futuras.
 
                 # Obtener fechas mínima y máxima
-                min_date = df_processed['tiempo inicio'].min().date()
-                max_date = df_processed['tiempo inicio'].max().date()
+                min_date = indice_filtros.min_time.date()
+                max_date = indice_filtros.max_time.date()
 
                 # Crear selector de rango de fechas
                 date_range = st.date_input(
@@ -136,12 +463,9 @@ def main() -> None:
                 # Filtro por perforadora (Phase C.3). Multiselect sobre
                 # los rigs normalizados; si la columna no existe en el
                 # CSV se muestra un info y se omite sin error.
-                if "perforadora" in df_processed.columns:
+                if indice_filtros.has_column("perforadora"):
                     st.subheader("Filtro por perforadora")
-                    rigs = sorted(
-                        df_processed["perforadora"].dropna().astype(str).unique(),
-                        reverse=True,
-                    )
+                    rigs = indice_filtros.values("perforadora")[::-1]
                     perforadoras_seleccionadas: list = st.multiselect(
                         "Perforadoras",
                         rigs,
@@ -154,123 +478,163 @@ def main() -> None:
                     )
 
             # Filtro por drill pattern
-            if "drill_pattern" in df_processed.columns:
+            drill_pattern_seleccionado: list = []
+            if indice_filtros.has_column("drill_pattern"):
                 with st.sidebar:
                     st.subheader("Filtro por drill pattern")
-                    # Ordenar la lista de drill patterns en orden descendente
-                    drill_patterns: list = sorted(df_processed["drill_pattern"].dropna().astype(str).unique(), reverse=True)
-                    drill_pattern_seleccionado: list = st.multiselect("Selecciona drill patterns:", drill_patterns)
-
-                    if drill_pattern_seleccionado:
-                        df_filtrado: pd.DataFrame = df_processed[
-                            (df_processed["drill_pattern"].isin(drill_pattern_seleccionado)) &
-                            (df_processed['tiempo inicio'] >= start_date) &
-                            (df_processed['tiempo inicio'] <= end_date)
-                        ]
-                    else:
-                        df_filtrado: pd.DataFrame = df_processed[
-                            (df_processed['tiempo inicio'] >= start_date) &
-                            (df_processed['tiempo inicio'] <= end_date)
-                        ]
+                    # Opciones en orden descendente, desde el índice cacheado.
+                    drill_patterns: list = indice_filtros.values("drill_pattern")[::-1]
+                    drill_pattern_seleccionado = st.multiselect("Selecciona drill patterns:", drill_patterns)
+
+                    if not drill_pattern_seleccionado:
                         st.sidebar.info("Mostrando todos los Drill Patterns.")
             else:
-                df_filtrado: pd.DataFrame = df_processed[
-                    (df_processed['tiempo inicio'] >= start_date) &
-                    (df_processed['tiempo inicio'] <= end_date)
-                ]
                 st.sidebar.info("No se encontró la columna 'drill_pattern'. Mostrando todos los datos.")
 
-            # Aplicar filtro por perforadora sobre el set ya filtrado.
-            if perforadoras_seleccionadas and "perforadora" in df_filtrado.columns:
-                df_filtrado = df_filtrado[
-                    df_filtrado["perforadora"].isin(perforadoras_seleccionadas)
-                ]
+            # Filtro por región: consultas sobre el índice espacial en vez
+            # de recorrer las coordenadas de todo el dataset.
+            indice_espacial = None
+            filas_region = None
+            if {"este", "norte"} <= set(df_processed.columns):
+                indice_espacial = obtener_indice_espacial(huella, df_processed)
+                with st.sidebar:
+                    st.subheader("Filtro por región")
+                    tipo_region: str = st.radio(
+                        "Región", ("Todas", "Radio", "Polígono"), horizontal=True
+                    )
+                    if tipo_region == "Radio":
+                        centro_este = st.number_input(
+                            "Centro este", value=float(df_processed["este"].median())
+                        )
+                        centro_norte = st.number_input(
+                            "Centro norte", value=float(df_processed["norte"].median())
+                        )
+                        radio = st.number_input("Radio (m)", min_value=0.0, value=100.0, step=10.0)
+                        filas_region = indice_espacial.within_radius(centro_este, centro_norte, radio)
+                    elif tipo_region == "Polígono":
+                        texto_poligono: str = st.text_area(
+                            "Vértices (una línea 'este,norte' por vértice)"
+                        )
+                        if texto_poligono.strip():
+                            try:
+                                filas_region = indice_espacial.within_polygon(
+                                    _parse_polygon(texto_poligono)
+                                )
+                            except ValueError as e:
+                                st.warning(f"Polígono inválido: {e}")
+                    if filas_region is not None:
+                        st.caption(f"{len(filas_region)} pozos dentro de la región.")
+
+            # Los filtros se combinan intersectando las filas de los índices
+            # precalculados; la máscara booleana se arma una vez, al final,
+            # para la clasificación cacheada.
+            filas_filtradas = indice_filtros.select(
+                start_date,
+                end_date,
+                {
+                    "perforadora": perforadoras_seleccionadas,
+                    "drill_pattern": drill_pattern_seleccionado,
+                },
+                extra=() if filas_region is None else (filas_region,),
+            )
+            mascara = indice_filtros.mask(filas_filtradas)
+            if excluir_anomalias:
+                mascara = mascara & ~anomalias
+                filas_filtradas = np.flatnonzero(mascara)
 
             # Mostrar información sobre el filtro de fecha aplicado
             st.info(f"Mostrando datos desde {start_date.strftime('%Y-%m-%d')} hasta {end_date.strftime('%Y-%m-%d')}")
 
             # --- Phase C.1 / C.2: Umbrales expander with 6 sliders ---
+            # Los defaults viven en el estado de sesión (no en `value=`)
+            # para que "Calibrar umbrales" pueda mover los sliders.
+            for escala, defaults in DEFAULTS_SLIDERS.items():
+                for corte, valor in defaults.items():
+                    st.session_state.setdefault(f"threshold_{escala}_{corte}", float(valor))
             with st.sidebar:
+                # Métrica que clasifica la dureza: la duración (contrato
+                # pre-cambio, por defecto), la tasa o una de sus
+                # normalizaciones por perforadora, con los cortes de tasa.
+                metrica: str = st.selectbox(
+                    "Métrica de clasificación",
+                    [m for m, columna in METRIC_COLUMNS.items() if columna in df_processed.columns],
+                    format_func=ETIQUETAS_METRICA.get,
+                )
                 with st.expander("Umbrales", expanded=False):
                     st.caption(
                         "Ajusta los límites de clasificación. Los defaults "
                         "reproducen las clasificaciones previas."
                     )
-                    duration_soft = st.slider(
-                        "Duration soft (min)",
-                        min_value=1.0,
-                        max_value=120.0,
-                        value=float(DEFAULT_DURATION_THRESHOLDS["soft"]),
-                        step=0.5,
-                        key="threshold_duration_soft",
+                    metodo_calibracion: str = st.selectbox(
+                        "Método de calibración",
+                        ("quantile", "jenks"),
+                        format_func={"quantile": "Cuartiles", "jenks": "Cortes naturales (Jenks)"}.get,
                     )
-                    duration_medium = st.slider(
-                        "Duration medium (min)",
-                        min_value=1.0,
-                        max_value=120.0,
-                        value=float(DEFAULT_DURATION_THRESHOLDS["medium"]),
-                        step=0.5,
-                        key="threshold_duration_medium",
+                    st.button(
+                        "Calibrar umbrales",
+                        help="Propone los cortes a partir de los datos filtrados.",
+                        on_click=_calibrar_umbrales,
+                        args=(
+                            df_processed, filas_filtradas, metodo_calibracion,
+                            metrica if metrica in RATE_METRICS else "penetration_rate",
+                        ),
                     )
-                    duration_hard = st.slider(
-                        "Duration hard (min)",
-                        min_value=1.0,
-                        max_value=120.0,
-                        value=float(DEFAULT_DURATION_THRESHOLDS["hard"]),
-                        step=0.5,
-                        key="threshold_duration_hard",
+                    # Los sliders de tasa siguen la escala de la métrica
+                    # activa (m/min, z-score o percentil).
+                    escala_tasa = ESCALAS_TASA.get(metrica, "rate")
+                    cortes = {}
+                    for grupo, escala in (("duration", "duration"), ("rate", escala_tasa)):
+                        minimo, maximo, paso = RANGOS_SLIDERS[escala]
+                        nombre, unidad = ETIQUETAS_SLIDERS[escala]
+                        for corte in ("soft", "medium", "hard"):
+                            cortes[f"{grupo}_{corte}"] = st.slider(
+                                f"{nombre} {corte} ({unidad})",
+                                min_value=minimo,
+                                max_value=maximo,
+                                step=paso,
+                                key=f"threshold_{escala}_{corte}",
+                            )
+
+            # Build the Thresholds dict on every rerun. Classification
+            # arrays are memoized per (dataset, thresholds, metric), so
+            # only a slider move that changes the active metric's cutoffs
+            # re-classifies; the cached DataFrame stays intact.
+            thresholds: Thresholds = _build_thresholds_from_widgets(**cortes)
+
+            # Clasifica usando los umbrales actuales y la métrica
+            # elegida. El caché devuelve la clasificación del dataset
+            # completo y la vista filtrada se obtiene con la máscara.
+            df_clasificado: pd.DataFrame = obtener_cache_clasificacion().view(
+                df_processed,
+                mascara,
+                thresholds,
+                metrica,
+                fingerprint=df_processed.attrs.get("fingerprint"),
+                compact=True,
+            )
+
+            # Consulta del pozo más cercano a un punto, con su dureza según
+            # los umbrales actuales (índice espacial + caché de clasificación).
+            if indice_espacial is not None:
+                with st.expander("Pozo más cercano a un punto"):
+                    col_este, col_norte, col_k = st.columns(3)
+                    punto_este = col_este.number_input(
+                        "Este", value=float(df_processed["este"].median()), key="nn_este"
                     )
-                    rate_soft = st.slider(
-                        "Rate soft (m/min)",
-                        min_value=0.01,
-                        max_value=10.0,
-                        value=float(DEFAULT_RATE_THRESHOLDS["soft"]),
-                        step=0.05,
-                        key="threshold_rate_soft",
+                    punto_norte = col_norte.number_input(
+                        "Norte", value=float(df_processed["norte"].median()), key="nn_norte"
                     )
-                    rate_medium = st.slider(
-                        "Rate medium (m/min)",
-                        min_value=0.01,
-                        max_value=10.0,
-                        value=float(DEFAULT_RATE_THRESHOLDS["medium"]),
-                        step=0.05,
-                        key="threshold_rate_medium",
+                    vecinos = int(col_k.number_input("Cantidad", min_value=1, max_value=50, value=1))
+                    filas, distancias = indice_espacial.nearest(punto_este, punto_norte, k=vecinos)
+                    _, indices_dureza = obtener_cache_clasificacion().classify(
+                        df_processed, thresholds, metrica,
+                        fingerprint=df_processed.attrs.get("fingerprint"),
                     )
-                    rate_hard = st.slider(
-                        "Rate hard (m/min)",
-                        min_value=0.01,
-                        max_value=10.0,
-                        value=float(DEFAULT_RATE_THRESHOLDS["hard"]),
-                        step=0.05,
-                        key="threshold_rate_hard",
+                    columnas = [c for c in ("pozo", "este", "norte", "elevacion") if c in df_processed.columns]
+                    cercanos = df_processed.iloc[filas][columnas].assign(
+                        distancia_m=distancias, indice_dureza=indices_dureza[filas]
                     )
-
-            # Build the Thresholds dict on every rerun so any slider
-            # movement re-classifies. The data_processor adapter copies
-            # the cached DataFrame so the cache stays intact.
-            thresholds: Thresholds = _build_thresholds_from_widgets(
-                duration_soft=duration_soft,
-                duration_medium=duration_medium,
-                duration_hard=duration_hard,
-                rate_soft=rate_soft,
-                rate_medium=rate_medium,
-                rate_hard=rate_hard,
-            )
-
-            # Reclasifica usando los umbrales actuales. Por defecto se
-            # usa la métrica "duration" para preservar el contrato
-            # pre-cambio.
-            df_clasificado: pd.DataFrame = data_processor.classify_with_metric(
-                df_filtrado, thresholds, "duration"
-            )
-
-            # Per-rig normalization column (Phase B.3 + Phase D.1). When
-            # the rig column is present we add it so the per-rig plots
-            # have something to box against.
-            if "perforadora" in df_clasificado.columns:
-                df_clasificado = data_processor.add_rig_normalized_rate(
-                    df_clasificado
-                )
+                    st.dataframe(cercanos)
 
             # Mostrar información sobre el filtro de fecha aplicado
             st.info(
@@ -294,6 +658,138 @@ def main() -> None:
                 key="download_csv",
             )
 
+            # Barrido de los umbrales de la métrica activa sobre las filas
+            # filtradas: un solo pase ordenado en vez de mover los sliders
+            # uno a uno.
+            grupo_umbrales = "rate" if metrica in RATE_METRICS else "duration"
+            with st.expander(f"Sensibilidad de umbrales ({ETIQUETAS_METRICA[metrica]})"):
+                col_x, col_y, col_pasos = st.columns(3)
+                eje_x: str = col_x.selectbox("Eje X", ("soft", "medium", "hard"))
+                eje_y: str = col_y.selectbox(
+                    "Eje Y", ("ninguno",) + tuple(p for p in ("soft", "medium", "hard") if p != eje_x)
+                )
+                pasos = int(col_pasos.number_input("Pasos por eje", min_value=3, max_value=100, value=25))
+                actuales = thresholds[grupo_umbrales]
+                # Cada eje recorre ±50% del valor actual (±0.5 si es 0,
+                # como en los z-scores); los demás quedan fijos.
+                candidatos = {
+                    p: (
+                        np.linspace(v - (0.5 * abs(v) or 0.5), v + (0.5 * abs(v) or 0.5), pasos)
+                        if p in (eje_x, eje_y) else [v]
+                    )
+                    for p, v in actuales.items()
+                }
+                barrido = data_processor.threshold_sweep(
+                    df_clasificado, metrica,
+                    candidatos["soft"], candidatos["medium"], candidatos["hard"],
+                )
+                if barrido.empty:
+                    orden = "soft > medium > hard" if grupo_umbrales == "rate" else "soft < medium < hard"
+                    st.info(f"Ninguna combinación mantiene {orden} en ese rango.")
+                else:
+                    st.plotly_chart(
+                        Visualizer.plot_threshold_sweep(
+                            barrido, eje_x, None if eje_y == "ninguno" else eje_y, fixed=actuales
+                        ),
+                        key="threshold_sweep",
+                    )
+
+            # Tendencias móviles por perforadora sobre las filas filtradas;
+            # cada serie se reduce a unos cientos de puntos. Streamlit
+            # ejecuta los expanders aunque estén cerrados, así que el
+            # cálculo espera a que se pida y queda cacheado por filtro.
+            with st.expander("Tendencias por perforadora"):
+                if st.checkbox("Calcular tendencias", value=False, key="calcular_tendencias"):
+                    col_variable, col_ventana, col_metodo = st.columns(3)
+                    variables = [
+                        c for c in Visualizer.TREND_COLUMN_LABELS
+                        if c == "indice_dureza" or c in df_processed.columns
+                    ]
+                    variable: str = col_variable.selectbox(
+                        "Variable", variables, format_func=Visualizer.TREND_COLUMN_LABELS.get
+                    )
+                    ventana: str = col_ventana.selectbox(
+                        "Ventana", list(TREND_WINDOWS),
+                        format_func={"turno": "Turno (12 h)", "dia": "Día", "semana": "Semana"}.get,
+                    )
+                    metodo: str = col_metodo.radio(
+                        "Método", ("rolling", "ewm"), horizontal=True,
+                        format_func={"rolling": "Media móvil", "ewm": "EWMA"}.get,
+                    )
+                    clave_valores = None
+                    if variable == "indice_dureza":
+                        _, valores = obtener_cache_clasificacion().classify(
+                            df_processed, thresholds, metrica,
+                            fingerprint=df_processed.attrs.get("fingerprint"),
+                        )
+                        clave_valores = thresholds_key(thresholds, metrica)
+                    else:
+                        valores = df_processed[variable].to_numpy(dtype=float, na_value=np.nan)
+                    filtro = mask_key(mascara)
+                    motor = obtener_motor_filtrado(huella, filtro, df_processed, filas_filtradas)
+                    tendencias = obtener_tendencias(
+                        df_processed.attrs.get("fingerprint", huella), filtro, variable,
+                        clave_valores, ventana, metodo, motor, valores,
+                    )
+                    if tendencias.empty:
+                        st.info("No hay pozos con fecha y perforadora en el filtro actual.")
+                    else:
+                        st.plotly_chart(Visualizer.plot_trend(tendencias, variable), key="trend")
+
+            # Utilización por turno y pozos solapados para revisión, a
+            # pedido como las tendencias.
+            if intervalos is not None:
+                with st.expander("Utilización de perforadoras"):
+                    if st.checkbox("Calcular utilización", value=False, key="calcular_utilizacion"):
+                        horas_turno = st.radio("Turno", (12, 8), horizontal=True, format_func="{} h".format)
+                        utilizacion = obtener_utilizacion(huella, horas_turno, intervalos)
+                        st.plotly_chart(
+                            Visualizer.plot_rig_utilisation(utilizacion), key="rig_utilisation"
+                        )
+                        filas_solapadas = np.flatnonzero(intervalos.overlap_mask())
+                        if len(filas_solapadas):
+                            columnas = [
+                                c for c in ("pozo", "perforadora", "tiempo inicio", "tiempo final")
+                                if c in df_processed.columns
+                            ]
+                            st.caption(f"Pozos solapados para revisión ({len(filas_solapadas)}):")
+                            st.dataframe(
+                                df_processed.iloc[filas_solapadas[:1_000]][columnas]
+                            )
+
+            # Z-scores de la tasa dentro de grupos anidados; los grupos con
+            # pocos pozos se acercan a las estadísticas de su grupo padre.
+            with st.expander("Normalización jerárquica"):
+                claves_disponibles = [
+                    c for c in ("perforadora", "drill_pattern") if c in df_processed.columns
+                ] + list(TIME_KEYS)
+                col_claves, col_previa = st.columns((3, 1))
+                claves: list = col_claves.multiselect(
+                    "Claves (de la más general a la más fina)",
+                    claves_disponibles,
+                    default=[c for c in DataProcessor.HIERARCHY_KEYS if c in claves_disponibles],
+                    format_func=lambda c: {"dia": "Día", "semana": "Semana", "mes": "Mes"}.get(c, c),
+                )
+                previa: float = col_previa.number_input(
+                    "Contracción (pozos)", min_value=0.0,
+                    value=float(DataProcessor.SHRINKAGE_PRIOR), step=5.0,
+                )
+                if claves:
+                    try:
+                        normalizador = obtener_normalizador(
+                            huella, tuple(claves), previa, excluir_anomalias, df_processed
+                        )
+                    except ValueError as e:
+                        st.warning(f"No se pudo normalizar: {e}")
+                    else:
+                        z_jerarquica = normalizador.zscores()[filas_filtradas]
+                        st.caption(
+                            f"{len(normalizador)} grupos; "
+                            f"{np.count_nonzero(np.abs(z_jerarquica) > 3)} pozos filtrados "
+                            "con |z| > 3 dentro de su grupo."
+                        )
+                        st.dataframe(normalizador.table().head(1_000), hide_index=True)
+
             # Opciones de visualización
             st.sidebar.header("Opciones de visualización")
             mostrar_box_plot: bool = st.sidebar.checkbox("Mostrar box plot", value=True)
@@ -304,6 +800,27 @@ def main() -> None:
             mostrar_per_rig: bool = st.sidebar.checkbox(
                 "Mostrar gráficos por perforadora", value=True
             )
+            # Sobre este máximo los mapas de pozos usan WebGL y una muestra
+            # espacial determinista (ver Visualizer._large_data_sample).
+            max_pozos_mapa: int = int(st.sidebar.number_input(
+                "Máximo de pozos por mapa",
+                min_value=1_000,
+                value=Visualizer.POINT_BUDGET,
+                step=5_000,
+            ))
+            modo_grandes_volumenes: bool = len(df_clasificado) > max_pozos_mapa
+            tipo_mapa_dureza: str = st.sidebar.radio(
+                "Mapa de índice de dureza", ("Por pozo", "Grilla"), horizontal=True
+            )
+            if tipo_mapa_dureza == "Grilla":
+                estadistica_grilla: str = st.sidebar.selectbox(
+                    "Estadística por celda",
+                    list(Visualizer.RASTER_STATISTIC_LABELS),
+                    format_func=Visualizer.RASTER_STATISTIC_LABELS.get,
+                )
+                celda_grilla: float = st.sidebar.number_input(
+                    "Tamaño de celda (m, 0 = automático)", min_value=0.0, value=0.0, step=5.0
+                )
 
             # Crear la grilla de 2x2
             col1, col2 = st.columns(2)
@@ -319,7 +836,13 @@ def main() -> None:
             if mostrar_torta:
                 with col2:
                     st.subheader("Tiempo promedio por dureza (torta)")
-                    fig_pie: px.Figure = Visualizer.plot_dureza_count(df_clasificado)
+                    resumen_dureza = obtener_cache_clasificacion().summary(
+                        df_processed, mascara, thresholds, metrica, "dureza", "duracion",
+                        fingerprint=df_processed.attrs.get("fingerprint"),
+                    )
+                    fig_pie: px.Figure = Visualizer.plot_dureza_count(
+                        df_clasificado, summary=resumen_dureza
+                    )
                     st.plotly_chart(fig_pie, key="pie_chart")
 
             # Gráfico de Ubicación y Mapa de Densidad (fila 2)
@@ -327,30 +850,63 @@ def main() -> None:
             if mostrar_ubicacion_equipo:
                 with col1:
                     st.subheader("Ubicación de pozos")
-                    fig_ubicacion_filtrado: px.Figure = Visualizer.plot_location_interactive(df_clasificado)
+                    fig_ubicacion_filtrado: px.Figure = Visualizer.plot_location_interactive(
+                        df_clasificado,
+                        large_data=modo_grandes_volumenes,
+                        point_budget=max_pozos_mapa,
+                    )
                     st.plotly_chart(fig_ubicacion_filtrado, key="filtered_location")
 
             # Mapa de Dureza 3D
             if mostrar_mapa_dureza:
                 with col2:
                     st.subheader("Mapa de índice de dureza 3D")
-                    fig_hardness: px.Figure = Visualizer.plot_hardness_heatmap(df_clasificado)
+                    if tipo_mapa_dureza == "Grilla":
+                        fig_hardness = Visualizer.plot_hardness_raster(
+                            df_clasificado,
+                            cell_size=celda_grilla or None,
+                            statistic=estadistica_grilla,
+                        )
+                    else:
+                        fig_hardness = Visualizer.plot_hardness_heatmap(
+                            df_clasificado,
+                            large_data=modo_grandes_volumenes,
+                            point_budget=max_pozos_mapa,
+                        )
                     st.plotly_chart(fig_hardness, key="hardness_map")
 
             # Visualización 3D a ancho completo
             if mostrar_3d_scatter:
                 st.subheader("Visualización 3D de pozos")
-                fig_3d_scatter: px.Figure = Visualizer.plot_3d_scatter(df_clasificado)
+                fig_3d_scatter: px.Figure = Visualizer.plot_3d_scatter(
+                    df_clasificado,
+                    large_data=modo_grandes_volumenes,
+                    point_budget=max_pozos_mapa,
+                )
                 # Usar el ancho completo de la pantalla
                 st.plotly_chart(fig_3d_scatter, key="3d_scatter")
 
             # --- Phase D: per-rig box plots ---
             if mostrar_per_rig:
+                # Con muchos pozos las cajas se dibujan desde los cuartiles
+                # por perforadora (cacheados por dataset, filtro y umbrales)
+                # en vez de enviar cada fila al navegador.
+                resumen_rig = {"tasa_penetracion": None, "indice_dureza": None}
+                if modo_grandes_volumenes and "perforadora" in df_processed.columns:
+                    for valor in resumen_rig:
+                        if valor not in df_clasificado.columns:
+                            continue
+                        resumen_rig[valor] = obtener_cache_clasificacion().summary(
+                            df_processed, mascara, thresholds, metrica, "perforadora", valor,
+                            fingerprint=df_processed.attrs.get("fingerprint"),
+                        )
                 col1, col2 = st.columns(2)
                 with col1:
                     st.subheader("Tasa de penetración por perforadora")
                     fig_rate_rig = Visualizer.plot_penetration_rate_by_rig(
-                        df_clasificado
+                        df_clasificado,
+                        summary=resumen_rig["tasa_penetracion"],
+                        large_data=modo_grandes_volumenes,
                     )
                     if fig_rate_rig is None:
                         st.info(
@@ -362,7 +918,9 @@ def main() -> None:
                 with col2:
                     st.subheader("Índice de dureza por perforadora")
                     fig_hardness_rig = Visualizer.plot_hardness_by_rig(
-                        df_clasificado
+                        df_clasificado,
+                        summary=resumen_rig["indice_dureza"],
+                        large_data=modo_grandes_volumenes,
                     )
                     if fig_hardness_rig is None:
                         st.info(
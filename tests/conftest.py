@@ -1,8 +1,35 @@
+import importlib
 import logging
 
+import pandas as pd
 import pytest
 
 
 @pytest.fixture(autouse=True)
 def _neutralize_logging_basicconfig(monkeypatch):
-    monkeypatch.setattr(logging, "basicConfig", lambda *args, **kwargs: None)
\ No newline at end of file
+    monkeypatch.setattr(logging, "basicConfig", lambda *args, **kwargs: None)
+
+
+@pytest.fixture
+def object_strings():
+    """Run the test with pandas' Arrow-backed string inference off."""
+    with pd.option_context("future.infer_string", False):
+        yield
+
+
+@pytest.fixture
+def lazy_import(tmp_path, monkeypatch):
+    """`importlib.import_module`, run from `tmp_path`.
+
+    Modules that pull in `data_processor` configure logging at import
+    time; importing them inside the test keeps the `basicConfig` patch
+    above active.
+    """
+    monkeypatch.chdir(tmp_path)
+    return importlib.import_module
+
+
+@pytest.fixture
+def processor(lazy_import):
+    """A `DataProcessor`, imported through `lazy_import`."""
+    return lazy_import("data_processor").DataProcessor()
@@ -0,0 +1,126 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from anomaly_detection import MAD_SCALE, AnomalyDetector, anomaly_report
+
+
+@pytest.fixture
+def holes():
+    rng = np.random.default_rng(3)
+    n = 4_000
+    rigs = rng.choice(["PF01", "PF02"], size=n).astype(object)
+    duracion = rng.lognormal(np.where(rigs == "PF01", 3.0, 2.0), 0.2)
+    tasa = rng.lognormal(0.0, 0.2, size=n)
+    duracion[:3] = [-5.0, 0.0, 500.0]
+    tasa[3:5] = [-1.0, np.inf]
+    duracion[5] = np.nan
+    rigs[6] = None
+    return pd.DataFrame({"perforadora": rigs, "duracion": duracion, "tasa_penetracion": tasa})
+
+
+def _columns(df):
+    return df["perforadora"], df["duracion"], df["tasa_penetracion"]
+
+
+def test_mad_flags_match_exact_robust_z(holes):
+    detector = AnomalyDetector("mad").update(*_columns(holes))
+    reasons = detector.reasons(*_columns(holes))
+    assert reasons[:6].tolist() == [1, 1, 4, 2, 2, 0]
+
+    positive = holes[holes["duracion"] > 0]
+    grouped = positive.groupby("perforadora")["duracion"]
+    median = holes["perforadora"].map(grouped.median())
+    mad = holes["perforadora"].map(grouped.apply(lambda s: (s - s.median()).abs().median()))
+    z = (holes["duracion"] - median).abs() / (MAD_SCALE * mad)
+    exact = (holes["duracion"] > 0) & (z > 3.5)
+    # The sketch is exact to within one histogram bin: only values right
+    # at the cutoff may disagree.
+    assert (((reasons & 4) > 0) != exact).sum() <= 5
+
+
+def test_iqr_fences(holes):
+    detector = AnomalyDetector("iqr", threshold=1.5).update(*_columns(holes))
+    flagged = (detector.reasons(*_columns(holes)) & 8) > 0
+    positive = holes[holes["tasa_penetracion"] > 0]
+    grouped = positive.groupby("perforadora")["tasa_penetracion"]
+    q1 = holes["perforadora"].map(grouped.quantile(0.25))
+    q3 = holes["perforadora"].map(grouped.quantile(0.75))
+    iqr = q3 - q1
+    tasa = holes["tasa_penetracion"]
+    exact = np.isfinite(tasa) & (tasa > 0) & ((tasa < q1 - 1.5 * iqr) | (tasa > q3 + 1.5 * iqr))
+    assert (flagged != exact).sum() <= 5
+
+
+def test_small_groups_and_unknown_rigs_only_get_validity_checks():
+    keys = ["A"] * 5 + [None, "B"]
+    duracion = [10.0, 11.0, 9.0, 10.0, 1_000.0, -1.0, 1_000.0]
+    detector = AnomalyDetector().update(keys, duracion, [1.0] * 7)
+    assert detector.reasons(keys, duracion, [1.0] * 7).tolist() == [0, 0, 0, 0, 0, 1, 0]
+
+
+def test_unknown_method_raises():
+    with pytest.raises(ValueError, match="no soportado"):
+        AnomalyDetector("zscore")
+
+
+def test_report_counts_each_reason():
+    report = anomaly_report(np.array([0, 1, 5, 4, 0], dtype=np.uint8))
+    assert report == {
+        "anomaly_count": 3,
+        "by_reason": {
+            "duracion_no_positiva": 2,
+            "tasa_invalida": 0,
+            "duracion_atipica": 2,
+            "tasa_atipica": 0,
+        },
+        "anomaly_rows": [1, 2, 3],
+    }
+
+
+def test_flag_anomalies_adds_column_and_report(processor, holes):
+    flagged = processor.flag_anomalies(holes)
+    assert "anomalia" not in holes.columns
+    assert flagged["anomalia"].dtype == bool
+    assert flagged["anomalia"][:6].tolist() == [True] * 5 + [False]
+    assert flagged.attrs["anomaly_report"]["anomaly_count"] == int(flagged["anomalia"].sum())
+
+    without_rigs = processor.flag_anomalies(holes.drop(columns="perforadora"))
+    assert without_rigs["anomalia"][:5].all()
+
+
+def test_excluding_anomalies_from_rig_statistics(processor, holes):
+    flagged = processor.flag_anomalies(holes)
+    flagged.loc[7, "tasa_penetracion"] = 1_000.0
+    flagged.loc[7, "anomalia"] = True
+    kept = processor.rig_normalized_rates(flagged, exclude_anomalies=True)
+    clean = flagged.copy()
+    clean.loc[clean["anomalia"], "tasa_penetracion"] = np.nan
+    expected = processor.rig_normalized_rates(clean)
+    valid = ~flagged["anomalia"].to_numpy()
+    np.testing.assert_allclose(kept[valid], expected[valid])
+    # The outlier is still scored, against the clean statistics.
+    assert kept[7] > 100
+    assert not np.allclose(processor.rig_normalized_rates(flagged)[valid], expected[valid])
+
+
+def test_streaming_flags_each_chunk(processor, tmp_path):
+    rng = np.random.default_rng(8)
+    n = 600
+    start = pd.Timestamp("2024-01-01") + pd.to_timedelta(np.arange(n) * 30, unit="min")
+    minutes = rng.lognormal(2.5, 0.2, size=n)
+    minutes[[50, 400]] = 600.0
+    path = tmp_path / "pozos.csv"
+    pd.DataFrame({
+        "Perforadora": rng.choice(["PF01", "PF02"], size=n),
+        "Tiempo Inicio": start.strftime("%Y-%m-%d %H:%M:%S"),
+        "Tiempo Final": (start + pd.to_timedelta(minutes, unit="min")).strftime("%Y-%m-%d %H:%M:%S"),
+        "Profundidad": 15.0,
+    }).to_csv(path, index=False)
+
+    processor.EXCLUDE_ANOMALIES_FROM_RIG_STATS = True
+    df = processor.load_and_process_streaming(
+        path, chunksize=200, columns=["perforadora", "duracion"], anomalies=True
+    )
+    assert list(df.columns) == ["perforadora", "duracion", "anomalia"]
+    assert df["anomalia"][[50, 400]].all()
@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+HEADER = "tiempo inicio,tiempo final,perforadora,prof. por operador\n"
+
+
+@pytest.fixture
+def batch(lazy_import):
+    return lazy_import("batch_processing")
+
+
+@pytest.fixture
+def exports(tmp_path):
+    rng = np.random.default_rng(4)
+    folder = tmp_path / "exports"
+    folder.mkdir()
+    paths = []
+    for i in range(3):
+        lines = []
+        for j in range(40):
+            start = pd.Timestamp("2024-05-10") + pd.Timedelta(minutes=60 * j + i)
+            end = start + pd.Timedelta(minutes=int(rng.integers(5, 60)))
+            rig = f"PF0{rng.integers(1, 4)}"
+            lines.append(f"{start:%Y-%m-%d %H:%M},{end:%Y-%m-%d %H:%M},{rig},{rng.uniform(10, 20):.2f}\n")
+        path = folder / f"turno{i}.csv"
+        path.write_text(HEADER + "".join(lines), encoding="utf-8")
+        paths.append(path)
+    return paths
+
+
+def test_expand_inputs_accepts_dirs_and_globs(batch, exports, tmp_path):
+    assert batch.expand_inputs([str(tmp_path / "exports")]) == exports
+    assert batch.expand_inputs([str(tmp_path / "exports" / "turno[01].csv"), str(exports[0])]) == exports[:2]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_merged_rig_stats_match_single_file(batch, processor, exports, tmp_path, workers):
+    df, rig_stats, timings = batch.process_batch(
+        exports, metric="rig_normalized_penetration", workers=workers
+    )
+    combined = tmp_path / "todo.csv"
+    combined.write_text(
+        HEADER + "".join(p.read_text(encoding="utf-8").split("\n", 1)[1] for p in exports),
+        encoding="utf-8",
+    )
+    expected = processor.add_rig_normalized_rate(processor.load_and_process(combined))
+    np.testing.assert_allclose(
+        df["tasa_penetracion_normalizada"].to_numpy(dtype=float),
+        expected["tasa_penetracion_normalizada"].to_numpy(),
+        rtol=1e-6,
+    )
+    classified = processor.classify_with_metric(
+        expected, batch.DEFAULT_THRESHOLDS, "rig_normalized_penetration"
+    )
+    assert df["dureza"].astype(object).tolist() == classified["dureza"].tolist()
+    assert [t["filas"] for t in timings] == [40, 40, 40]
+    assert df["archivo"].astype(str).tolist()[::40] == ["turno0.csv", "turno1.csv", "turno2.csv"]
+    assert rig_stats.to_frame()["count"].sum() == 120
+
+
+def test_robust_metric_is_computed_on_the_combined_frame(batch, processor, exports):
+    df, _, _ = batch.process_batch(exports, metric="rig_robust_penetration", workers=1)
+    expected = processor.add_rig_normalized_rate(
+        pd.concat([processor.load_and_process(p) for p in exports], ignore_index=True),
+        modes=("robust",),
+    )
+    np.testing.assert_allclose(
+        df["tasa_penetracion_robusta"].to_numpy(dtype=float),
+        expected["tasa_penetracion_robusta"].to_numpy(),
+        rtol=1e-6,
+    )
+    classified = processor.classify_with_metric(
+        expected, batch.DEFAULT_THRESHOLDS, "rig_robust_penetration"
+    )
+    assert df["dureza"].astype(object).tolist() == classified["dureza"].tolist()
+
+
+def test_main_writes_output_and_reports_failures(batch, exports, tmp_path, capsys):
+    pytest.importorskip("pyarrow")
+    broken = tmp_path / "exports" / "roto.csv"
+    broken.write_text("columna,otra\n1,2\n", encoding="utf-8")
+    output = tmp_path / "dureza.feather"
+    report = tmp_path / "tiempos.csv"
+    status = batch.main([
+        str(tmp_path / "exports"), "--output", str(output), "--report", str(report),
+        "--metric", "penetration_rate", "--workers", "1",
+    ])
+    assert status == 1
+    assert len(pd.read_feather(output)) == 120
+    timings = pd.read_csv(report)
+    assert timings["estado"].tolist() == ["error", "ok", "ok", "ok"]
+    assert "tiempo inicio" in timings["error"].iloc[0]
+
+
+def test_main_rejects_bad_output_before_processing(batch, exports, tmp_path, monkeypatch):
+    monkeypatch.setattr(batch, "process_batch", lambda *a: pytest.fail("batch was processed"))
+    with pytest.raises(SystemExit) as exit_info:
+        batch.main([str(tmp_path / "exports"), "--output", str(tmp_path / "dureza.csv")])
+    assert exit_info.value.code == 2
+    monkeypatch.setattr(batch, "PYARROW_AVAILABLE", False)
+    with pytest.raises(SystemExit):
+        batch.main([str(tmp_path / "exports"), "--output", str(tmp_path / "dureza.feather")])
+
+
+def test_main_skips_output_when_every_file_fails(batch, tmp_path, capsys):
+    pytest.importorskip("pyarrow")
+    broken = tmp_path / "roto.csv"
+    broken.write_text("columna,otra\n1,2\n", encoding="utf-8")
+    output = tmp_path / "dureza.feather"
+    assert batch.main([str(broken), "--output", str(output), "--workers", "1"]) == 1
+    assert not output.exists()
+    assert "Ningún archivo" in capsys.readouterr().out
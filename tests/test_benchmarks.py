@@ -0,0 +1,45 @@
+import pytest
+
+from benchmarks import bench_pipeline
+from benchmarks.synthetic import NAN_COLUMNS, synthetic_frame, write_synthetic_csv
+
+
+@pytest.fixture(autouse=True)
+def _isolated(lazy_import):
+    # `data_processor` disables Arrow strings when first imported; import
+    # it here so that happens outside any option context.
+    lazy_import("data_processor")
+
+
+def test_synthetic_nan_and_bad_line_rates(tmp_path):
+    frame = synthetic_frame(2_000, nan_rate=0.1, seed=1)
+    for column in NAN_COLUMNS:
+        assert 0.05 < frame[column].isna().mean() < 0.15
+    rows = write_synthetic_csv(tmp_path / "s.csv", rows=1_000, bad_line_rate=0.01)
+    assert rows == 990
+
+
+def test_pipeline_smoke_covers_every_stage():
+    records = bench_pipeline.run(rows=(300,), repeat=1, nan_rate=0.05)
+    stages = {r["stage"] for r in records}
+    assert "load_and_process" in stages
+    assert "add_rig_normalized_rate" in stages
+    for metric in bench_pipeline.METRICS:
+        assert f"classify_with_metric[{metric}]" in stages
+    for name in bench_pipeline.plot_builders():
+        assert f"Visualizer.{name}" in stages
+    assert all(r["rows"] == 300 and r["seconds"] >= 0 and r["peak_mb"] > 0 for r in records)
+
+
+def test_regressions_flags_only_slower_stages():
+    baseline = [
+        {"stage": "a", "rows": 10, "seconds": 1.0},
+        {"stage": "b", "rows": 10, "seconds": 1.0},
+    ]
+    records = [
+        {"stage": "a", "rows": 10, "seconds": 1.2},
+        {"stage": "b", "rows": 10, "seconds": 1.5},
+        {"stage": "c", "rows": 10, "seconds": 9.0},
+    ]
+    slower = bench_pipeline.regressions(records, baseline, tolerance=0.25)
+    assert [r["stage"] for r in slower] == ["b"]
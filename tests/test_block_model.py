@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from block_model import (
+    block_centers,
+    block_grid,
+    interpolate_idw,
+    load_block_model,
+    save_block_model,
+)
+from spatial_index import SpatialIndex
+
+
+@pytest.fixture
+def holes():
+    rng = np.random.default_rng(5)
+    n = 3_000
+    df = pd.DataFrame({
+        "este": rng.uniform(0.0, 400.0, n),
+        "norte": rng.uniform(0.0, 300.0, n),
+        "elevacion": rng.uniform(2_500.0, 2_560.0, n),
+        "indice_dureza": rng.uniform(0.0, 100.0, n),
+    })
+    df.loc[::50, "indice_dureza"] = np.nan
+    df.loc[::71, "elevacion"] = np.nan
+    return df
+
+
+def _brute_idw(df, grid, radius, k, power):
+    usable = df.dropna(subset=["este", "norte", "elevacion", "indice_dureza"])
+    hx, hy, hz = (usable[c].to_numpy() for c in ("este", "norte", "elevacion"))
+    hv = usable["indice_dureza"].to_numpy()
+    nx, ny, nz = grid["shape"]
+    bx, by, bz = block_centers(grid, 0, nx * ny * nz)
+    out = np.full(len(bx), np.nan)
+    for i in range(len(bx)):
+        d = np.sqrt((hx - bx[i]) ** 2 + (hy - by[i]) ** 2 + (hz - bz[i]) ** 2)
+        near = np.flatnonzero(d <= radius)
+        if len(near) == 0:
+            continue
+        near = near[np.lexsort((near, d[near]))][:k]
+        if (d[near] == 0).any():
+            out[i] = hv[near][d[near] == 0].mean()
+        else:
+            w = 1.0 / d[near] ** power
+            out[i] = (w * hv[near]).sum() / w.sum()
+    return out.reshape(nz, ny, nx)
+
+
+def test_grid_is_aligned_and_covers_holes(holes):
+    grid = block_grid(holes["este"], holes["norte"], holes["elevacion"], (25, 25, 15))
+    assert grid["origin"] == (0.0, 0.0, 2_490.0)
+    nx, ny, nz = grid["shape"]
+    assert nx * 25 > holes["este"].max() and nz * 15 + 2_490 > holes["elevacion"].max()
+    with pytest.raises(ValueError):
+        block_grid(holes["este"], holes["norte"], holes["elevacion"], (25, 0, 15))
+
+
+def test_idw_matches_brute_force(holes):
+    grid = block_grid(holes["este"], holes["norte"], holes["elevacion"], (20, 20, 10))
+    expected = _brute_idw(holes, grid, 14.0, 4, 2.0)
+    for chunk_size in (7, 100_000):
+        result = interpolate_idw(holes, grid, radius=14.0, max_neighbours=4, chunk_size=chunk_size)
+        assert result.dtype == np.float32
+        np.testing.assert_allclose(result, expected, rtol=1e-5, equal_nan=True)
+    assert np.isnan(expected).any() and np.isfinite(expected).any()
+
+
+def test_block_on_hole_takes_its_value():
+    df = pd.DataFrame({
+        "este": [5.0, 15.0], "norte": [5.0, 5.0], "elevacion": [5.0, 5.0],
+        "indice_dureza": [10.0, 90.0],
+    })
+    grid = {"origin": (0.0, 0.0, 0.0), "block_size": (10.0, 10.0, 10.0), "shape": (2, 1, 1)}
+    result = interpolate_idw(df, grid, radius=50.0)
+    np.testing.assert_allclose(result.ravel(), [10.0, 90.0])
+
+
+def test_process_pool_matches_serial(holes):
+    grid = block_grid(holes["este"], holes["norte"], holes["elevacion"], (25, 25, 20))
+    serial = interpolate_idw(holes, grid, radius=40.0, chunk_size=50)
+    pooled = interpolate_idw(holes, grid, radius=40.0, chunk_size=50, workers=2)
+    np.testing.assert_array_equal(serial, pooled)
+
+
+def test_pairs_within_radius_matches_single_queries():
+    rng = np.random.default_rng(3)
+    x, y = rng.uniform(0, 100, 2_000), rng.uniform(0, 100, 2_000)
+    x[::37] = np.nan
+    index = SpatialIndex(x, y, cell_size=7.0)
+    qx = np.array([50.0, -20.0, 0.0, np.nan, 99.0])
+    qy = np.array([50.0, 50.0, 0.0, 10.0, 101.0])
+    queries, rows, distances = index.pairs_within_radius(qx, qy, 12.0)
+    for q in range(len(qx)):
+        expected = index.within_radius(qx[q], qy[q], 12.0) if np.isfinite(qx[q]) else []
+        np.testing.assert_array_equal(np.sort(rows[queries == q]), expected)
+    assert np.all(np.diff(queries) >= 0)
+    np.testing.assert_allclose(distances, np.hypot(x[rows] - qx[queries], y[rows] - qy[queries]))
+
+
+def test_save_and_load_round_trip(tmp_path, holes):
+    grid = block_grid(holes["este"], holes["norte"], holes["elevacion"], (50, 50, 30))
+    values = interpolate_idw(holes, grid, radius=60.0)
+    path = tmp_path / "modelo.npz"
+    save_block_model(path, grid, values)
+    loaded_grid, loaded = load_block_model(path)
+    assert loaded_grid == grid
+    np.testing.assert_array_equal(loaded, values)
+    with pytest.raises(ValueError):
+        save_block_model(path, grid, values.ravel())
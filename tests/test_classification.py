@@ -1,3 +1,5 @@
+import math
+
 import pytest
 
 import classification
@@ -45,4 +47,105 @@ def test_hardness_index_segments(T, expected):
 
 def test_hardness_index_negative_is_clamped_to_zero():
     assert classification.hardness_index(-1.0) == 0.0
-    assert classification.hardness_index(-999.0) == 0.0
\ No newline at end of file
+    assert classification.hardness_index(-999.0) == 0.0
+
+_SCALAR_VS_ARRAY_THRESHOLDS = [
+    classification.DEFAULT_THRESHOLDS,
+    {
+        "duration": {"soft": 10.0, "medium": 30.0, "hard": 55.0},
+        "rate": {"soft": 2.5, "medium": 1.2, "hard": 0.3},
+    },
+    # Non-monotonic slider state: the first-match chain must still win.
+    {
+        "duration": {"soft": 30.0, "medium": 20.0, "hard": 20.0},
+        "rate": {"soft": 0.5, "medium": 0.9, "hard": 0.5},
+    },
+]
+
+
+def _boundary_dense_values(thresholds):
+    cutoffs = [
+        *thresholds["duration"].values(),
+        *thresholds["rate"].values(),
+        0.0,
+        classification.DURATION_INDEX_UPPER_SATURATION,
+        classification.RATE_INDEX_UPPER_SATURATION,
+    ]
+    values = [-5.0, 0.01, 0.2, 7.5, 33.3, 75.0, float("nan")]
+    for cutoff in cutoffs:
+        values.extend([cutoff - 1e-9, cutoff, cutoff + 1e-9])
+    return values
+
+
+@pytest.mark.parametrize("thresholds", _SCALAR_VS_ARRAY_THRESHOLDS)
+@pytest.mark.parametrize(
+    "metric", classification.METRICS
+)
+def test_array_helpers_match_scalar_functions(thresholds, metric):
+    values = _boundary_dense_values(thresholds)
+    labels = classification.classify_array(values, thresholds, metric)
+    indexes = classification.hardness_index_array(values, thresholds, metric)
+    for value, label, index in zip(values, labels, indexes):
+        assert label == classification.classify_with_metric(value, thresholds, metric)
+        expected = classification.hardness_index_with_metric(value, thresholds, metric)
+        if math.isnan(expected):
+            assert math.isnan(index)
+        else:
+            assert index == expected
+
+
+def test_array_helpers_map_none_to_missing():
+    values = [None, 20.0]
+    codes = classification.classify_codes(
+        values, classification.DEFAULT_THRESHOLDS, "duration"
+    )
+    assert codes.tolist() == [classification.MISSING_CODE, 1]
+    labels = classification.classify_array(
+        values, classification.DEFAULT_THRESHOLDS, "duration"
+    )
+    assert labels.tolist() == [None, "roca media"]
+    indexes = classification.hardness_index_array(
+        values, classification.DEFAULT_THRESHOLDS, "duration"
+    )
+    assert math.isnan(indexes[0])
+    assert indexes[1] == pytest.approx(37.5, abs=1e-9)
+
+
+def test_array_helpers_reject_unknown_metric():
+    with pytest.raises(ValueError):
+        classification.classify_array([1.0], classification.DEFAULT_THRESHOLDS, "depth")
+    with pytest.raises(ValueError):
+        classification.hardness_index_array(
+            [1.0], classification.DEFAULT_THRESHOLDS, "depth"
+        )
+
+
+def test_penetration_rate_array_matches_scalar():
+    nan, inf = float("nan"), float("inf")
+    depths = [17.0, 17.0, 17.0, nan, 9.9, 5.0, -3.0, 17.0]
+    durations = [19.0, 0.0, -1.0, 10.0, inf, 2.5, 2.0, nan]
+    actual = classification.penetration_rate_array(depths, durations)
+    for depth, duration, value in zip(depths, durations, actual):
+        expected = classification.penetration_rate(depth, duration)
+        if expected is None:
+            assert math.isnan(value)
+        else:
+            assert value == expected
+
+
+def test_rig_normalized_penetration_array_matches_scalar():
+    nan, inf = float("nan"), float("inf")
+    rows = [
+        (0.9, 0.7, 0.2),
+        (0.6, 0.6, 0.0),
+        (0.6, 0.6, 1e-10),
+        (nan, 0.7, 0.2),
+        (0.9, nan, 0.2),
+        (0.9, 0.7, nan),
+        (inf, 0.7, 0.2),
+        (0.9, 0.7, inf),
+    ]
+    rates, avgs, stds = zip(*rows)
+    actual = classification.rig_normalized_penetration_array(rates, avgs, stds)
+    for row, value in zip(rows, actual):
+        assert value == classification.rig_normalized_penetration(*row)
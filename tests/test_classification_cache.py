@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import classification
+
+
+THRESHOLDS_A = classification.DEFAULT_THRESHOLDS
+THRESHOLDS_B = {
+    "duration": {"soft": 10.0, "medium": 20.0, "hard": 30.0},
+    "rate": classification.DEFAULT_RATE_THRESHOLDS,
+}
+
+
+@pytest.fixture
+def cache_module(lazy_import):
+    return lazy_import("classification_cache")
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(3)
+    n = 200
+    return pd.DataFrame(
+        {
+            "duracion": rng.uniform(0.0, 70.0, size=n),
+            "tasa_penetracion": rng.uniform(0.1, 2.5, size=n),
+            "drill_pattern": rng.choice(["PW30", "PW31", "PW32"], size=n),
+        }
+    )
+
+
+def test_view_matches_classify_with_metric_on_filtered_rows(cache_module, processor, frame):
+    cache = cache_module.ClassificationCache()
+    mask = (frame["drill_pattern"] == "PW31").to_numpy()
+    for metric in ("duration", "penetration_rate"):
+        view = cache.view(frame, mask, THRESHOLDS_B, metric)
+        expected = processor.classify_with_metric(frame[mask], THRESHOLDS_B, metric)
+        pd.testing.assert_frame_equal(view, expected)
+
+
+def test_view_compact_matches_classify_with_metric(cache_module, processor, frame):
+    cache = cache_module.ClassificationCache()
+    mask = (frame["drill_pattern"] == "PW31").to_numpy()
+    view = cache.view(frame, mask, THRESHOLDS_B, "duration", compact=True)
+    expected = processor.classify_with_metric(
+        frame[mask], THRESHOLDS_B, "duration", compact=True
+    )
+    pd.testing.assert_frame_equal(view, expected)
+
+
+def test_view_does_not_mutate_source(cache_module, frame):
+    before = frame.copy()
+    cache = cache_module.ClassificationCache()
+    cache.view(frame, None, THRESHOLDS_A, "duration")
+    cache.view(frame, np.ones(len(frame), dtype=bool), THRESHOLDS_A, "duration")
+    pd.testing.assert_frame_equal(frame, before)
+
+
+def test_cache_hits_and_metric_scoped_key(cache_module, frame):
+    cache = cache_module.ClassificationCache()
+    fp = cache_module.dataset_fingerprint(frame)
+    first = cache.classify(frame, THRESHOLDS_A, "duration", fp)
+    # Moving a rate slider must not invalidate the duration entry.
+    moved_rate = {**THRESHOLDS_A, "rate": {"soft": 3.0, "medium": 2.0, "hard": 1.0}}
+    second = cache.classify(frame, moved_rate, "duration", fp)
+    assert second[0] is first[0]
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_cache_evicts_least_recently_used(cache_module, frame):
+    cache = cache_module.ClassificationCache(max_entries=2)
+    fp = cache_module.dataset_fingerprint(frame)
+    cache.classify(frame, THRESHOLDS_A, "duration", fp)
+    cache.classify(frame, THRESHOLDS_B, "duration", fp)
+    cache.classify(frame, THRESHOLDS_A, "duration", fp)  # refresh A
+    cache.classify(frame, THRESHOLDS_A, "penetration_rate", fp)  # evicts B
+    assert len(cache) == 2
+    misses = cache.misses
+    cache.classify(frame, THRESHOLDS_A, "duration", fp)
+    assert cache.misses == misses
+    cache.classify(frame, THRESHOLDS_B, "duration", fp)
+    assert cache.misses == misses + 1
+
+
+def test_fingerprint_tracks_content(cache_module, frame):
+    fp = cache_module.dataset_fingerprint(frame)
+    assert fp == cache_module.dataset_fingerprint(frame.copy())
+    changed = frame.copy()
+    changed.loc[0, "duracion"] += 1.0
+    assert fp != cache_module.dataset_fingerprint(changed)
+
+
+@pytest.mark.parametrize(("by", "value"), [("drill_pattern", "indice_dureza"), ("dureza", "duracion")])
+def test_summary_matches_data_processor_and_is_cached(
+    cache_module, processor, frame, by, value
+):
+    cache = cache_module.ClassificationCache()
+    mask = (frame["tasa_penetracion"] > 0.5).to_numpy()
+    summary = cache.summary(frame, mask, THRESHOLDS_B, "duration", by, value)
+    view = processor.classify_with_metric(frame[mask], THRESHOLDS_B, "duration")
+    expected = processor.group_summary(view, by, value)
+    pd.testing.assert_frame_equal(summary, expected, check_index_type=False)
+
+    misses = cache.misses
+    summary.loc[:, "filas"] = -1  # callers get a copy
+    again = cache.summary(frame, mask, THRESHOLDS_B, "duration", by, value)
+    assert cache.misses == misses and (again["filas"] >= 0).all()
+    other = cache.summary(frame, ~mask, THRESHOLDS_B, "duration", by, value)
+    assert other["filas"].sum() == (~mask).sum()
@@ -0,0 +1,86 @@
+import io
+import warnings
+
+import pandas as pd
+import pytest
+
+import csv_parsing
+
+MALFORMED = (
+    "tiempo inicio,tiempo final,perforadora,profundidad\n"
+    "2024/05/10 08:30,2024/05/10 08:46,PF01,15.0\n"
+    "2024/05/10 09:15,2024/05/10 09:40,PF01,15.0,extra\n"
+    "2024/05/10 10:05,2024/05/10 10:45,PF02\n"
+    "\n"
+    "\n"
+    "2024/05/10 11:20,2024/05/10 11:50,PF02,14.5\n"
+    "2024/05/10 10:05,2024/05/10 10:45,PF02\n"
+    "2024/05/10 12:00,2024/05/10 13:10,PF03,15.5\n"
+    "2024/05/10 09:15,2024/05/10 09:40,PF01,15.0,extra\n"
+    "2024/05/10 13:00,2024/05/10 13:20,PF03,16.0\n"
+)
+
+
+pytestmark = pytest.mark.usefixtures("object_strings")
+
+
+def _legacy(text):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return pd.read_csv(io.StringIO(text), engine="python", on_bad_lines="warn")
+
+
+@pytest.mark.parametrize(
+    "engines",
+    [("pyarrow", "c"), ("c",)],
+    ids=["pyarrow-targeted", "c-tolerant"],
+)
+def test_recovery_matches_legacy_python_fallback(engines):
+    if "pyarrow" in engines and not csv_parsing.PYARROW_AVAILABLE:
+        pytest.skip("pyarrow not installed")
+    df, report = csv_parsing.read_csv_with_report(
+        io.BytesIO(MALFORMED.encode("utf-8")), engines
+    )
+    pd.testing.assert_frame_equal(df, _legacy(MALFORMED))
+    assert report["skipped_lines"] == [3, 10]
+    assert report["skipped_count"] == 2
+    assert report["rows"] == len(df)
+
+
+def test_targeted_recovery_reports_recovered_lines(tmp_path):
+    if not csv_parsing.PYARROW_AVAILABLE:
+        pytest.skip("pyarrow not installed")
+    path = tmp_path / "malformado.csv"
+    path.write_text(MALFORMED, encoding="utf-8")
+    df, report = csv_parsing.read_csv_with_report(path)
+    assert report["engine"] == "pyarrow+python"
+    assert report["recovered_lines"] == [4, 8]
+    assert df["profundidad"].isna().sum() == 2
+
+
+def test_clean_file_takes_fast_path(tmp_path):
+    path = tmp_path / "limpio.csv"
+    path.write_text(
+        "tiempo inicio,tiempo final\n2024/05/10 08:30,2024/05/10 08:46\n",
+        encoding="utf-8",
+    )
+    df, report = csv_parsing.read_csv_with_report(path)
+    expected_engine = "pyarrow" if csv_parsing.PYARROW_AVAILABLE else "c"
+    assert report == {
+        "engine": expected_engine,
+        "rows": 1,
+        "recovered_lines": [],
+        "skipped_lines": [],
+        "skipped_count": 0,
+    }
+    assert len(df) == 1
+
+
+def test_skipped_lines_from_warnings_parses_line_numbers():
+    captured = [
+        warnings.WarningMessage(
+            "Skipping line 7: expected 4 fields, saw 5\n", UserWarning, "x", 1
+        ),
+        warnings.WarningMessage("unrelated", UserWarning, "x", 1),
+    ]
+    assert csv_parsing.skipped_lines_from_warnings(captured) == [7]
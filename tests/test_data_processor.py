@@ -0,0 +1,389 @@
+import math
+
+import pandas as pd
+import pytest
+
+import classification
+
+
+@pytest.fixture
+def drilling_csv(tmp_path):
+    path = tmp_path / "perforacion.csv"
+    path.write_text(
+        "tiempo inicio,tiempo final,este,norte,elevacion,drill_pattern,"
+        "perforadora,prof. por operador\n"
+        "2024/05/10 08:30,2024/05/10 08:46,650.0,180.0,40.0,PW30,PF01,15.0\n"
+        "2024/05/10 09:15,2024/05/10 09:40,651.0,181.0,39.5,PW30,PF01,15.0\n"
+        "2024/05/10 10:05,2024/05/10 10:45,649.0,179.0,41.5,PW31,PF02,15.0\n"
+        "2024/05/10 11:20,2024/05/10 11:20,652.0,182.0,38.9,PW31,PF02,15.0\n"
+        "2024/05/10 12:00,2024/05/10 13:10,653.0,183.0,38.0,PW32,PF02,15.0\n",
+        encoding="utf-8",
+    )
+    return path
+
+
+def test_load_and_process_matches_legacy_scalar_helpers(processor, drilling_csv):
+    df = processor.load_and_process(drilling_csv)
+    assert df["dureza"].tolist() == [
+        classification.classify_duracion(v) for v in df["duracion"]
+    ]
+    assert df["indice_dureza"].tolist() == [
+        classification.hardness_index(v) for v in df["duracion"]
+    ]
+
+
+@pytest.mark.parametrize("metric", ["duration", "penetration_rate"])
+def test_classify_with_metric_matches_scalar_functions(processor, drilling_csv, metric):
+    df = processor.load_and_process(drilling_csv)
+    thresholds = {
+        "duration": {"soft": 20.0, "medium": 25.0, "hard": 40.0},
+        "rate": {"soft": 0.9, "medium": 0.6, "hard": 0.3},
+    }
+    result = processor.classify_with_metric(df, thresholds, metric)
+    column = "duracion" if metric == "duration" else "tasa_penetracion"
+    expected_labels = [
+        classification.classify_with_metric(v, thresholds, metric) for v in df[column]
+    ]
+    expected_index = [
+        classification.hardness_index_with_metric(v, thresholds, metric)
+        for v in df[column]
+    ]
+    assert result["dureza"].tolist() == expected_labels
+    for got, expected in zip(result["indice_dureza"], expected_index):
+        if expected is None or math.isnan(expected):
+            assert math.isnan(got)
+        else:
+            assert got == expected
+
+
+def test_classify_with_metric_does_not_mutate_input(processor, drilling_csv):
+    df = processor.load_and_process(drilling_csv)
+    before = df.copy()
+    processor.classify_with_metric(
+        df,
+        {
+            "duration": {"soft": 1.0, "medium": 2.0, "hard": 3.0},
+            "rate": classification.DEFAULT_RATE_THRESHOLDS,
+        },
+        "duration",
+    )
+    assert df.equals(before)
+
+
+def _scalar_rig_zscores(df):
+    """Reference implementation built from the scalar parity helpers."""
+    out = []
+    groups = {
+        rig: [v for v in df.loc[df["perforadora"] == rig, "tasa_penetracion"]]
+        for rig in df["perforadora"].dropna().unique()
+    }
+    for rig, rate in zip(df["perforadora"], df["tasa_penetracion"]):
+        if rig not in groups:
+            out.append(0.0)
+            continue
+        rates = groups[rig]
+        finite = [v for v in rates if math.isfinite(v)]
+        avg = classification.rig_mean_penetration(rates)
+        if len(finite) < 2:
+            std = 0.0
+        else:
+            var = sum((v - avg) ** 2 for v in finite) / (len(finite) - 1)
+            std = math.sqrt(var)
+        out.append(
+            classification.rig_normalized_penetration(
+                rate, avg if avg is not None else float("nan"), std
+            )
+        )
+    return out
+
+
+def test_load_and_process_penetration_rate_matches_scalar(processor, drilling_csv):
+    df = processor.load_and_process(drilling_csv)
+    for depth, dur, rate in zip(
+        df["prof. por operador"], df["duracion"], df["tasa_penetracion"]
+    ):
+        expected = classification.penetration_rate(depth, dur)
+        if expected is None:
+            assert math.isnan(rate)
+        else:
+            assert rate == expected
+
+
+def test_add_rig_normalized_rate_matches_scalar_reference(processor):
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(7)
+    n = 400
+    rates = rng.gamma(2.0, 0.4, size=n)
+    rates[rng.random(n) < 0.05] = np.nan
+    rigs = rng.choice(["PF01", "PF02", "PF03", None], size=n, p=[0.4, 0.4, 0.15, 0.05])
+    df = pd.DataFrame({"perforadora": rigs, "tasa_penetracion": rates})
+    # A single-hole rig and an all-NaN rig hit the std guard.
+    df.loc[len(df)] = ["PF09", 0.8]
+    df.loc[len(df)] = ["PF10", float("nan")]
+
+    result = processor.add_rig_normalized_rate(df)
+    expected = _scalar_rig_zscores(df)
+    assert result["tasa_penetracion_normalizada"].tolist() == pytest.approx(
+        expected, abs=1e-12
+    )
+    assert "tasa_penetracion_normalizada" not in df.columns
+
+
+def test_robust_and_percentile_modes_match_scalar_reference(processor):
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(9)
+    n = 300
+    rates = rng.gamma(2.0, 0.4, size=n).round(2)
+    rates[rng.random(n) < 0.05] = np.nan
+    rigs = rng.choice(["PF01", "PF02", None], size=n, p=[0.6, 0.35, 0.05])
+    df = pd.DataFrame({"perforadora": rigs, "tasa_penetracion": rates})
+    # A rig whose rates are mostly equal hits the MAD guard.
+    df.loc[len(df)] = ["PF09", 0.8]
+    df.loc[len(df)] = ["PF09", 0.8]
+    df.loc[len(df)] = ["PF09", 1.5]
+
+    result = processor.add_rig_normalized_rate(df, modes=("zscore", "robust", "percentile"))
+    by_rig = {
+        rig: df.loc[df["perforadora"] == rig, "tasa_penetracion"].tolist()
+        for rig in df["perforadora"].dropna().unique()
+    }
+    for row, rig, rate in zip(result.itertuples(), df["perforadora"], df["tasa_penetracion"]):
+        rate = None if math.isnan(rate) else rate
+        rig_rates = by_rig.get(rig, [])
+        robust = classification.rig_robust_normalized_penetration(
+            rate,
+            classification.rig_median_penetration(rig_rates),
+            classification.rig_mad_penetration(rig_rates),
+        )
+        assert row.tasa_penetracion_robusta == robust
+        rank = classification.rig_percentile_rank(rate, rig_rates)
+        if rank is None:
+            assert math.isnan(row.tasa_penetracion_percentil)
+        else:
+            assert row.tasa_penetracion_percentil == rank
+    assert result["tasa_penetracion_robusta"].iloc[-3:].tolist() == [0.0, 0.0, 0.0]
+    np.testing.assert_array_equal(
+        result["tasa_penetracion_normalizada"], processor.rig_normalized_rates(df)
+    )
+
+
+def test_percentile_mode_ranks_excluded_rows_against_the_rest(processor):
+    df = pd.DataFrame({
+        "perforadora": ["A"] * 5,
+        "tasa_penetracion": [0.5, 0.6, 0.7, 0.8, 9.0],
+        "anomalia": [False, False, False, False, True],
+    })
+    ranks = processor.rig_normalized_rates(df, exclude_anomalies=True, mode="percentile")
+    assert ranks.tolist() == [0.125, 0.375, 0.625, 0.875, 1.0]
+    with pytest.raises(ValueError, match="no soportado"):
+        processor.rig_normalized_rates(df, mode="minmax")
+
+
+def test_normalized_metrics_need_their_column(processor):
+    df = pd.DataFrame({"tasa_penetracion": [0.5]})
+    with pytest.raises(ValueError, match="tasa_penetracion_robusta"):
+        processor.classify_with_metric(
+            df, classification.DEFAULT_THRESHOLDS, "rig_robust_penetration"
+        )
+    with pytest.raises(ValueError, match="add_rig_normalized_rate first"):
+        processor.threshold_sweep(df, "rig_normalized_penetration", [1.0], [0.0], [-1.0])
+    with pytest.raises(ValueError, match="add_rig_normalized_rate first"):
+        processor.calibrate_thresholds(df, "rig_percentile_penetration")
+
+
+def test_add_rig_normalized_rate_without_rig_column_is_noop(processor):
+    import pandas as pd
+
+    df = pd.DataFrame({"tasa_penetracion": [0.5, 0.7]})
+    assert processor.add_rig_normalized_rate(df) is df
+
+
+def _wide_frame(n=50_000):
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(11)
+    return pd.DataFrame(
+        {
+            "duracion": rng.uniform(0.0, 70.0, size=n),
+            "tasa_penetracion": rng.uniform(0.1, 2.5, size=n),
+            "perforadora": rng.choice(["PF01", "PF02", "PF03"], size=n),
+            "drill_pattern": [f"PW{i % 97:03d}-fase-norte" for i in range(n)],
+            "material_operator": [f"material {i % 13} banco" for i in range(n)],
+            "este": rng.uniform(0.0, 1000.0, size=n),
+            "norte": rng.uniform(0.0, 1000.0, size=n),
+            "elevacion": rng.uniform(0.0, 100.0, size=n),
+        }
+    )
+
+
+def _peak_allocated(fn):
+    import tracemalloc
+
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_lightweight_views_allocate_only_derived_columns(processor):
+    df = _wide_frame()
+    # Bytes a deep copy has to duplicate (object columns copy pointers).
+    input_bytes = int(df.memory_usage(index=False, deep=False).sum())
+    thresholds = classification.DEFAULT_THRESHOLDS
+
+    copied = _peak_allocated(
+        lambda: processor.classify_with_metric(df, thresholds, "duration")
+    )
+    viewed = _peak_allocated(
+        lambda: processor.classify_with_metric(df, thresholds, "duration", copy=False)
+    )
+    assert copied - viewed > 0.9 * input_bytes
+
+    rig_copy = _peak_allocated(lambda: processor.add_rig_normalized_rate(df))
+    rig_view = _peak_allocated(lambda: processor.add_rig_normalized_rate(df, copy=False))
+    assert rig_copy > input_bytes
+    assert rig_view < input_bytes
+
+
+def test_lightweight_views_never_mutate_source(processor):
+    import pandas as pd
+
+    df = _wide_frame(n=500)
+    before = df.copy()
+    view = processor.classify_with_metric(
+        df, classification.DEFAULT_THRESHOLDS, "duration", copy=False
+    )
+    view = processor.add_rig_normalized_rate(view, copy=False)
+    view["duracion"] = 0.0
+    view.loc[0, "este"] = -1.0
+    pd.testing.assert_frame_equal(df, before)
+    assert "dureza" not in df.columns
+    assert "tasa_penetracion_normalizada" not in df.columns
+
+
+def test_copy_false_views_are_isolated_under_copy_on_write(processor):
+    import contextlib
+
+    import pandas as pd
+
+    pandas2 = int(pd.__version__.split(".")[0]) < 3
+    if pandas2:
+        # Importing the module must not flip the global option.
+        assert pd.get_option("mode.copy_on_write") is not True
+    cow = pd.option_context("mode.copy_on_write", True) if pandas2 else contextlib.nullcontext()
+    with cow:
+        df = _wide_frame(n=10)
+        view = processor.classify_with_metric(
+            df, classification.DEFAULT_THRESHOLDS, "duration", copy=False
+        )
+        view.loc[0, "duracion"] = -5.0
+        assert df["duracion"].iloc[0] != -5.0
+
+
+def test_streaming_matches_batch_load(processor, drilling_csv):
+    import pandas as pd
+
+    batch = processor.add_rig_normalized_rate(processor.load_and_process(drilling_csv))
+    streamed = processor.load_and_process_streaming(drilling_csv, chunksize=2)
+    pd.testing.assert_frame_equal(
+        streamed.drop(columns="tasa_penetracion_normalizada"),
+        batch.drop(columns="tasa_penetracion_normalizada"),
+    )
+    assert streamed["tasa_penetracion_normalizada"].tolist() == pytest.approx(
+        batch["tasa_penetracion_normalizada"].tolist(), abs=1e-12
+    )
+
+
+def test_streaming_reports_date_rows_as_file_positions(processor, tmp_path):
+    path = tmp_path / "fechas.csv"
+    lines = ["tiempo inicio,tiempo final,perforadora,profundidad"]
+    for i in range(7):
+        lines.append(f"2024-05-10 08:{i:02d},2024-05-10 09:{i:02d},PF01,15.0")
+    lines[4] = "basura,2024-05-10 09:03,PF01,15.0"
+    lines[6] = "10 May 2024 08:05,2024-05-10 09:05,PF01,15.0"
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    batch = processor.load_and_process(path).attrs["datetime_report"]["tiempo inicio"]
+    streamed = processor.load_and_process_streaming(path, chunksize=2)
+    report = streamed.attrs["datetime_report"]["tiempo inicio"]
+    assert report["failed_rows"] == batch["failed_rows"] == [3]
+    assert report["inferred_rows"] == batch["inferred_rows"] == [5]
+    assert report["format"] == "%Y-%m-%d %H:%M"
+
+
+def test_streaming_yields_bounded_chunks_and_skips_bad_lines(processor, tmp_path):
+    from group_statistics import RunningGroupStats
+
+    path = tmp_path / "con_errores.csv"
+    lines = ["tiempo inicio,tiempo final,perforadora,profundidad"]
+    for i in range(25):
+        lines.append(f"2024-05-10 08:{i:02d},2024-05-10 09:{i:02d},PF0{i % 3},15.0")
+    lines.insert(7, "2024-05-10 08:30,2024-05-10 09:00,PF01,15.0,extra")
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    stats = RunningGroupStats()
+    chunks = list(processor.iter_process_chunks(path, chunksize=10, rig_stats=stats))
+    assert [len(c) for c in chunks] == [10, 10, 5]
+    assert all("dureza" in c.columns for c in chunks)
+    assert stats.to_frame()["count"].sum() == 25
+
+
+def test_streaming_keeps_only_requested_columns(processor, drilling_csv):
+    df = processor.load_and_process_streaming(
+        drilling_csv,
+        chunksize=2,
+        columns=["perforadora", "tasa_penetracion", "dureza", "no_existe"],
+    )
+    assert df.columns.tolist() == [
+        "perforadora",
+        "tasa_penetracion",
+        "dureza",
+        "tasa_penetracion_normalizada",
+    ]
+
+
+def test_unparseable_times_are_reported_not_fatal(processor, tmp_path):
+    path = tmp_path / "fechas.csv"
+    path.write_text(
+        "tiempo inicio,tiempo final,profundidad\n"
+        "2024/05/10 08:30,2024/05/10 08:46,15.0\n"
+        "sin fecha,2024/05/10 09:40,15.0\n"
+        "2024/05/10 10:05,2024/05/10 10:45,15.0\n",
+        encoding="utf-8",
+    )
+    df = processor.load_and_process(path)
+    assert len(df) == 3
+    assert math.isnan(df["duracion"][1])
+    report = df.attrs["datetime_report"]
+    assert report["tiempo inicio"]["failed_rows"] == [1]
+    assert report["tiempo final"]["failed_count"] == 0
+
+
+def test_compact_mode_preserves_values_with_smaller_dtypes(processor, drilling_csv):
+    default = processor.load_and_process(drilling_csv)
+    compact = processor.load_and_process(drilling_csv, compact=True)
+    assert compact["dureza"].cat.categories.tolist() == list(classification.HARDNESS_LABELS)
+    assert compact["dureza"].tolist() == default["dureza"].tolist()
+    assert compact["dureza"].cat.codes.dtype == "int8"
+    # 15.0 round-trips through float32; derived ratios generally do not.
+    assert compact["prof. por operador"].dtype == "float32"
+    assert compact["tasa_penetracion"].dtype == "float64"
+    pd.testing.assert_series_equal(compact["duracion"], default["duracion"], check_dtype=False)
+    for column in compact.columns:
+        assert not isinstance(compact[column].dtype, pd.StringDtype)
+    assert compact.attrs["parse_report"] == default.attrs["parse_report"]
+
+
+def test_classify_with_metric_compact_labels(processor, drilling_csv):
+    df = processor.load_and_process(drilling_csv)
+    thresholds = classification.DEFAULT_THRESHOLDS
+    labels = processor.classify_with_metric(df, thresholds, "duration")
+    compact = processor.classify_with_metric(df, thresholds, "duration", compact=True)
+    assert isinstance(compact["dureza"].dtype, pd.CategoricalDtype)
+    assert compact["dureza"].astype(object).tolist() == labels["dureza"].tolist()
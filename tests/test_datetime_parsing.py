@@ -0,0 +1,110 @@
+import pandas as pd
+import pytest
+
+import datetime_parsing
+
+
+@pytest.mark.parametrize(
+    "text, fmt",
+    [
+        ("2024/05/10 08:30", "%Y/%m/%d %H:%M"),
+        ("2024-05-10 08:30:15", "%Y-%m-%d %H:%M:%S"),
+        ("25/05/2024 08:30", "%d/%m/%Y %H:%M"),
+        ("05/25/2024 08:30", "%m/%d/%Y %H:%M"),
+        ("10/05/2024 08:30", "%m/%d/%Y %H:%M"),
+    ],
+)
+def test_sniff_picks_known_format(text, fmt):
+    assert datetime_parsing.sniff_datetime_format(pd.Series([text, None, text])) == fmt
+
+
+def test_sniff_tolerates_outliers_in_sample():
+    values = pd.Series(["2024/05/10 08:30"] * 9 + ["basura"])
+    assert datetime_parsing.sniff_datetime_format(values) == "%Y/%m/%d %H:%M"
+
+
+def test_sniff_returns_none_when_nothing_matches():
+    assert datetime_parsing.sniff_datetime_format(pd.Series(["x", "y"])) is None
+
+
+def test_parse_matches_pandas_inference_on_clean_column():
+    values = pd.Series(["2024/05/10 08:30", "2024/05/11 23:59", None])
+    parsed, report = datetime_parsing.parse_datetime_column(values)
+    pd.testing.assert_series_equal(parsed, pd.to_datetime(values))
+    assert report == {
+        "format": "%Y/%m/%d %H:%M",
+        "ambiguous": False,
+        "fallback_rows": 0,
+        "inferred_rows": [],
+        "inferred_count": 0,
+        "failed_rows": [],
+        "failed_count": 0,
+    }
+
+
+def test_parse_reports_failing_rows_instead_of_raising():
+    values = pd.Series(
+        ["2024/05/10 08:30", "2024-05-10 09:00", "basura", None, "2024/05/10 10:00"]
+    )
+    parsed, report = datetime_parsing.parse_datetime_column(values)
+    assert parsed[1] == pd.Timestamp("2024-05-10 09:00")
+    assert pd.isna(parsed[2]) and pd.isna(parsed[3])
+    assert report["format"] == "%Y/%m/%d %H:%M"
+    assert report["fallback_rows"] == 2
+    assert report["failed_rows"] == [2]
+    assert report["failed_count"] == 1
+
+
+def test_parse_reports_rows_left_to_per_element_inference():
+    values = pd.Series(["2024/05/10 08:30"] * 3 + ["10 May 2024 09:00", "basura"])
+    parsed, report = datetime_parsing.parse_datetime_column(values, first_row=100)
+    assert parsed[3] == pd.Timestamp("2024-05-10 09:00")
+    assert report["inferred_rows"] == [103] and report["inferred_count"] == 1
+    assert report["failed_rows"] == [104]
+
+
+def test_parse_fallback_follows_format_priority():
+    # Ambiguous day/month rows resolve month-first, like the sniffer.
+    values = pd.Series(["2024/05/10 08:30"] * 5 + ["03/04/2024 10:00"])
+    parsed, _ = datetime_parsing.parse_datetime_column(values)
+    assert parsed.iloc[-1] == pd.Timestamp("2024-03-04 10:00")
+
+
+@pytest.mark.parametrize("sep", ["/", "-"])
+def test_ambiguous_dates_keep_pandas_month_first_order(sep):
+    values = pd.Series([f"05{sep}10{sep}2024 08:00", f"06{sep}11{sep}2024 09:00"])
+    parsed, report = datetime_parsing.parse_datetime_column(values)
+    pd.testing.assert_series_equal(parsed, pd.to_datetime(values))
+    assert parsed[0] == pd.Timestamp("2024-05-10 08:00")
+    assert report["ambiguous"]
+
+
+def test_unambiguous_day_first_sample_is_not_reported():
+    values = pd.Series(["25/10/2024 08:00", "05/10/2024 08:00"])
+    parsed, report = datetime_parsing.parse_datetime_column(values)
+    assert report["format"] == "%d/%m/%Y %H:%M" and not report["ambiguous"]
+    assert parsed[1] == pd.Timestamp("2024-10-05 08:00")
+
+
+def test_dayfirst_formats_override():
+    values = pd.Series(["05/10/2024 08:00"])
+    parsed, report = datetime_parsing.parse_datetime_column(
+        values, datetime_parsing.DAYFIRST_DATETIME_FORMATS
+    )
+    assert parsed[0] == pd.Timestamp("2024-10-05 08:00")
+    assert report["ambiguous"]
+    assert sorted(datetime_parsing.DAYFIRST_DATETIME_FORMATS) == sorted(
+        datetime_parsing.KNOWN_DATETIME_FORMATS
+    )
+
+
+def test_parse_passes_through_datetime_columns():
+    values = pd.Series(pd.to_datetime(["2024-05-10 08:30"]))
+    parsed, report = datetime_parsing.parse_datetime_column(values)
+    pd.testing.assert_series_equal(parsed, values)
+    assert report["format"] is None and report["failed_count"] == 0
+
+
+def test_parse_raises_when_no_value_is_a_date():
+    with pytest.raises(ValueError, match="tiempo inicio"):
+        datetime_parsing.parse_datetime_column(pd.Series(["x", "y"], name="tiempo inicio"))
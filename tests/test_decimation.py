@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from decimation import grid_decimate
+
+
+def _cloud(n=20_000, seed=0):
+    rng = np.random.default_rng(seed)
+    x = rng.normal(0.0, 5.0, n)
+    y = rng.normal(0.0, 5.0, n)
+    # A few isolated holes far from the dense cluster.
+    x[:3] = [500.0, -500.0, 500.0]
+    y[:3] = [500.0, 500.0, -500.0]
+    return x, y, rng
+
+
+def test_small_inputs_are_returned_whole():
+    x = np.array([0.0, 1.0, np.nan, 3.0])
+    y = np.array([0.0, 1.0, 2.0, 3.0])
+    assert grid_decimate(x, y, budget=10).tolist() == [0, 1, 3]
+
+
+def test_budget_respected_and_isolated_holes_kept():
+    x, y, _ = _cloud()
+    keep = grid_decimate(x, y, budget=1_000)
+    assert 0 < len(keep) <= 1_000
+    assert {0, 1, 2} <= set(keep.tolist())
+    assert np.all(np.diff(keep) > 0)
+
+
+def test_selection_is_deterministic():
+    x, y, rng = _cloud()
+    priority = rng.random(len(x))
+    first = grid_decimate(x, y, budget=500, priority=priority)
+    second = grid_decimate(x.copy(), y.copy(), budget=500, priority=priority.copy())
+    np.testing.assert_array_equal(first, second)
+
+
+def test_priority_keeps_extremes_per_cell():
+    # Every point in one cell: only the highest priorities survive.
+    x = np.zeros(100)
+    y = np.zeros(100)
+    priority = np.arange(100, dtype=float)
+    priority[7] = np.nan
+    keep = grid_decimate(x, y, budget=5, priority=priority)
+    assert keep.tolist() == [95, 96, 97, 98, 99]
+
+
+def test_invalid_budget():
+    with pytest.raises(ValueError):
+        grid_decimate([0.0], [0.0], budget=0)
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from filter_index import FilterIndex
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(8)
+    n = 5_000
+    start = pd.Timestamp("2024-01-01")
+    df = pd.DataFrame({
+        "tiempo inicio": start + pd.to_timedelta(rng.integers(0, 90 * 24 * 60, n), unit="min"),
+        "perforadora": rng.choice(np.array(["PV-1", "PV-2", "PV-3", None], dtype=object), n),
+        "drill_pattern": rng.choice(np.array(["A-10", "B-20", "C-30"], dtype=object), n),
+    })
+    df.loc[::97, "tiempo inicio"] = pd.NaT
+    return df
+
+
+def test_unique_values_are_cached_and_sorted(frame):
+    index = FilterIndex(frame)
+    assert index.values("perforadora") == ["PV-1", "PV-2", "PV-3"]
+    assert index.values("drill_pattern") == ["A-10", "B-20", "C-30"]
+    assert index.min_time == frame["tiempo inicio"].min()
+    assert index.max_time == frame["tiempo inicio"].max()
+    assert not index.has_column("pozo")
+
+
+def test_select_matches_boolean_masks(frame):
+    index = FilterIndex(frame)
+    start, end = pd.Timestamp("2024-02-01"), pd.Timestamp("2024-02-20 23:59:59")
+    region = np.arange(0, len(frame), 3)
+    rows = index.select(
+        start, end, {"perforadora": ["PV-1", "PV-3"], "drill_pattern": []}, extra=(region,)
+    )
+    expected = (
+        (frame["tiempo inicio"] >= start)
+        & (frame["tiempo inicio"] <= end)
+        & frame["perforadora"].isin(["PV-1", "PV-3"])
+        & index.mask(region)
+    )
+    np.testing.assert_array_equal(rows, np.flatnonzero(expected))
+    np.testing.assert_array_equal(index.mask(rows), expected.to_numpy())
+
+
+def test_full_range_and_empty_selection(frame):
+    index = FilterIndex(frame)
+    everything = index.select(index.min_time, index.max_time)
+    np.testing.assert_array_equal(everything, np.flatnonzero(frame["tiempo inicio"].notna()))
+    np.testing.assert_array_equal(index.select(), np.arange(len(frame)))
+    assert len(index.select(selections={"drill_pattern": ["Z-99"]})) == 0
+
+
+def test_fully_dated_range_short_circuits():
+    df = pd.DataFrame({"tiempo inicio": pd.to_datetime(["2024-01-02", "2024-01-01", "2024-01-03"])})
+    index = FilterIndex(df)
+    np.testing.assert_array_equal(index.date_range("2024-01-01", "2024-01-03"), [0, 1, 2])
+    np.testing.assert_array_equal(index.date_range("2024-01-02", "2024-01-03"), [0, 2])
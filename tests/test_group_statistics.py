@@ -0,0 +1,146 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from group_statistics import (
+    RunningGroupQuantiles,
+    RunningGroupStats,
+    SortedGroups,
+    grouped_moments,
+    moments_to_std,
+)
+
+
+@pytest.fixture
+def rows():
+    rng = np.random.default_rng(5)
+    n = 1_000
+    values = rng.normal(0.8, 0.3, size=n)
+    values[rng.random(n) < 0.05] = np.nan
+    keys = rng.choice(["PF01", "PF02", "PF03", "PF04"], size=n).astype(object)
+    keys[rng.random(n) < 0.02] = None
+    return pd.DataFrame({"perforadora": keys, "tasa_penetracion": values})
+
+
+def test_grouped_moments_match_pandas(rows):
+    codes, uniques = pd.factorize(rows["perforadora"])
+    counts, means, m2 = grouped_moments(codes, rows["tasa_penetracion"], len(uniques))
+    grouped = rows.groupby("perforadora")["tasa_penetracion"]
+    expected = grouped.agg(["count", "mean", "std"]).loc[list(uniques)]
+    assert counts.tolist() == expected["count"].tolist()
+    np.testing.assert_allclose(means, expected["mean"], rtol=1e-12)
+    np.testing.assert_allclose(moments_to_std(counts, m2), expected["std"], rtol=1e-12)
+
+
+def test_chunked_updates_equal_single_batch(rows):
+    batch = RunningGroupStats().update(rows["perforadora"], rows["tasa_penetracion"])
+    streamed = RunningGroupStats()
+    for start in range(0, len(rows), 77):
+        part = rows.iloc[start:start + 77]
+        streamed.update(part["perforadora"], part["tasa_penetracion"])
+    expected = batch.to_frame().sort_index()
+    actual = streamed.to_frame().sort_index()
+    assert actual["count"].tolist() == expected["count"].tolist()
+    np.testing.assert_allclose(actual["mean"], expected["mean"], rtol=1e-12)
+    np.testing.assert_allclose(actual["std"], expected["std"], rtol=1e-10)
+
+
+def test_merge_combines_partial_accumulators(rows):
+    half = len(rows) // 2
+    left = RunningGroupStats().update(
+        rows["perforadora"][:half], rows["tasa_penetracion"][:half]
+    )
+    right = RunningGroupStats().update(
+        rows["perforadora"][half:], rows["tasa_penetracion"][half:]
+    )
+    merged = left.merge(right).to_frame().sort_index()
+    expected = (
+        rows.groupby("perforadora")["tasa_penetracion"]
+        .agg(["count", "mean", "std"])
+        .sort_index()
+    )
+    np.testing.assert_allclose(merged["mean"], expected["mean"], rtol=1e-12)
+    np.testing.assert_allclose(merged["std"], expected["std"], rtol=1e-10)
+
+
+def test_small_and_empty_groups_follow_batch_guards():
+    stats = RunningGroupStats()
+    stats.update(["A", "B", "B"], [0.5, float("nan"), float("nan")])
+    stats.update(["A"], [float("nan")])
+    frame = stats.to_frame()
+    assert frame.loc["A", "count"] == 1
+    assert frame.loc["A", "std"] == 0.0
+    assert frame.loc["B", "count"] == 0
+    assert np.isnan(frame.loc["B", "mean"])
+    z = stats.normalize(["A", "B", "C", None], [0.9, 0.9, 0.9, 0.9])
+    assert z.tolist() == [0.0, 0.0, 0.0, 0.0]
+
+
+@pytest.fixture
+def positive_rows():
+    rng = np.random.default_rng(11)
+    n = 20_000
+    keys = rng.choice(["PF01", "PF02", "PF03"], size=n).astype(object)
+    values = rng.lognormal(np.where(keys == "PF01", 3.0, 1.0), 0.4)
+    values[rng.random(n) < 0.02] = np.nan
+    values[rng.random(n) < 0.01] = -1.0
+    return pd.DataFrame({"perforadora": keys, "duracion": values})
+
+
+def test_quantile_sketch_tracks_exact_median_and_mad(positive_rows):
+    sketch = RunningGroupQuantiles()
+    for start in range(0, len(positive_rows), 3_000):
+        part = positive_rows.iloc[start:start + 3_000]
+        sketch.update(part["perforadora"], part["duracion"])
+    kept = positive_rows[positive_rows["duracion"] > 0]
+    grouped = kept.groupby("perforadora")["duracion"]
+    median, mad = sketch.median_mad()
+    exact_median = grouped.median().loc[sketch.keys]
+    exact_mad = grouped.apply(lambda s: (s - s.median()).abs().median()).loc[sketch.keys]
+    assert sketch.counts().tolist() == grouped.size().loc[sketch.keys].tolist()
+    np.testing.assert_allclose(median, exact_median, rtol=0.01)
+    np.testing.assert_allclose(mad, exact_mad, rtol=0.01)
+    np.testing.assert_allclose(
+        sketch.quantiles([0.25, 0.75]), grouped.quantile([0.25, 0.75]).unstack().loc[sketch.keys],
+        rtol=0.01,
+    )
+
+
+def test_quantile_sketches_merge_like_a_single_pass(positive_rows):
+    half = len(positive_rows) // 2
+    single = RunningGroupQuantiles().update(positive_rows["perforadora"], positive_rows["duracion"])
+    merged = RunningGroupQuantiles().update(
+        positive_rows["perforadora"][:half], positive_rows["duracion"][:half]
+    )
+    merged.merge(
+        RunningGroupQuantiles().update(
+            positive_rows["perforadora"][half:], positive_rows["duracion"][half:]
+        )
+    )
+    order = [merged.keys.index(key) for key in single.keys]
+    np.testing.assert_array_equal(merged.quantiles([0.1, 0.5, 0.9])[order], single.quantiles([0.1, 0.5, 0.9]))
+
+
+def test_empty_quantile_sketch_groups_are_nan():
+    sketch = RunningGroupQuantiles().update(["A", "B"], [np.nan, 2.0])
+    median, mad = sketch.median_mad()
+    assert np.isnan(median[0]) and np.isnan(mad[0])
+    assert median[1] == pytest.approx(2.0, rel=0.01)
+    assert sketch.row_slots(["B", "C", None]).tolist() == [1, -1, -1]
+
+
+def test_sorted_groups_median_mad_and_ranks_match_pandas(rows):
+    codes, uniques = pd.factorize(rows["perforadora"])
+    values = rows["tasa_penetracion"].round(1).to_numpy()
+    groups = SortedGroups(codes, values, len(uniques))
+    grouped = pd.Series(values).groupby(codes)
+    median = grouped.median().loc[range(len(uniques))]
+    mad = grouped.apply(lambda s: (s - s.median()).abs().median()).loc[range(len(uniques))]
+    np.testing.assert_allclose(groups.median(), median, rtol=1e-12)
+    np.testing.assert_allclose(groups.mad(), mad, rtol=1e-12, atol=1e-12)
+
+    # Mid-rank percentiles: pandas' average rank minus half, over the count.
+    expected = (grouped.rank(method="average") - 0.5) / grouped.transform("count")
+    expected[codes < 0] = np.nan
+    np.testing.assert_allclose(groups.own_percentile_ranks(), expected, rtol=1e-12)
+    np.testing.assert_allclose(groups.percentile_ranks(codes, values), expected, rtol=1e-12)
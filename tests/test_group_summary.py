@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from classification import HARDNESS_LABELS
+from group_summary import SUMMARY_STATISTICS, group_summary
+
+
+@pytest.fixture
+def rows():
+    rng = np.random.default_rng(7)
+    n = 5_000
+    values = rng.gamma(2.0, 0.5, n)
+    values[rng.random(n) < 0.05] = np.nan
+    values[:3] = [25.0, -10.0, np.inf]  # outliers beyond the whiskers
+    keys = rng.choice(["PF01", "PF02", "PF03", None], n, p=[0.5, 0.3, 0.15, 0.05]).astype(object)
+    keys[:3] = "PF01"
+    codes = rng.integers(-1, 4, n)
+    return pd.DataFrame({"perforadora": keys, "tasa": values, "codigo": codes})
+
+
+@pytest.mark.parametrize("max_slice_groups", [4096, 0])
+def test_summary_matches_pandas_groupby(rows, monkeypatch, max_slice_groups):
+    monkeypatch.setattr("group_summary.MAX_SLICE_SORT_GROUPS", max_slice_groups)
+    summary = group_summary(rows["perforadora"], rows["tasa"], rows["codigo"])
+    assert summary.index.name == "perforadora"
+    assert list(summary.columns) == list(SUMMARY_STATISTICS) + list(HARDNESS_LABELS)
+
+    finite = rows[np.isfinite(rows["tasa"])]
+    grouped = finite.groupby("perforadora")["tasa"]
+    np.testing.assert_array_equal(summary["filas"], rows.groupby("perforadora").size())
+    np.testing.assert_array_equal(summary["validos"], grouped.size())
+    for column, expected in [
+        ("media", grouped.mean()), ("minimo", grouped.min()), ("maximo", grouped.max()),
+        ("q1", grouped.quantile(0.25)), ("mediana", grouped.median()), ("q3", grouped.quantile(0.75)),
+    ]:
+        np.testing.assert_allclose(summary[column], expected)
+
+    pf01 = finite.loc[finite["perforadora"] == "PF01", "tasa"]
+    q1, q3 = pf01.quantile([0.25, 0.75])
+    inside = pf01[pf01.between(q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1))]
+    assert summary.loc["PF01", "bigote_inferior"] == inside.min() > -10.0
+    assert summary.loc["PF01", "bigote_superior"] == inside.max() < 25.0
+
+    classified = rows[rows["codigo"] >= 0].dropna(subset=["perforadora"])
+    mix = pd.crosstab(classified["perforadora"], classified["codigo"])
+    np.testing.assert_array_equal(summary[list(HARDNESS_LABELS)], mix)
+
+
+def test_categorical_keys_keep_order_and_empty_groups_are_nan():
+    keys = pd.Categorical(["b", "a", "b", "c"], categories=["c", "b", "a", "z"])
+    summary = group_summary(keys, [1.0, np.nan, 3.0, 4.0])
+    assert list(summary.index) == ["c", "b", "a"]
+    assert summary.loc["b", "mediana"] == 2.0
+    assert summary.loc["a", "filas"] == 1 and summary.loc["a", "validos"] == 0
+    assert np.isnan(summary.loc["a", "media"])
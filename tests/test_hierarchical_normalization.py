@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from hierarchical_normalization import HierarchicalNormalizer
+
+
+@pytest.fixture
+def holes():
+    rng = np.random.default_rng(5)
+    n = 3_000
+    rigs = rng.choice(["PF01", "PF02", "PF03"], size=n).astype(object)
+    patterns = rng.choice([f"P{i}" for i in range(12)], size=n).astype(object)
+    patterns[:40] = None
+    tasa = rng.lognormal(np.where(rigs == "PF01", 0.5, 0.0), 0.3)
+    tasa[40:50] = np.nan
+    start = pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 90 * 24, n), unit="h")
+    return pd.DataFrame(
+        {
+            "perforadora": rigs,
+            "drill_pattern": patterns,
+            "tasa_penetracion": tasa,
+            "tiempo inicio": start,
+        }
+    )
+
+
+def _groupby_zscores(df, keys):
+    """Z-scores against the finest group, falling back to coarser ones."""
+    tasa = df["tasa_penetracion"]
+    mean = pd.Series(tasa.mean(), index=df.index)
+    std = pd.Series(tasa.std(), index=df.index)
+    for depth in range(1, len(keys) + 1):
+        level = list(keys[:depth])
+        present = df[level].notna().all(axis=1)
+        grouped = df[present].groupby(level)["tasa_penetracion"]
+        mean[present] = grouped.transform("mean")
+        std[present] = grouped.transform("std").fillna(0.0)
+    z = (tasa - mean) / std
+    return z.where(std > 1e-9, 0.0).fillna(0.0).to_numpy()
+
+
+def test_without_shrinkage_matches_groupby(holes):
+    keys = ("perforadora", "drill_pattern")
+    z = HierarchicalNormalizer(holes, keys, prior=0).zscores()
+    np.testing.assert_allclose(z, _groupby_zscores(holes, keys), atol=1e-9)
+
+
+def test_shrinkage_pulls_small_groups_toward_parent(holes):
+    holes.loc[:4, "drill_pattern"] = "CHICO"
+    holes.loc[:4, "perforadora"] = "PF01"
+    holes.loc[:4, "tasa_penetracion"] = 50.0
+    table = HierarchicalNormalizer(holes, ("perforadora", "drill_pattern"), prior=30).table()
+    small = table[table["drill_pattern"] == "CHICO"].iloc[0]
+    rig = HierarchicalNormalizer(holes, ("perforadora",), prior=30).table()
+    rig_mean = rig.loc[rig["perforadora"] == "PF01", "media_ajustada"].iloc[0]
+    assert small["filas"] == 5 and small["media"] == 50.0
+    assert small["media_ajustada"] == pytest.approx((5 * 50.0 + 30 * rig_mean) / 35)
+    # A large group barely moves.
+    large = table[table["filas"] > 50].iloc[0]
+    assert abs(large["media_ajustada"] - large["media"]) < abs(large["media"] - rig_mean)
+
+
+def test_time_keys(holes):
+    table = HierarchicalNormalizer(holes, ("perforadora", "semana"), prior=0).table()
+    weeks = holes["tiempo inicio"].dt.to_period("W-SUN").dt.start_time
+    expected = holes.assign(semana=weeks).groupby(["perforadora", "semana"]).size()
+    assert len(table) == len(expected)
+    assert (table["semana"].dt.dayofweek == 0).all()
+    months = HierarchicalNormalizer(holes, ("mes",), prior=0).table()
+    assert sorted(months["mes"]) == list(pd.date_range("2024-01-01", periods=3, freq="MS"))
+
+
+def test_table_levels(holes):
+    normalizer = HierarchicalNormalizer(holes, ("perforadora", "drill_pattern"))
+    assert list(normalizer.table(1).columns) == [
+        "perforadora", "filas", "media", "std", "media_ajustada", "std_ajustada"
+    ]
+    assert normalizer.table(1)["filas"].sum() == holes["tasa_penetracion"].notna().sum()
+    assert len(normalizer) == len(normalizer.table())
+    with pytest.raises(ValueError):
+        normalizer.table(3)
+
+
+@pytest.mark.parametrize(
+    "keys, prior", [(("profundidad",), 30), ((), 30), (("perforadora",), -1)]
+)
+def test_invalid_arguments(holes, keys, prior):
+    with pytest.raises(ValueError):
+        HierarchicalNormalizer(holes, keys, prior=prior)
+
+
+def test_time_key_requires_time_column(holes):
+    with pytest.raises(ValueError, match="tiempo inicio"):
+        HierarchicalNormalizer(holes.drop(columns="tiempo inicio"), ("semana",))
+
+
+def test_add_hierarchical_normalized_rate(processor, holes):
+    out = processor.add_hierarchical_normalized_rate(holes, prior=0)
+    assert "tasa_penetracion_jerarquica" not in holes.columns
+    np.testing.assert_allclose(
+        out["tasa_penetracion_jerarquica"],
+        _groupby_zscores(holes, processor.HIERARCHY_KEYS),
+        atol=1e-9,
+    )
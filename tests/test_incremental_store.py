@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+HEADER = "pozo,tiempo inicio,tiempo final,perforadora,prof. por operador\n"
+
+
+@pytest.fixture
+def store_module(lazy_import):
+    return lazy_import("incremental_store")
+
+
+def _shift(tmp_path, name, rows):
+    path = tmp_path / name
+    path.write_text(HEADER + "".join(f"{row}\n" for row in rows), encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def shifts(tmp_path):
+    first = _shift(tmp_path, "turno1.csv", [
+        "P1,2024-05-10 08:00,2024-05-10 08:20,PF01,15",
+        "P2,2024-05-10 09:00,2024-05-10 09:30,PF01,15",
+        "P3,2024-05-10 10:00,2024-05-10 10:10,PF02,15",
+        "P4,2024-05-10 11:00,2024-05-10 11:45,PF02,15",
+    ])
+    # Cumulative export: repeats P2 and P4, adds rows for PF01 and PF03.
+    second = _shift(tmp_path, "turno2.csv", [
+        "P2,2024-05-10 09:00,2024-05-10 09:30,PF01,15",
+        "P4,2024-05-10 11:00,2024-05-10 11:45,PF02,15",
+        "P5,2024-05-10 20:00,2024-05-10 20:50,PF01,15",
+        "P6,2024-05-10 21:00,2024-05-10 21:12,PF03,15",
+        "P6,2024-05-10 21:00,2024-05-10 21:12,PF03,15",
+        "P7,2024-05-10 22:00,2024-05-10 22:40,PF03,",
+    ])
+    return first, second
+
+
+def _full_reload(processor, paths):
+    full = pd.concat([processor.load_and_process(path) for path in paths], ignore_index=True)
+    full = full.drop_duplicates(["pozo", "tiempo inicio"], ignore_index=True)
+    return processor.add_rig_normalized_rate(full)
+
+
+def test_append_deduplicates_and_tracks_dirty_rigs(store_module, shifts):
+    store = store_module.IncrementalStore()
+    first = store.append(shifts[0])
+    assert first == {"added": 4, "duplicates": 0, "dirty_rigs": []}
+    second = store.append(shifts[1])
+    assert second["added"] == 3 and second["duplicates"] == 3
+    # PF02 only got duplicates and PF03 is new, so only PF01's older
+    # z-scores are stale.
+    assert second["dirty_rigs"] == ["PF01"]
+    assert store.dirty_rigs == ["PF01"]
+    assert len(store) == 7
+    assert store.frame["pozo"].tolist() == ["P1", "P2", "P3", "P4", "P5", "P6", "P7"]
+    assert store.dirty_rigs == []
+
+
+def test_zscores_match_full_reload(store_module, processor, shifts):
+    store = store_module.IncrementalStore()
+    for path in shifts:
+        store.append(path)
+    frame = store.frame
+    expected = _full_reload(processor, shifts)
+    np.testing.assert_allclose(
+        frame["tasa_penetracion_normalizada"].to_numpy(),
+        expected["tasa_penetracion_normalizada"].to_numpy(),
+    )
+    stats = store.rig_stats.to_frame()
+    assert stats.loc["PF01", "count"] == 3
+
+
+def test_parts_are_not_rewritten_by_later_shifts(store_module, shifts):
+    store = store_module.IncrementalStore()
+    store.append(shifts[0])
+    first = store._parts[0]
+    store.append(shifts[1])
+    assert store._parts[0] is first
+    assert "tasa_penetracion_normalizada" not in first.columns
+
+
+def test_save_reload_append_matches_full_reload(store_module, processor, shifts, tmp_path):
+    pytest.importorskip("pyarrow")
+    third = _shift(tmp_path, "turno3.csv", [
+        "P5,2024-05-10 20:00,2024-05-10 20:50,PF01,15",
+        "P8,2024-05-11 08:00,2024-05-11 08:25,PF02,15",
+    ])
+    directory = tmp_path / "almacen"
+    store = store_module.IncrementalStore()
+    store.append(shifts[0])
+    store.save(directory)
+
+    # Each later shift runs in a "new process": reload, append, save.
+    for path in (shifts[1], third):
+        store = store_module.IncrementalStore.load(directory)
+        assert store._parts and not any(isinstance(p, pd.DataFrame) for p in store._parts)
+        report = store.append(path)
+        store.save(directory)
+    assert report["added"] == 1 and report["duplicates"] == 1
+    assert sorted(p.name for p in directory.glob("*.feather")) == [
+        "parte_000000.feather", "parte_000001.feather", "parte_000002.feather"
+    ]
+
+    reloaded = store_module.IncrementalStore.load(directory)
+    pd.testing.assert_frame_equal(reloaded.frame, _full_reload(processor, [*shifts, third]))
+    assert reloaded.rig_stats.to_frame().equals(store.rig_stats.to_frame())
+
+
+def test_load_rejects_missing_store(store_module, tmp_path):
+    with pytest.raises(ValueError, match="almacén"):
+        store_module.IncrementalStore.load(tmp_path / "vacio")
+
+
+def test_same_rows_in_two_timestamp_layouts_are_duplicates(store_module, tmp_path):
+    iso = _shift(tmp_path, "iso.csv", ["P1,2024-01-02 08:00:00,2024-01-02 08:20:00,R1,15"])
+    slashed = _shift(tmp_path, "barras.csv", ["P1,01/02/2024 08:00:00,01/02/2024 08:20:00,R1,15"])
+    store = store_module.IncrementalStore()
+    store.append(iso)
+    report = store.append(slashed)
+    assert report == {"added": 0, "duplicates": 1, "dirty_rigs": []}
@@ -1,3 +1,4 @@
+import math
 import json
 from pathlib import Path
 
@@ -69,6 +70,18 @@ _DISPATCH = {
     "rig_normalized_penetration": lambda inp: classification.rig_normalized_penetration(
         inp["rate"], inp["rig_avg"], inp["rig_std"]
     ),
+    "rig_median_penetration": lambda inp: classification.rig_median_penetration(
+        inp["rates"]
+    ),
+    "rig_mad_penetration": lambda inp: classification.rig_mad_penetration(inp["rates"]),
+    "rig_robust_normalized_penetration": lambda inp: (
+        classification.rig_robust_normalized_penetration(
+            inp["rate"], inp["rig_median"], inp["rig_mad"]
+        )
+    ),
+    "rig_percentile_rank": lambda inp: classification.rig_percentile_rank(
+        inp["rate"], inp["rig_rates"]
+    ),
 }
 
 
@@ -125,4 +138,104 @@ def test_drilling_analytics_parity(case):
         f"case[{case['comment']}] function={fn_name} "
         f"inputs={case['inputs']} expected={expected} actual={actual} "
         f"tolerance={tolerance}"
-    )
\ No newline at end of file
+    )
+
+# ---------------------------------------------------------------------------
+# Vectorized helpers must reproduce the scalar fixtures element for element.
+# ---------------------------------------------------------------------------
+
+
+def test_classify_array_matches_classification_fixture():
+    cases = _load_cases()
+    values = [c["input"] for c in cases]
+    actual = classification.classify_array(
+        values, classification.DEFAULT_THRESHOLDS, "duration"
+    )
+    expected = [c["expected_dureza"] for c in cases]
+    assert actual.tolist() == expected
+
+
+def test_hardness_index_array_matches_classification_fixture():
+    cases = _load_cases()
+    values = [c["input"] for c in cases]
+    actual = classification.hardness_index_array(
+        values, classification.DEFAULT_THRESHOLDS, "duration"
+    )
+    for case, value in zip(cases, actual):
+        assert value == pytest.approx(case["expected_indice_dureza"], abs=1e-9), (
+            f"case[{case['comment']}] input={case['input']} actual={value}"
+        )
+
+
+_ARRAY_DISPATCH = {
+    "classify_with_metric": classification.classify_array,
+    "hardness_index_with_metric": classification.hardness_index_array,
+}
+
+_ARRAY_CASES = [c for c in _DRILLING_CASES if c["function"] in _ARRAY_DISPATCH]
+
+
+@pytest.mark.parametrize(
+    "case",
+    _ARRAY_CASES,
+    ids=[c["comment"] for c in _ARRAY_CASES],
+)
+def test_drilling_analytics_array_parity(case):
+    inputs = case["inputs"]
+    array_fn = _ARRAY_DISPATCH[case["function"]]
+    # Surround the fixture value with neighbours so the case is checked
+    # inside a real vector, not as a lone element.
+    values = [inputs["value"] - 1e-6, inputs["value"], inputs["value"] + 1e-6]
+    actual = array_fn(values, inputs["thresholds"], inputs["metric"])
+    scalar = _DISPATCH[case["function"]]
+    for value, got in zip(values, actual):
+        assert got == scalar({**inputs, "value": value})
+    assert actual[1] == pytest.approx(case["expected"], abs=case.get("tolerance") or 0)
+
+
+_PENETRATION_CASES = [c for c in _DRILLING_CASES if c["function"] == "penetration_rate"]
+
+
+def test_penetration_rate_array_matches_drilling_fixture():
+    depths = [c["inputs"]["depth_m"] for c in _PENETRATION_CASES]
+    durations = [c["inputs"]["duration_min"] for c in _PENETRATION_CASES]
+    actual = classification.penetration_rate_array(depths, durations)
+    for case, value in zip(_PENETRATION_CASES, actual):
+        if case["expected"] is None:
+            assert math.isnan(value), f"case[{case['comment']}] actual={value}"
+        else:
+            assert value == pytest.approx(case["expected"], abs=case["tolerance"])
+
+
+_ZSCORE_CASES = [
+    c for c in _DRILLING_CASES if c["function"] == "rig_normalized_penetration"
+]
+
+
+def test_rig_normalized_penetration_array_matches_drilling_fixture():
+    actual = classification.rig_normalized_penetration_array(
+        [c["inputs"]["rate"] for c in _ZSCORE_CASES],
+        [c["inputs"]["rig_avg"] for c in _ZSCORE_CASES],
+        [c["inputs"]["rig_std"] for c in _ZSCORE_CASES],
+    )
+    for case, value in zip(_ZSCORE_CASES, actual):
+        assert value == pytest.approx(
+            case["expected"], abs=case.get("tolerance") or 1e-12
+        ), f"case[{case['comment']}] actual={value}"
+
+
+_ROBUST_CASES = [
+    c for c in _DRILLING_CASES if c["function"] == "rig_robust_normalized_penetration"
+]
+
+
+def test_rig_robust_normalized_penetration_array_matches_drilling_fixture():
+    actual = classification.rig_robust_normalized_penetration_array(
+        [c["inputs"]["rate"] for c in _ROBUST_CASES],
+        [c["inputs"]["rig_median"] for c in _ROBUST_CASES],
+        [c["inputs"]["rig_mad"] for c in _ROBUST_CASES],
+    )
+    for case, value in zip(_ROBUST_CASES, actual):
+        assert value == pytest.approx(
+            case["expected"], abs=case.get("tolerance") or 1e-12
+        ), f"case[{case['comment']}] actual={value}"
@@ -0,0 +1,91 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+import processed_cache  # noqa: E402
+
+CSV = (
+    "tiempo inicio,tiempo final,perforadora,pozo,profundidad\n"
+    "2024/05/10 08:30,2024/05/10 08:46,PF01,P-1,15.0\n"
+    "2024/05/10 09:15,2024/05/10 09:40,PF01,P-2,15.5\n"
+    "2024/05/10 10:05,2024/05/10 10:45,PF02,P-3,14.0\n"
+    "2024/05/10 11:20,2024/05/10 11:50,PF02,P-4,16.25\n"
+)
+
+
+pytestmark = pytest.mark.usefixtures("object_strings")
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / "perforacion.csv"
+    path.write_text(CSV, encoding="utf-8")
+    return path
+
+
+class _CountingProcessor:
+    def __init__(self, inner):
+        self.inner = inner
+        self.calls = 0
+        self.PARSER_ENGINES = inner.PARSER_ENGINES
+        self.DATETIME_FORMATS = inner.DATETIME_FORMATS
+
+    def load_and_process(self, source, compact=False):
+        self.calls += 1
+        return self.inner.load_and_process(source, compact=compact)
+
+
+def test_reload_reads_cache_instead_of_reprocessing(processor, csv_path, tmp_path):
+    cache = processed_cache.ProcessedDataCache(tmp_path / "cache")
+    counting = _CountingProcessor(processor)
+    first = cache.load(csv_path, counting)
+    second = cache.load(csv_path, counting)
+    assert counting.calls == 1
+    pd.testing.assert_frame_equal(first, second)
+    assert second.attrs == first.attrs
+    assert second.attrs["parse_report"]["rows"] == 4
+    assert second["pozo"].dtype == object
+
+
+def test_cached_frame_uses_compact_dtypes(processor, csv_path, tmp_path):
+    cache = processed_cache.ProcessedDataCache(tmp_path / "cache")
+    fresh = processor.load_and_process(csv_path)
+    df = cache.load(csv_path, processor)
+    assert isinstance(df["perforadora"].dtype, pd.CategoricalDtype)
+    assert df["perforadora"].cat.categories.dtype == object
+    assert df["profundidad"].dtype == np.float32
+    # Inexact values stay float64 so classification cannot shift.
+    assert df["tasa_penetracion"].dtype == np.float64
+    assert pd.api.types.is_datetime64_any_dtype(df["tiempo inicio"])
+    np.testing.assert_array_equal(df["duracion"], fresh["duracion"])
+
+
+def test_processing_settings_change_the_key(processor, csv_path, tmp_path):
+    cache = processed_cache.ProcessedDataCache(tmp_path / "cache")
+    first = cache.load(csv_path, processor)
+    processor.PARSER_ENGINES = ("c",)
+    second = cache.load(csv_path, processor)
+    assert first.attrs["fingerprint"] != second.attrs["fingerprint"]
+
+
+def test_eviction_removes_least_recently_used(tmp_path):
+    cache = processed_cache.ProcessedDataCache(tmp_path / "cache", max_bytes=1)
+    frame = pd.DataFrame({"x": np.arange(100, dtype=float)})
+    cache.put("viejo", frame)
+    os.utime(cache._path("viejo"), (0, 0))
+    cache.put("nuevo", frame)
+    assert not cache._path("viejo").exists()
+    # The newest entry is kept even if it alone exceeds the budget.
+    assert cache.get("nuevo") is not None
+
+
+def test_corrupt_file_is_a_miss(tmp_path):
+    cache = processed_cache.ProcessedDataCache(tmp_path / "cache")
+    cache.directory.mkdir()
+    cache._path("roto").write_bytes(b"no es feather")
+    assert cache.get("roto") is None
+    assert not cache._path("roto").exists()
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from rig_intervals import RigIntervals
+
+T = pd.Timestamp
+
+
+@pytest.fixture
+def holes():
+    return pd.DataFrame(
+        {
+            "perforadora": ["A", "A", "A", "A", "B", "B", None],
+            "tiempo inicio": [
+                T("2024-01-01 07:00"), T("2024-01-01 07:30"), T("2024-01-01 07:40"),
+                T("2024-01-01 10:00"), T("2024-01-01 19:00"), T("2024-01-02 09:00"),
+                T("2024-01-01 00:00"),
+            ],
+            "tiempo final": [
+                T("2024-01-01 08:30"), T("2024-01-01 07:50"), T("2024-01-01 09:00"),
+                T("2024-01-01 11:00"), T("2024-01-01 21:00"), pd.NaT,
+                T("2024-01-01 01:00"),
+            ],
+        }
+    )
+
+
+def test_gaps_and_overlaps(holes):
+    intervals = RigIntervals(holes)
+    table = intervals.table()
+    assert table["fila"].tolist() == [0, 1, 2, 3, 4]
+    np.testing.assert_array_equal(table["inactividad_min"], [np.nan, 0.0, 0.0, 60.0, np.nan])
+    assert table["solape_min"].tolist() == [0.0, 60.0, 50.0, 0.0, 0.0]
+    # The containing hole is flagged along with the holes inside it.
+    assert intervals.overlap_mask().tolist() == [True, True, True, False, False, False, False]
+    assert intervals.overlap_report() == {"overlap_count": 3, "overlap_rows": [0, 1, 2], "rigs": ["A"]}
+
+
+def test_utilisation_counts_the_union_and_splits_at_shift_changes(holes):
+    util = RigIntervals(holes).utilisation()
+    assert util["turno"].tolist() == [
+        T("2023-12-31 20:00"), T("2024-01-01 08:00"), T("2024-01-01 08:00"), T("2024-01-01 20:00")
+    ]
+    assert util["perforadora"].tolist() == ["A", "A", "B", "B"]
+    assert util["pozos"].tolist() == [3, 1, 1, 0]
+    np.testing.assert_allclose(util["horas_perforacion"], [1.0, 2.0, 1.0, 1.0])
+    np.testing.assert_allclose(util["utilizacion"], np.array([1.0, 2.0, 1.0, 1.0]) / 12)
+
+
+def test_utilisation_matches_minute_grid_on_random_holes():
+    rng = np.random.default_rng(5)
+    n = 300
+    start = T("2024-03-01 05:00") + pd.to_timedelta(rng.integers(0, 3 * 24 * 60, n), unit="min")
+    df = pd.DataFrame(
+        {
+            "perforadora": rng.choice(["PF01", "PF02"], n),
+            "tiempo inicio": start,
+            "tiempo final": start + pd.to_timedelta(rng.integers(0, 600, n), unit="min"),
+        }
+    )
+    util = RigIntervals(df).utilisation(shift_hours=8, shift_start_hour=6)
+    for rig, rows in df.groupby("perforadora"):
+        busy = set()
+        for s, e in zip(rows["tiempo inicio"], rows["tiempo final"]):
+            busy.update(pd.date_range(s, e, freq="min", inclusive="left"))
+        shifts = pd.Series(1, index=sorted(busy)).resample("8h", origin=T("2024-03-01 06:00")).sum()
+        got = util[util["perforadora"] == rig].set_index("turno")["horas_perforacion"] * 60
+        expected = shifts.reindex(got.index, fill_value=0)
+        np.testing.assert_allclose(got.to_numpy(), expected.to_numpy())
+        assert got.sum() == len(busy)
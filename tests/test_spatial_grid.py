@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from spatial_grid import GRID_STATISTICS, auto_cell_size, grid_aggregate
+
+
+def test_statistics_match_pandas_groupby():
+    rng = np.random.default_rng(3)
+    n = 5_000
+    x = rng.uniform(100.0, 400.0, n)
+    y = rng.uniform(-50.0, 150.0, n)
+    values = rng.uniform(0.0, 100.0, n)
+    values[::11] = np.nan
+    grid = grid_aggregate(x, y, values, cell_size=25.0, statistics=GRID_STATISTICS)
+
+    # Edges are aligned to multiples of the cell size.
+    assert grid["x_centers"][0] == pytest.approx(112.5)
+    assert grid["y_centers"][0] == pytest.approx(-37.5)
+    ix = ((x - 100.0) // 25.0).astype(int)
+    iy = ((y + 50.0) // 25.0).astype(int)
+    frame = pd.DataFrame({"ix": ix, "iy": iy, "v": values})
+    expected = frame.groupby(["iy", "ix"])["v"].agg(["size", "mean", "median", "max"])
+    rows = expected.index.get_level_values("iy")
+    cols = expected.index.get_level_values("ix")
+    np.testing.assert_array_equal(grid["count"][rows, cols], expected["size"])
+    for stat in ("mean", "median", "max"):
+        np.testing.assert_allclose(grid[stat][rows, cols], expected[stat])
+    assert grid["count"].sum() == n
+
+
+def test_empty_cells_and_missing_values():
+    x = np.array([0.5, 2.5, np.nan, 2.6])
+    y = np.array([0.5, 0.5, 0.5, 0.4])
+    values = np.array([10.0, np.nan, 50.0, np.nan])
+    grid = grid_aggregate(x, y, values, cell_size=1.0, statistics=("count", "mean", "max"))
+    assert grid["count"].tolist() == [[1, 0, 2]]
+    assert grid["mean"][0, 0] == 10.0
+    assert np.isnan(grid["mean"][0, 1]) and np.isnan(grid["max"][0, 2])
+
+
+def test_auto_cell_size_and_validation():
+    assert auto_cell_size([0.0, 2_000.0], [0.0, 500.0], resolution=200) == 10.0
+    with pytest.raises(ValueError):
+        grid_aggregate([0.0], [0.0], [1.0], statistics=("mode",))
+    with pytest.raises(ValueError):
+        grid_aggregate([0.0], [0.0], None, statistics=("mean",))
+    with pytest.raises(ValueError):
+        grid_aggregate([0.0, 1e6], [0.0, 1e6], cell_size=1.0, statistics=("count",))
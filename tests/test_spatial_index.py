@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from spatial_index import SpatialIndex
+
+
+@pytest.fixture
+def cloud():
+    rng = np.random.default_rng(11)
+    n = 20_000
+    x = rng.uniform(0.0, 2_000.0, n)
+    y = rng.uniform(0.0, 1_000.0, n)
+    z = rng.uniform(2_500.0, 3_000.0, n)
+    x[::97] = np.nan
+    z[::13] = np.nan
+    return x, y, z
+
+
+def _brute_nearest(x, y, qx, qy, k, z=None, qz=None):
+    d = (x - qx) ** 2 + (y - qy) ** 2
+    if z is not None:
+        d = d + (z - qz) ** 2
+    d[~np.isfinite(d)] = np.inf
+    return np.lexsort((np.arange(len(d)), d))[:k]
+
+
+def test_radius_and_box_match_brute_force(cloud):
+    x, y, z = cloud
+    index = SpatialIndex(x, y, z)
+    for cx, cy, r in [(1_000.0, 500.0, 40.0), (0.0, 0.0, 150.0), (3_000.0, 500.0, 10.0)]:
+        expected = np.flatnonzero((x - cx) ** 2 + (y - cy) ** 2 <= r * r)
+        np.testing.assert_array_equal(index.within_radius(cx, cy, r), expected)
+    expected = np.flatnonzero((x >= 100) & (x <= 350) & (y >= 20) & (y <= 90))
+    np.testing.assert_array_equal(index.within_box(100, 350, 20, 90), expected)
+
+
+def test_polygon_matches_triangle_test(cloud):
+    x, y, _ = cloud
+    index = SpatialIndex(x, y)
+    rows = index.within_polygon([(0, 0), (1_000, 0), (0, 1_000)])
+    expected = np.flatnonzero((x >= 0) & (y >= 0) & (x + y < 1_000))
+    # Points on an edge may fall either way; none are generated there.
+    np.testing.assert_array_equal(rows, expected)
+    with pytest.raises(ValueError):
+        index.within_polygon([(0, 0), (1, 1)])
+
+
+@pytest.mark.parametrize("query", [(1_000.0, 500.0), (-400.0, -900.0), (1_000.0, 4_000.0)])
+@pytest.mark.parametrize("k", [1, 7])
+def test_nearest_matches_brute_force(cloud, query, k):
+    x, y, z = cloud
+    index = SpatialIndex(x, y, z)
+    rows, distances = index.nearest(*query, k=k)
+    np.testing.assert_array_equal(rows, _brute_nearest(x, y, *query, k))
+    assert np.all(np.diff(distances) >= 0)
+
+    rows, _ = index.nearest(*query, qz=2_700.0, k=k)
+    np.testing.assert_array_equal(rows, _brute_nearest(x, y, *query, k, z, 2_700.0))
+
+
+def test_from_frame_mask_and_empty_index():
+    df = pd.DataFrame({"este": [0.0, 10.0, None], "norte": [0.0, 10.0, 5.0]})
+    index = SpatialIndex.from_frame(df)
+    assert index.mask(index.within_radius(0.0, 0.0, 1.0)).tolist() == [True, False, False]
+    empty = SpatialIndex([np.nan], [np.nan])
+    assert len(empty.within_radius(0.0, 0.0, 10.0)) == 0
+    assert len(empty.nearest(0.0, 0.0)[0]) == 0
@@ -0,0 +1,89 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from classification import DEFAULT_THRESHOLDS, classify_codes
+from threshold_calibration import calibrate_thresholds, natural_breaks, snap_cutoffs
+
+
+def _brute_force_breaks(values):
+    points, weights = np.unique(values, return_counts=True)
+
+    def sse(a, b):
+        x, w = points[a:b], weights[a:b]
+        mean = np.average(x, weights=w)
+        return float((w * (x - mean) ** 2).sum())
+
+    best = min(
+        itertools.combinations(range(1, len(points)), 3),
+        key=lambda c: sse(0, c[0]) + sse(c[0], c[1]) + sse(c[1], c[2]) + sse(c[2], len(points)),
+    )
+    return np.array([(points[f - 1] + points[f]) / 2 for f in best])
+
+
+def test_natural_breaks_match_exhaustive_search():
+    rng = np.random.default_rng(3)
+    values = np.concatenate([rng.integers(0, 5, 40), rng.integers(12, 16, 30),
+                             rng.integers(30, 33, 20), rng.integers(50, 60, 10)]).astype(float)
+    # One bin per integer so the histogram reduction is exact.
+    np.testing.assert_allclose(natural_breaks(values, bins=1_000), _brute_force_breaks(values))
+
+
+def test_natural_breaks_separate_clear_clusters_on_large_data():
+    rng = np.random.default_rng(4)
+    values = np.concatenate([rng.normal(c, 1.0, 250_000) for c in (10, 25, 45, 80)])
+    breaks = natural_breaks(values)
+    assert 15 < breaks[0] < 20 and 32 < breaks[1] < 38 and 58 < breaks[2] < 67
+
+
+@pytest.mark.parametrize("metric", ["duration", "penetration_rate"])
+def test_quantile_calibration_gives_requested_shares(metric):
+    rng = np.random.default_rng(5)
+    values = rng.gamma(3.0, 8.0 if metric == "duration" else 0.3, 100_000)
+    values[::50] = np.nan
+    thresholds = calibrate_thresholds(values, metric, "quantile", quantiles=(0.1, 0.4, 0.8))
+    other = "rate" if metric == "duration" else "duration"
+    assert thresholds[other] == DEFAULT_THRESHOLDS[other]
+    codes = classify_codes(values[np.isfinite(values)], thresholds, metric)
+    np.testing.assert_allclose(np.bincount(codes) / len(codes), [0.1, 0.3, 0.4, 0.2], atol=1e-3)
+
+
+def test_jenks_rate_cutoffs_descend_and_bad_input_raises():
+    rng = np.random.default_rng(6)
+    values = np.concatenate([rng.normal(c, 0.05, 1_000) for c in (0.3, 0.8, 1.4, 2.2)])
+    rate = calibrate_thresholds(values, "penetration_rate", "jenks")["rate"]
+    assert rate["soft"] > rate["medium"] > rate["hard"]
+    with pytest.raises(ValueError):
+        calibrate_thresholds([1.0, 1.0, 2.0], "duration", "jenks")
+    with pytest.raises(ValueError):
+        calibrate_thresholds(values, "duration", "kmeans")
+
+
+def test_data_processor_calibrates_from_frame_column(processor):
+    df = pd.DataFrame({"duracion": np.arange(1.0, 101.0)})
+    thresholds = processor.calibrate_thresholds(df, "duration")
+    assert [thresholds["duration"][k] for k in ("soft", "medium", "hard")] == [25.75, 50.5, 75.25]
+    with pytest.raises(ValueError):
+        processor.calibrate_thresholds(df, "penetration_rate")
+
+
+def test_zscore_calibration_snaps_to_three_distinct_cutoffs():
+    values = np.random.default_rng(7).normal(0.0, 1.0, 5_000)
+    rate = calibrate_thresholds(values, "rig_normalized_penetration")["rate"]
+    snapped = snap_cutoffs(rate, -4.0, 4.0, 0.05, descending=True)
+    assert snapped["soft"] > snapped["medium"] > snapped["hard"]
+    assert snapped["hard"] < 0.0 < snapped["soft"]
+    # The m/min slider range (min 0.01) used to collapse medium and hard.
+    collapsed = snap_cutoffs(rate, 0.01, 10.0, 0.05, descending=True)
+    assert collapsed["soft"] > collapsed["medium"] > collapsed["hard"] == 0.01
+
+
+def test_snap_cutoffs_keeps_order_at_grid_edges():
+    assert snap_cutoffs({"soft": 16.0, "medium": 16.1, "hard": 200.0}, 1.0, 120.0, 0.5) == {
+        "soft": 16.0, "medium": 16.5, "hard": 120.0
+    }
+    assert snap_cutoffs({"soft": 1.2, "medium": 1.1, "hard": 1.05}, 0.0, 1.0, 0.01, True) == {
+        "soft": 1.0, "medium": 0.99, "hard": 0.98
+    }
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from classification import classify_codes, hardness_index_array
+from threshold_sweep import sweep_thresholds, threshold_grid
+
+
+def _thresholds(soft, medium, hard):
+    cutoffs = {"soft": soft, "medium": medium, "hard": hard}
+    return {"duration": cutoffs, "rate": cutoffs}
+
+
+@pytest.mark.parametrize(
+    "metric, values, grid",
+    [
+        (
+            "duration",
+            np.r_[np.random.default_rng(1).gamma(3.0, 8.0, 5_000), np.nan, -2.0, 16.0, 24.0, 80.0],
+            ([8.0, 16.0, 30.0], [12.0, 24.0, 35.0], [20.0, 40.0, 60.0]),
+        ),
+        (
+            "penetration_rate",
+            np.r_[np.random.default_rng(2).gamma(2.0, 0.4, 5_000), np.nan, 0.0, 1.0, 0.4, 3.0],
+            ([1.5, 1.0, 0.5], [0.9, 0.7, 0.3], [0.6, 0.4, 0.1]),
+        ),
+    ],
+)
+@pytest.mark.parametrize("ordered_only", [True, False])
+def test_sweep_matches_row_by_row_classification(metric, values, grid, ordered_only):
+    sweep = sweep_thresholds(values, metric, *grid, ordered_only=ordered_only)
+    combos = sweep[["soft", "medium", "hard"]].drop_duplicates().to_numpy()
+    assert len(sweep) == 4 * len(combos)
+    for soft, medium, hard in combos:
+        thresholds = _thresholds(soft, medium, hard)
+        rows = sweep[(sweep.soft == soft) & (sweep.medium == medium) & (sweep.hard == hard)]
+        codes = classify_codes(values, thresholds, metric)
+        assert rows["filas"].tolist() == np.bincount(codes, minlength=4).tolist()
+        np.testing.assert_allclose(
+            rows["indice_dureza_medio"].iloc[0],
+            np.nanmean(hardness_index_array(values, thresholds, metric)),
+        )
+    np.testing.assert_allclose(sweep.groupby(["soft", "medium", "hard"])["proporcion"].sum(), 1.0)
+
+
+def test_grid_drops_unordered_combinations():
+    s, m, h = threshold_grid([10, 20], [15, 25], [30], "duration")
+    assert list(zip(s, m, h)) == [(10, 15, 30), (10, 25, 30), (20, 25, 30)]
+    s, m, h = threshold_grid([1.0], [0.7, 1.2], [0.4], "penetration_rate")
+    assert list(zip(s, m, h)) == [(1.0, 0.7, 0.4)]
+    with pytest.raises(ValueError):
+        sweep_thresholds([1.0], "depth", [1], [2], [3])
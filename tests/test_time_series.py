@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from time_series import TrendEngine
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(11)
+    n = 4_000
+    seconds = rng.integers(0, 120 * 86_400, n)
+    seconds[:50] = seconds[50]  # repeated timestamps
+    df = pd.DataFrame(
+        {
+            "tiempo inicio": pd.Timestamp("2024-01-01") + pd.to_timedelta(seconds, unit="s"),
+            "perforadora": rng.choice(["PF02", "PF01", "PF03", None], n, p=[0.4, 0.3, 0.25, 0.05]),
+            "tasa_penetracion": rng.gamma(3.0, 0.3, n),
+        }
+    )
+    df.loc[rng.random(n) < 0.05, "tasa_penetracion"] = np.nan
+    df.loc[::97, "tiempo inicio"] = pd.NaT
+    return df
+
+
+def _in_engine_order(df, engine):
+    return df.iloc[engine._order]
+
+
+@pytest.mark.parametrize("window", ["turno", "dia", "semana"])
+def test_rolling_and_ewm_match_pandas_per_rig(frame, window):
+    engine = TrendEngine(frame)
+    ordered = _in_engine_order(frame, engine)
+    assert ordered["perforadora"].is_monotonic_increasing
+    offset = {"turno": "12h", "dia": "1D", "semana": "7D"}[window]
+    grouped = ordered.groupby("perforadora", sort=True)
+    expected = grouped.rolling(offset, on="tiempo inicio")["tasa_penetracion"].mean()
+    np.testing.assert_allclose(engine.rolling(frame["tasa_penetracion"], window), expected.to_numpy())
+    expected_ewm = np.concatenate([
+        g["tasa_penetracion"].ewm(halflife=offset, times=g["tiempo inicio"]).mean().to_numpy()
+        for _, g in grouped
+    ])
+    np.testing.assert_allclose(engine.ewm(frame["tasa_penetracion"], window), expected_ewm)
+
+
+def test_trends_are_downsampled_per_rig(frame):
+    engine = TrendEngine(frame)
+    trends = engine.trends({"tasa_penetracion": frame["tasa_penetracion"]}, "dia", points=30)
+    assert list(trends.columns) == ["perforadora", "tiempo inicio", "tasa_penetracion"]
+    assert trends.groupby("perforadora").size().to_dict() == {"PF01": 30, "PF02": 30, "PF03": 30}
+    # Each point is the trend as of the last hole of its bucket.
+    rolled = engine.rolling(frame["tasa_penetracion"], "dia")
+    last = _in_engine_order(frame, engine).groupby("perforadora").tail(1).index
+    assert trends.groupby("perforadora")["tiempo inicio"].max().tolist() == frame.loc[last, "tiempo inicio"].tolist()
+    assert trends["tasa_penetracion"].iloc[-1] == rolled[-1]
+
+
+def test_subset_matches_engine_built_on_filtered_rows(frame):
+    rows = np.flatnonzero(frame["tasa_penetracion"].to_numpy() > 0.8)
+    values = {"tasa_penetracion": frame["tasa_penetracion"]}
+    subset = TrendEngine(frame).subset(rows).trends(values, "semana", "ewm")
+    rebuilt = TrendEngine(frame.iloc[rows]).trends(
+        {"tasa_penetracion": frame["tasa_penetracion"].iloc[rows]}, "semana", "ewm"
+    )
+    pd.testing.assert_frame_equal(subset, rebuilt)
+
+
+def test_without_rig_column_is_one_series_and_bad_window_raises(frame):
+    engine = TrendEngine(frame.drop(columns="perforadora"))
+    trends = engine.trends({"tasa_penetracion": frame["tasa_penetracion"]}, "2h", points=10)
+    assert set(trends["perforadora"]) == {"todas"} and len(trends) == 10
+    with pytest.raises(ValueError):
+        engine.rolling(frame["tasa_penetracion"], "quincena")
+    with pytest.raises(ValueError):
+        engine.trends({}, "dia", method="median")
@@ -0,0 +1,145 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def visualizer(lazy_import):
+    return lazy_import("visualizer").Visualizer
+
+
+@pytest.fixture
+def holes():
+    rng = np.random.default_rng(0)
+    n = 3_000
+    return pd.DataFrame(
+        {
+            "este": rng.uniform(0.0, 1_000.0, n),
+            "norte": rng.uniform(0.0, 1_000.0, n),
+            "elevacion": rng.uniform(2_500.0, 3_000.0, n),
+            "dureza": rng.choice(["roca suave", "roca dura"], n).astype(object),
+            "indice_dureza": rng.uniform(0.0, 100.0, n),
+            "pozo": [f"P{i}" for i in range(n)],
+            "duracion": rng.uniform(5.0, 60.0, n),
+            "drill_pattern": "PW1",
+        }
+    )
+
+
+@pytest.mark.parametrize(
+    "builder", ["plot_location_interactive", "plot_hardness_heatmap", "plot_3d_scatter"]
+)
+def test_large_data_mode_caps_points(visualizer, holes, builder):
+    fig = getattr(visualizer, builder)(holes, large_data=True, point_budget=500)
+    drawn = sum(len(trace.x) for trace in fig.data)
+    assert 0 < drawn <= 500
+    assert "de 3,000 pozos" in fig.layout.title.text
+    if builder != "plot_3d_scatter":
+        assert {trace.type for trace in fig.data} == {"scattergl"}
+
+
+def test_small_data_keeps_every_hole_and_svg(visualizer, holes):
+    fig = visualizer.plot_hardness_heatmap(holes.head(100))
+    assert fig.data[0].type == "scatter"
+    assert len(fig.data[0].x) == 100
+
+
+def test_hover_columns_are_configurable(visualizer, holes):
+    fig = visualizer.plot_location_interactive(
+        holes, large_data=True, point_budget=200, hover_columns=["pozo", "no_existe"]
+    )
+    assert "pozo" in fig.data[0].hovertemplate
+    assert "drill_pattern" not in fig.data[0].hovertemplate
+
+
+def test_hardness_heatmap_hover_columns(visualizer, holes):
+    fig = visualizer.plot_hardness_heatmap(holes.head(100))
+    assert "Elevación: %{customdata[0]:.1f}" in fig.data[0].hovertemplate
+    fig = visualizer.plot_hardness_heatmap(
+        holes, large_data=True, point_budget=200, hover_columns=["pozo", "no_existe"]
+    )
+    assert "pozo: %{customdata[0]}" in fig.data[0].hovertemplate
+    assert "Elevación" not in fig.data[0].hovertemplate
+    assert fig.data[0].customdata.shape[1] == 1
+
+
+@pytest.mark.parametrize("statistic", ["mean", "median", "max", "count"])
+def test_hardness_raster_is_one_heatmap_sized_by_grid(visualizer, holes, statistic):
+    fig = visualizer.plot_hardness_raster(holes, cell_size=100.0, statistic=statistic)
+    assert len(fig.data) == 1 and fig.data[0].type == "heatmap"
+    assert np.asarray(fig.data[0].z).shape == (10, 10)
+    assert np.asarray(fig.data[0].customdata).sum() == len(holes)
+
+
+def test_threshold_sweep_plots(visualizer, holes):
+    from threshold_sweep import sweep_thresholds
+
+    sweep = sweep_thresholds(
+        holes["duracion"], "duration", [10, 16, 20], [24, 30], [35, 40, 50]
+    )
+    lines = visualizer.plot_threshold_sweep(sweep, "soft")
+    assert {trace.name for trace in lines.data} <= set(visualizer.COLOR_MAPPING)
+    assert all(len(trace.x) == 3 for trace in lines.data)
+    heatmap = visualizer.plot_threshold_sweep(sweep, "soft", "hard", fixed={"medium": 30})
+    assert heatmap.data[0].z.shape == (3, 3)
+    assert "medium=30" in heatmap.layout.title.text
+    share = visualizer.plot_threshold_sweep(sweep, "soft", "hard", value="roca dura")
+    assert np.nanmax(share.data[0].z) <= 1.0
+    with pytest.raises(ValueError):
+        visualizer.plot_threshold_sweep(sweep, "soft", "soft")
+
+
+@pytest.mark.parametrize(
+    ("builder", "value"),
+    [("plot_penetration_rate_by_rig", "tasa_penetracion"), ("plot_hardness_by_rig", "indice_dureza")],
+)
+def test_rig_box_quartile_mode_payload_is_per_rig(visualizer, holes, builder, value):
+    from group_summary import group_summary
+
+    holes = holes.assign(
+        perforadora=np.resize(["PF01", "PF02", "PF03"], len(holes)),
+        tasa_penetracion=holes["duracion"] / 30.0,
+    )
+    fig = getattr(visualizer, builder)(holes, large_data=True)
+    assert len(fig.data) == 3
+    assert all(trace.type == "box" and trace.y is None for trace in fig.data)
+    summary = group_summary(holes["perforadora"], holes[value], name="perforadora")
+    assert fig.data[1].median[0] == pytest.approx(summary.loc["PF02", "mediana"])
+    assert getattr(visualizer, builder)(holes, summary=summary).to_json() == fig.to_json()
+    assert len(getattr(visualizer, builder)(holes).data[0].y) == 1_000
+
+
+def test_trend_plot_draws_one_line_per_rig(visualizer):
+    from time_series import TrendEngine
+
+    rng = np.random.default_rng(2)
+    df = pd.DataFrame(
+        {
+            "tiempo inicio": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 10**7, 2_000), unit="s"),
+            "perforadora": rng.choice(["PF01", "PF02"], 2_000),
+            "indice_dureza": rng.uniform(0.0, 100.0, 2_000),
+        }
+    )
+    trends = TrendEngine(df).trends({"indice_dureza": df["indice_dureza"]}, "semana", points=50)
+    fig = visualizer.plot_trend(trends, "indice_dureza")
+    assert sorted(trace.name for trace in fig.data) == ["PF01", "PF02"]
+    assert all(len(trace.x) == 50 for trace in fig.data)
+    with pytest.raises(ValueError):
+        visualizer.plot_trend(trends, "duracion")
+
+
+def test_rig_utilisation_heatmap(visualizer):
+    util = pd.DataFrame(
+        {
+            "perforadora": ["PF01", "PF01", "PF02"],
+            "turno": pd.to_datetime(["2024-01-01 08:00", "2024-01-01 20:00", "2024-01-01 08:00"]),
+            "pozos": [3, 1, 2],
+            "horas_perforacion": [6.0, 3.0, 12.0],
+            "utilizacion": [0.5, 0.25, 1.0],
+        }
+    )
+    fig = visualizer.plot_rig_utilisation(util)
+    z = np.asarray(fig.data[0].z, dtype=float)
+    assert z.shape == (2, 2)
+    np.testing.assert_array_equal(z[0], [50.0, 25.0])
+    assert np.isnan(z[1, 1])
@@ -0,0 +1,195 @@
+"""Data-driven proposals for the classification cutoffs.
+
+`DEFAULT_THRESHOLDS` were tuned by hand for one pit. `calibrate_thresholds`
+proposes the three cutoffs of a metric from the data itself:
+
+- `"quantile"`: cutoffs at fixed shares of the rows (by default a
+  quarter of the holes per category), via `np.quantile` (O(n)
+  selection, no full sort).
+- `"jenks"`: Fisher's optimal natural breaks, the four-class partition
+  of the sorted values with the least within-class squared deviation.
+  The exact algorithm is quadratic in the number of distinct values, so
+  the values are first reduced to a `bins`-bin histogram (O(n)) whose
+  occupied bins are weighted points; the dynamic program then runs over
+  at most `bins` points regardless of the row count.
+
+The cutoffs come back as a `Thresholds` dict with the metric's group
+replaced: ascending for `duration` (longer = harder) and descending for
+the rate metrics (faster = softer).
+"""
+
+import numpy as np
+
+from classification import DEFAULT_THRESHOLDS, HARDNESS_LABELS, METRICS, RATE_METRICS
+
+CALIBRATION_METHODS: tuple = ("quantile", "jenks")
+
+# Share of rows below each cutoff, from the softest boundary.
+DEFAULT_QUANTILES: tuple = (0.25, 0.5, 0.75)
+
+# Histogram resolution for the natural-breaks reduction.
+DEFAULT_BREAK_BINS = 256
+
+# Percentiles bounding the histogram range; rows outside are folded into
+# the edge bins so a few outliers cannot squeeze every other row into
+# one bin.
+HISTOGRAM_RANGE_PERCENTILES: tuple = (0.5, 99.5)
+
+_CLASSES = len(HARDNESS_LABELS)
+
+
+def _finite(values):
+    values = np.asarray(values, dtype=float).ravel()
+    return values[np.isfinite(values)]
+
+
+def quantile_breaks(values, quantiles=DEFAULT_QUANTILES):
+    """Ascending cutoffs at the given shares of the finite values."""
+    values = _finite(values)
+    if len(values) < 2:
+        raise ValueError("Se necesitan al menos 2 valores finitos para calibrar.")
+    quantiles = np.asarray(quantiles, dtype=float)
+    if len(quantiles) != _CLASSES - 1 or np.any(np.diff(quantiles) <= 0):
+        raise ValueError("Se requieren 3 cuantiles estrictamente crecientes.")
+    return np.quantile(values, quantiles)
+
+
+def _weighted_histogram(values, bins):
+    """Occupied histogram bins as `(mean value, count)` points."""
+    lo, hi = np.percentile(values, HISTOGRAM_RANGE_PERCENTILES)
+    if hi <= lo:
+        lo, hi = values.min(), values.max()
+    width = (hi - lo) / bins if hi > lo else 1.0
+    index = np.clip(((values - lo) / width).astype(np.int64), 0, bins - 1)
+    counts = np.bincount(index, minlength=bins)
+    sums = np.bincount(index, weights=values, minlength=bins)
+    occupied = counts > 0
+    return sums[occupied] / counts[occupied], counts[occupied].astype(float)
+
+
+def natural_breaks(values, bins=DEFAULT_BREAK_BINS):
+    """Ascending cutoffs of Fisher's optimal 4-class partition.
+
+    Each cutoff lies halfway between the last point of a class and the
+    first point of the next one.
+
+    Raises:
+        ValueError: When the values occupy fewer than four histogram
+            bins (not enough distinct values to split).
+    """
+    values = _finite(values)
+    if bins < _CLASSES:
+        raise ValueError(f"bins debe ser al menos {_CLASSES}.")
+    if len(values) == 0:
+        raise ValueError("Se necesitan valores finitos para calibrar.")
+    x, w = _weighted_histogram(values, bins)
+    n = len(x)
+    if n < _CLASSES:
+        raise ValueError(
+            f"Los datos solo tienen {n} valores distintos; se necesitan {_CLASSES} para calibrar."
+        )
+
+    # cost[i, j]: weighted squared deviation of points i..j (i <= j).
+    cw = np.concatenate([[0.0], np.cumsum(w)])
+    cs = np.concatenate([[0.0], np.cumsum(w * x)])
+    cq = np.concatenate([[0.0], np.cumsum(w * x * x)])
+    i = np.arange(n)[:, None]
+    j = np.arange(n)[None, :]
+    weight = cw[j + 1] - cw[i]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cost = (cq[j + 1] - cq[i]) - (cs[j + 1] - cs[i]) ** 2 / weight
+    cost = np.where(i <= j, np.maximum(cost, 0.0), np.inf)
+
+    # best[j]: least cost of splitting points 0..j into `level` classes;
+    # start[level][j]: first point of the last class in that split.
+    best = cost[0]
+    starts = []
+    for _ in range(1, _CLASSES):
+        # The last class starts at i >= 1, after a split of 0..i-1.
+        total = np.full((n, n), np.inf)
+        total[1:] = best[:-1, None] + cost[1:]
+        start = np.argmin(total, axis=0)
+        best = total[start, np.arange(n)]
+        starts.append(start)
+
+    # Walk the start pointers back from the last point.
+    firsts = []
+    end = n - 1
+    for start in reversed(starts):
+        first = int(start[end])
+        firsts.append(first)
+        end = first - 1
+    firsts.reverse()
+    return np.array([(x[f - 1] + x[f]) / 2.0 for f in firsts])
+
+
+def calibrate_thresholds(
+    values,
+    metric,
+    method="quantile",
+    base=DEFAULT_THRESHOLDS,
+    quantiles=DEFAULT_QUANTILES,
+    bins=DEFAULT_BREAK_BINS,
+):
+    """Propose `Thresholds` for `metric` from its values.
+
+    Args:
+        values: The metric column (`duracion`, `tasa_penetracion` or
+            `tasa_penetracion_normalizada`); non-finite values are ignored.
+        metric: One of the `Metric` literals.
+        method: `"quantile"` or `"jenks"`.
+        base: Thresholds whose other group is kept unchanged.
+        quantiles: Shares of rows in the softer categories (`"quantile"`).
+        bins: Histogram resolution (`"jenks"`).
+
+    Returns:
+        A new `Thresholds` dict.
+
+    Raises:
+        ValueError: On an unknown metric or method, or data that cannot
+            be split into four categories.
+    """
+    if metric == "duration":
+        group = "duration"
+    elif metric in RATE_METRICS:
+        group = "rate"
+        # Faster is softer: the softest share sits at the top.
+        quantiles = 1.0 - np.asarray(quantiles, dtype=float)[::-1]
+    else:
+        raise ValueError(
+            f"Unknown metric {metric!r}; expected one of "
+            + ", ".join(repr(m) for m in METRICS) + "."
+        )
+    if method == "quantile":
+        breaks = quantile_breaks(values, quantiles)
+    elif method == "jenks":
+        breaks = natural_breaks(values, bins)
+    else:
+        raise ValueError(f"Método de calibración no soportado: {method!r}")
+    if group == "rate":
+        breaks = breaks[::-1]
+    thresholds = {name: dict(cutoffs) for name, cutoffs in base.items()}
+    thresholds[group] = dict(zip(("soft", "medium", "hard"), (float(b) for b in breaks)))
+    return thresholds
+
+
+def snap_cutoffs(cutoffs, minimum, maximum, step, descending=False):
+    """Round `{soft, medium, hard}` cutoffs onto a slider grid.
+
+    Each cutoff moves to the nearest `minimum + k * step` inside
+    `[minimum, maximum]`. Cutoffs that land on the same grid value are
+    pushed one step apart, so the strict order the classification needs
+    (ascending, or descending for the rate metrics) survives as long as
+    the grid has room for it.
+    """
+    names = ("hard", "medium", "soft") if descending else ("soft", "medium", "hard")
+    last = int(round((maximum - minimum) / step))
+    ks = [int(np.clip(round((cutoffs[name] - minimum) / step), 0, last)) for name in names]
+    for i in (1, 2):
+        ks[i] = max(ks[i], ks[i - 1] + 1)
+    ks[2] = min(ks[2], last)
+    for i in (1, 0):
+        ks[i] = min(ks[i], ks[i + 1] - 1)
+    snapped = {name: round(minimum + k * step, 10) for name, k in zip(names, ks)}
+    return {name: snapped[name] for name in ("soft", "medium", "hard")}
+
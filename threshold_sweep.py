@@ -0,0 +1,195 @@
+"""Threshold sweep: hardness distribution over a grid of cutoffs.
+
+Evaluating a grid of `(soft, medium, hard)` cutoffs by calling
+`classify_with_metric` once per combination costs O(rows) each time.
+`sweep_thresholds` sorts the metric values once and builds their prefix
+sums; after that every bucket of every combination is an interval of
+the sorted values, so its row count (the cumulative histogram at the
+two cutoffs) and value sum come from `np.searchsorted` plus two lookups.
+A combination then costs O(log rows) and a 10k-combination sweep over
+1M rows takes well under a second.
+
+Bucket counts reproduce `classification.classify_codes` exactly
+(including unordered cutoffs, which the scalar `if` chain resolves
+first-match) and the mean `indice_dureza` follows the piecewise-linear
+segments of `hardness_index_array`, summed per segment (equal to the
+row-by-row mean up to floating-point rounding).
+"""
+
+import numpy as np
+import pandas as pd
+
+from classification import (
+    DURATION_INDEX_UPPER_SATURATION,
+    HARDNESS_LABELS,
+    METRICS,
+    RATE_INDEX_UPPER_SATURATION,
+)
+
+SWEEP_PARAMETERS: tuple = ("soft", "medium", "hard")
+
+# Refuse grids above this many combinations (the table has four rows
+# per combination).
+MAX_SWEEP_COMBINATIONS = 1_000_000
+
+
+class _SortedValues:
+    """Sorted non-NaN values with prefix sums for interval queries."""
+
+    def __init__(self, values):
+        values = np.asarray(values, dtype=float)
+        self.missing = int(np.isnan(values).sum())
+        self.sorted = np.sort(values[~np.isnan(values)])
+        self.prefix = np.concatenate([[0.0], np.cumsum(self.sorted)])
+
+    def below(self, t, inclusive=False):
+        """Number of values `< t` (`<= t` when `inclusive`)."""
+        return np.searchsorted(self.sorted, t, side="right" if inclusive else "left")
+
+    def interval(self, lo, hi):
+        """`(count, sum)` of the values in `(lo, hi]` (empty when `hi <= lo`)."""
+        start = self.below(lo, inclusive=True)
+        stop = np.maximum(self.below(hi, inclusive=True), start)
+        return stop - start, self.prefix[stop] - self.prefix[start]
+
+
+def _segment_index_sum(data, lo, hi, offset, slope, anchor):
+    """Sum of `offset + slope * (v - anchor)` over the values in `(lo, hi]`."""
+    count, total = data.interval(lo, hi)
+    with np.errstate(invalid="ignore"):
+        return np.where(count > 0, offset * count + slope * (total - anchor * count), 0.0)
+
+
+def _duration_sweep(data, soft, medium, hard):
+    n = len(data.sorted)
+    # First-match `<` chain: each bucket starts where the softer ones end.
+    c0 = data.below(soft)
+    c1 = np.maximum(data.below(medium) - c0, 0)
+    c2 = np.maximum(data.below(hard) - data.below(np.maximum(soft, medium)), 0)
+    counts = [c0, c1, c2, n - c0 - c1 - c2 + data.missing]
+
+    # `hardness_index_array` selects the first true `value <= bound`, so
+    # segment k covers (running max of the earlier bounds, bound_k].
+    upper = DURATION_INDEX_UPPER_SATURATION
+    b1 = np.maximum(0.0, soft)
+    b2 = np.maximum(b1, medium)
+    b3 = np.maximum(b2, hard)
+    b4 = np.maximum(b3, upper)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        segments = [
+            (0.0, b1, 0.0, 25.0 / soft, 0.0),
+            (b1, b2, 25.0, 25.0 / (medium - soft), soft),
+            (b2, b3, 50.0, 25.0 / (hard - medium), medium),
+            (b3, b4, 75.0, 25.0 / (upper - hard), hard),
+        ]
+        index_sum = np.zeros(np.shape(soft))
+        for lo, hi, offset, slope, anchor in segments:
+            index_sum = index_sum + _segment_index_sum(data, lo, hi, offset, slope, anchor)
+    # Values <= 0 index to 0; above the saturation (and NaN, which
+    # fails every condition) to 100.
+    saturated = n - data.below(b4, inclusive=True) + data.missing
+    index_sum = index_sum + 100.0 * saturated
+    return counts, index_sum, n + data.missing
+
+
+def _rate_sweep(data, soft, medium, hard):
+    n = len(data.sorted)
+
+    def above(t):
+        return n - data.below(t, inclusive=True)
+
+    # First-match `>` chain, mirrored.
+    c0 = above(soft)
+    c1 = np.maximum(above(medium) - c0, 0)
+    c2 = np.maximum(above(hard) - above(np.minimum(soft, medium)), 0)
+    counts = [c0, c1, c2, n - c0 - c1 - c2 + data.missing]
+
+    # Segments `value > bound` in order: segment k covers
+    # (bound_k, running min of the earlier bounds].
+    upper = RATE_INDEX_UPPER_SATURATION
+    d1 = np.minimum(upper, soft)
+    d2 = np.minimum(d1, medium)
+    d3 = np.minimum(d2, hard)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        segments = [
+            (d1, upper, 0.0, -25.0 / (upper - soft), upper),
+            (d2, d1, 25.0, -25.0 / (soft - medium), soft),
+            (d3, d2, 50.0, -25.0 / (medium - hard), medium),
+            (-np.inf, d3, 75.0, -25.0 / hard, hard),
+        ]
+        index_sum = np.zeros(np.shape(soft))
+        for lo, hi, offset, slope, anchor in segments:
+            index_sum = index_sum + _segment_index_sum(data, lo, hi, offset, slope, anchor)
+    # Values above the saturation index to 0; NaN stays NaN and is left
+    # out of the mean.
+    return counts, index_sum, n
+
+
+def threshold_grid(soft, medium, hard, metric, ordered_only=True):
+    """Every `(soft, medium, hard)` combination of the candidate values.
+
+    With `ordered_only`, combinations the sliders would never produce
+    are dropped: the cutoffs must strictly increase for `duration` and
+    strictly decrease for the rate metrics.
+
+    Returns:
+        Three flat `float64` arrays.
+    """
+    candidates = [np.unique(np.asarray(c, dtype=float).ravel()) for c in (soft, medium, hard)]
+    total = np.prod([len(c) for c in candidates])
+    if total > MAX_SWEEP_COMBINATIONS:
+        raise ValueError(
+            f"El barrido tiene {total} combinaciones; el máximo es {MAX_SWEEP_COMBINATIONS}."
+        )
+    s, m, h = (axis.ravel() for axis in np.meshgrid(*candidates, indexing="ij"))
+    if ordered_only:
+        keep = (s < m) & (m < h) if metric == "duration" else (s > m) & (m > h)
+        s, m, h = s[keep], m[keep], h[keep]
+    return s, m, h
+
+
+def sweep_thresholds(values, metric, soft, medium, hard, ordered_only=True):
+    """Hardness distribution for every combination of candidate cutoffs.
+
+    Args:
+        values: The metric column (`duracion`, `tasa_penetracion` or
+            one of its per-rig normalizations).
+        metric: One of the `Metric` literals; selects the
+            duration or rate cutoffs.
+        soft, medium, hard: Candidate values for each cutoff.
+        ordered_only: Skip unordered combinations (see `threshold_grid`).
+
+    Returns:
+        A tidy DataFrame with one row per combination and category:
+        `soft`, `medium`, `hard`, `dureza`, `filas`, `proporcion` (of
+        all rows) and `indice_dureza_medio` (mean over the rows with a
+        defined index, repeated on the combination's four rows).
+
+    Raises:
+        ValueError: On an unknown metric or a grid above
+            `MAX_SWEEP_COMBINATIONS`.
+    """
+    if metric not in METRICS:
+        raise ValueError(
+            f"Unknown metric {metric!r}; expected one of "
+            + ", ".join(repr(m) for m in METRICS) + "."
+        )
+    s, m, h = threshold_grid(soft, medium, hard, metric, ordered_only)
+    data = _SortedValues(values)
+    sweep = _duration_sweep if metric == "duration" else _rate_sweep
+    counts, index_sum, indexed = sweep(data, s, m, h)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_index = index_sum / indexed if indexed else np.full(len(s), np.nan)
+    total = len(data.sorted) + data.missing
+
+    n_labels = len(HARDNESS_LABELS)
+    filas = np.stack(counts, axis=1).astype(np.int64).ravel()
+    return pd.DataFrame({
+        "soft": np.repeat(s, n_labels),
+        "medium": np.repeat(m, n_labels),
+        "hard": np.repeat(h, n_labels),
+        "dureza": np.tile(np.array(HARDNESS_LABELS, dtype=object), len(s)),
+        "filas": filas,
+        "proporcion": filas / total if total else np.full(len(filas), np.nan),
+        "indice_dureza_medio": np.repeat(mean_index, n_labels),
+    })
@@ -0,0 +1,222 @@
+"""Rolling and EWMA trends per rig over `tiempo inicio`.
+
+`TrendEngine` sorts the processed frame once by `(perforadora, tiempo
+inicio)` and keeps that order, the sorted timestamps and each rig's
+slice bounds. A trend is then a single pass over the sorted values:
+
+- `"rolling"`: time-window mean over `(t - window, t]` within the rig,
+  as `groupby(...).rolling(window, on=...)` computes it. The window
+  start of every row comes from one `searchsorted` per rig (cached per
+  window and shared by every column) and the mean from prefix sums of
+  the finite values.
+- `"ewm"`: time-aware exponentially weighted mean with the window as
+  half-life (`Series.ewm(halflife=..., times=...)` on each rig's slice).
+
+`trends` downsamples every rig's series to at most `points` values (the
+trend as of the end of each of `points` equal time buckets), so a chart
+of several years of history stays a few thousand points.
+"""
+
+import numpy as np
+import pandas as pd
+
+TIME_COLUMN = "tiempo inicio"
+GROUP_COLUMN = "perforadora"
+
+# Values with a trend chart in the app.
+TREND_COLUMNS: tuple = ("indice_dureza", "tasa_penetracion", "tasa_penetracion_normalizada")
+
+# Named windows: a 12-hour shift, a day and a week.
+TREND_WINDOWS = {
+    "turno": pd.Timedelta(hours=12),
+    "dia": pd.Timedelta(days=1),
+    "semana": pd.Timedelta(days=7),
+}
+
+TREND_METHODS: tuple = ("rolling", "ewm")
+
+# Points kept per rig and column after downsampling.
+DEFAULT_TREND_POINTS = 400
+
+# Label of the single series when the frame has no rig column.
+ALL_RIGS_LABEL = "todas"
+
+
+def _window(window) -> int:
+    """Window length in nanoseconds from a `TREND_WINDOWS` name or a timedelta."""
+    if isinstance(window, str) and window in TREND_WINDOWS:
+        window = TREND_WINDOWS[window]
+    try:
+        length = pd.Timedelta(window)
+    except ValueError:
+        raise ValueError(
+            f"Ventana no soportada: {window!r} (usa {', '.join(TREND_WINDOWS)} o un intervalo)."
+        ) from None
+    if length <= pd.Timedelta(0):
+        raise ValueError("La ventana debe ser positiva.")
+    return length.value
+
+
+def rig_time_order(df, time_column=TIME_COLUMN, group_column=GROUP_COLUMN):
+    """Rows of `df` sorted by rig, then time (stable).
+
+    Rows with a missing time or rig are dropped; without a rig column
+    every row belongs to one `ALL_RIGS_LABEL` group.
+
+    Returns:
+        `(rows, times, codes, groups)`: sorted row positions, their
+        times as `int64` nanoseconds, their rig codes (ascending) and
+        the rig labels as strings, sorted.
+    """
+    times = df[time_column]
+    if not pd.api.types.is_datetime64_any_dtype(times):
+        times = pd.to_datetime(times)
+    times = times.to_numpy(dtype="datetime64[ns]")
+    present = ~np.isnat(times)
+    if group_column in df.columns:
+        # Factorize the raw keys and sort only the (few) distinct
+        # labels as strings, instead of converting every row.
+        codes, uniques = pd.factorize(df[group_column].to_numpy())
+        present &= codes >= 0
+        labels = np.array([str(u) for u in uniques], dtype=object)
+        rank = np.argsort(labels, kind="stable")
+        remap = np.empty(len(rank), dtype=np.int64)
+        remap[rank] = np.arange(len(rank))
+        codes = remap[codes] if len(remap) else codes
+        groups = labels[rank]
+    else:
+        codes = np.zeros(len(df), dtype=np.int64)
+        groups = np.array([ALL_RIGS_LABEL], dtype=object)
+    rows = np.flatnonzero(present)
+    times = times[rows].view(np.int64)
+    codes = codes[rows]
+    # Stable sorts by time, then by rig: each rig's rows end up
+    # contiguous and in time order.
+    by_time = np.argsort(times, kind="stable")
+    by_rig = by_time[np.argsort(codes[by_time], kind="stable")]
+    return rows[by_rig], times[by_rig], codes[by_rig], groups
+
+
+class TrendEngine:
+    """Per-rig time order of a processed DataFrame, built once.
+
+    Rows with a missing `tiempo inicio` or rig are left out of every
+    trend. Values passed to `rolling`, `ewm` and `trends` are aligned
+    with the rows of the original frame.
+    """
+
+    def __init__(self, df, time_column=TIME_COLUMN, group_column=GROUP_COLUMN):
+        self.size = len(df)
+        self.time_column = time_column
+        self.group_column = group_column
+        self._set_order(*rig_time_order(df, time_column, group_column))
+
+    def _set_order(self, order, times, codes, groups):
+        self._order = order
+        self._times = times
+        self._codes = codes
+        self.groups = groups
+        counts = np.bincount(codes, minlength=len(groups))
+        self._bounds = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        self._starts = {}
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def subset(self, rows):
+        """Engine over the given row positions only, without re-sorting."""
+        keep = np.zeros(self.size, dtype=bool)
+        keep[np.asarray(rows, dtype=np.int64)] = True
+        keep = keep[self._order]
+        engine = object.__new__(TrendEngine)
+        engine.size = self.size
+        engine.time_column = self.time_column
+        engine.group_column = self.group_column
+        engine._set_order(self._order[keep], self._times[keep], self._codes[keep], self.groups)
+        return engine
+
+    def _window_starts(self, length):
+        """First sorted position inside `(t - length, t]` for every row."""
+        starts = self._starts.get(length)
+        if starts is None:
+            starts = np.empty(len(self._times), dtype=np.int64)
+            for lo, hi in zip(self._bounds[:-1], self._bounds[1:]):
+                times = self._times[lo:hi]
+                starts[lo:hi] = lo + np.searchsorted(times, times - length, side="right")
+            self._starts[length] = starts
+        return starts
+
+    def _sorted_values(self, values):
+        values = np.asarray(values, dtype=float)
+        if len(values) != self.size:
+            raise ValueError("Los valores deben estar alineados con las filas del DataFrame.")
+        return values[self._order]
+
+    def rolling(self, values, window="dia"):
+        """Time-window rolling mean, in the engine's sorted order.
+
+        NaN where the window holds no finite value.
+        """
+        x = self._sorted_values(values)
+        starts = self._window_starts(_window(window))
+        finite = np.isfinite(x)
+        sums = np.concatenate([[0.0], np.cumsum(np.where(finite, x, 0.0))])
+        counts = np.concatenate([[0], np.cumsum(finite)])
+        ends = np.arange(1, len(x) + 1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return (sums[ends] - sums[starts]) / (counts[ends] - counts[starts])
+
+    def ewm(self, values, window="dia"):
+        """Exponentially weighted mean with half-life `window`, in sorted order."""
+        x = self._sorted_values(values)
+        halflife = pd.Timedelta(_window(window))
+        result = np.empty(len(x))
+        for lo, hi in zip(self._bounds[:-1], self._bounds[1:]):
+            if hi > lo:
+                result[lo:hi] = (
+                    pd.Series(x[lo:hi])
+                    .ewm(halflife=halflife, times=self._times[lo:hi].view("datetime64[ns]"))
+                    .mean()
+                    .to_numpy()
+                )
+        return result
+
+    def _downsample(self, points):
+        """Sorted positions closing each of `points` time buckets per rig."""
+        if points < 1:
+            raise ValueError("points debe ser al menos 1.")
+        if len(self._times) == 0:
+            return np.empty(0, dtype=np.int64)
+        first = self._times[self._bounds[:-1][self._codes]]
+        last = self._times[self._bounds[1:][self._codes] - 1]
+        span = np.maximum(last - first, 1).astype(float)
+        bucket = np.minimum(((self._times - first) / span * points).astype(np.int64), points - 1)
+        key = self._codes * points + bucket
+        return np.flatnonzero(np.append(key[1:] != key[:-1], True))
+
+    def trends(self, values, window="dia", method="rolling", points=DEFAULT_TREND_POINTS):
+        """Downsampled trends of several columns, one series per rig.
+
+        Args:
+            values: Mapping (or DataFrame) of column name -> values
+                aligned with the frame's rows.
+            window: A `TREND_WINDOWS` name or anything `pd.Timedelta`
+                accepts.
+            method: `"rolling"` or `"ewm"`.
+            points: Maximum points per rig.
+
+        Returns:
+            A DataFrame with the rig column, the time column and one
+            column per value, sorted by rig and time.
+        """
+        if method not in TREND_METHODS:
+            raise ValueError(f"Método de tendencia no soportado: {method!r}")
+        compute = self.rolling if method == "rolling" else self.ewm
+        keep = self._downsample(points)
+        result = {
+            self.group_column: self.groups[self._codes[keep]],
+            self.time_column: self._times[keep].view("datetime64[ns]"),
+        }
+        for name in values:
+            result[name] = compute(values[name], window)[keep]
+        return pd.DataFrame(result)
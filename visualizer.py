@@ -4,6 +4,10 @@ import pandas as pd
 import plotly.graph_objects as go
 import numpy as np  # Agregando numpy para cálculos de histograma
 
+from decimation import DEFAULT_POINT_BUDGET, grid_decimate
+from group_summary import group_summary
+from spatial_grid import grid_aggregate
+
 class Visualizer:
     # Color mapping definition at class level
     COLOR_MAPPING = {
@@ -13,35 +17,94 @@ class Visualizer:
         "roca muy dura": "#BA55D3"  # lavanda más brillante
     }
 
+    # Modo de grandes volúmenes para los mapas de pozos: por encima de
+    # LARGE_DATA_THRESHOLD filas se dibuja con WebGL y una muestra
+    # espacial determinista de a lo más POINT_BUDGET pozos, con un hover
+    # reducido a LARGE_DATA_HOVER_COLUMNS.
+    LARGE_DATA_THRESHOLD = 20_000
+    POINT_BUDGET = DEFAULT_POINT_BUDGET
+    LARGE_DATA_HOVER_COLUMNS = ("pozo", "duracion")
+
+    @staticmethod
+    def _large_data_sample(df, large_data=None, point_budget=None):
+        """Rows to draw for a map-style scatter and whether to use WebGL.
+
+        `large_data=None` switches the mode on above
+        `LARGE_DATA_THRESHOLD` rows. In large-data mode the rows come from
+        `decimation.grid_decimate` over `este`/`norte`, keeping the holes
+        whose `indice_dureza` is furthest from the middle first.
+
+        Returns:
+            `(df_plot, large_data)`.
+        """
+        if large_data is None:
+            large_data = len(df) > Visualizer.LARGE_DATA_THRESHOLD
+        if not large_data:
+            return df, False
+        budget = point_budget or Visualizer.POINT_BUDGET
+        priority = (
+            (df["indice_dureza"] - 50.0).abs().to_numpy()
+            if "indice_dureza" in df.columns
+            else None
+        )
+        keep = grid_decimate(df["este"].to_numpy(), df["norte"].to_numpy(), budget, priority)
+        if len(keep) < len(df):
+            logging.info(f"Modo de grandes volúmenes: {len(keep)} de {len(df)} pozos dibujados.")
+        return df.iloc[keep], True
+
+    @staticmethod
+    def _hover_columns(df, default, large_data, hover_columns=None):
+        """Hover columns present in `df`; `None` when there are none."""
+        if hover_columns is None:
+            hover_columns = Visualizer.LARGE_DATA_HOVER_COLUMNS if large_data else default
+        present = [col for col in hover_columns if col in df.columns]
+        return present or None
+
+    @staticmethod
+    def _sample_title(title, df_plot, total):
+        if len(df_plot) < total:
+            return f"{title} — {len(df_plot):,} de {total:,} pozos (muestra espacial)"
+        return title
+
     @staticmethod
-    def plot_location_interactive(df):
+    def plot_location_interactive(df, large_data=None, point_budget=None, hover_columns=None):
+        """Ubicación de pozos (Este vs Norte) coloreada por dureza.
+
+        Args:
+            df: DataFrame con 'este', 'norte' y 'dureza'.
+            large_data: Fuerza (True/False) el modo de grandes volúmenes;
+                `None` lo activa sobre `LARGE_DATA_THRESHOLD` filas.
+            point_budget: Máximo de pozos dibujados en ese modo.
+            hover_columns: Columnas del hover; por defecto las de siempre,
+                o `LARGE_DATA_HOVER_COLUMNS` en modo de grandes volúmenes.
+        """
         # Validar columnas necesarias
         required_columns = ['este', 'norte', 'dureza']
         for col in required_columns:
             if col not in df.columns:
                 logging.error(f"Falta la columna requerida: {col}")
                 raise ValueError(f"El archivo no contiene la columna '{col}' necesaria para la visualización interactiva.")
+        df_plot, large_data = Visualizer._large_data_sample(df, large_data, point_budget)
         # Preparar hover data para incluir drill pattern, profundidad y elevación si existen
-        hover_data = []
+        default_hover = []
         if "drill_pattern" in df.columns:
-            hover_data.extend(["drill_pattern", "pozo", "duracion", "material_operator"])
-        if "prof. por operador" in df.columns:
-            hover_data.append("prof. por operador")
-        if "elevacion" in df.columns:
-            hover_data.append("elevacion")
+            default_hover.extend(["drill_pattern", "pozo", "duracion", "material_operator"])
+        default_hover.extend(["prof. por operador", "elevacion"])
         # Si no hay columnas adicionales, usar None para mostrar solo las básicas
-        if not hover_data:
-            hover_data = None
+        hover_data = Visualizer._hover_columns(df, default_hover, large_data, hover_columns)
 
         fig = px.scatter(
-            df,
+            df_plot,
             x='este',
             y='norte',
             color='dureza',
             color_discrete_map=Visualizer.COLOR_MAPPING,
-            title="Ubicación Interactiva de Pozos (Este vs Norte)",
+            title=Visualizer._sample_title(
+                "Ubicación Interactiva de Pozos (Este vs Norte)", df_plot, len(df)
+            ),
             labels={"este": "Este", "norte": "Norte", "dureza": "Dureza"},
-            hover_data=hover_data
+            hover_data=hover_data,
+            render_mode="webgl" if large_data else "auto",
         )
 
         # Agregar grilla de 500x500
@@ -72,10 +135,21 @@ class Visualizer:
         return fig
 
     @staticmethod
-    def plot_dureza_count(df):
-        # Contar la cantidad de pozos por dureza
-        conteo_dureza = df['dureza'].value_counts().reset_index()
-        conteo_dureza.columns = ['dureza', 'conteo']
+    def plot_dureza_count(df, summary=None):
+        """Torta de pozos por dureza.
+
+        `summary` (un resumen por `dureza` de `group_summary`) evita
+        recontar las filas de `df`.
+        """
+        if summary is not None:
+            conteo_dureza = summary['filas'].rename('conteo').rename_axis('dureza').reset_index()
+        else:
+            # Contar la cantidad de pozos por dureza
+            conteo_dureza = df['dureza'].value_counts().reset_index()
+            conteo_dureza.columns = ['dureza', 'conteo']
+        # Un `dureza` categórico (modo compacto) también cuenta las
+        # categorías vacías; se omiten para no dibujar porciones en cero.
+        conteo_dureza = conteo_dureza[conteo_dureza['conteo'] > 0]
 
         fig = px.pie(
             conteo_dureza,
@@ -104,34 +178,35 @@ class Visualizer:
         return fig
 
     @staticmethod
-    def plot_3d_scatter(df):
+    def plot_3d_scatter(df, large_data=None, point_budget=None, hover_columns=None):
+        """Pozos en 3D (Este, Norte, Cota) coloreados por dureza.
+
+        `scatter_3d` ya usa WebGL; el modo de grandes volúmenes solo
+        aplica la muestra espacial y el hover reducido (mismos argumentos
+        que `plot_location_interactive`).
+        """
         required_columns = ['este', 'norte', 'dureza', "elevacion"]
         for col in required_columns:
             if col not in df.columns:
                 logging.error(f"Falta la columna requerida: {col}")
                 raise ValueError(f"El archivo no contiene la columna '{col}' necesaria para la visualización 3D.")
+        df_plot, large_data = Visualizer._large_data_sample(df, large_data, point_budget)
         # Preparar hover data para incluir profundidad y elevación si existen
-        hover_data = []
-        if "prof. por operador" in df.columns:
-            hover_data.append("prof. por operador")
-        if "drill_pattern" in df.columns:
-            hover_data.append("drill_pattern")
-        if "duracion" in df.columns:
-            hover_data.append("duracion")
-        if "elevacion" in df.columns:
-            hover_data.append("elevacion")
-        # Si no hay columnas adicionales, usar None para mostrar solo las básicas
-        if not hover_data:
-            hover_data = None
+        hover_data = Visualizer._hover_columns(
+            df,
+            ["prof. por operador", "drill_pattern", "duracion", "elevacion"],
+            large_data,
+            hover_columns,
+        )
 
         fig = px.scatter_3d(
-            df,
+            df_plot,
             x='este',
             y='norte',
             z='elevacion',
             color='dureza',
             color_discrete_map=Visualizer.COLOR_MAPPING,
-            title="Visualización 3D de Pozos",
+            title=Visualizer._sample_title("Visualización 3D de Pozos", df_plot, len(df)),
             labels={
                 "este": "Este",
                 "norte": "Norte",
@@ -185,12 +260,19 @@ class Visualizer:
         return fig
 
     @staticmethod
-    def plot_hardness_heatmap(df):
+    def plot_hardness_heatmap(df, large_data=None, point_budget=None, hover_columns=None):
         """
         Genera un mapa de dispersión 2D basado en el índice de dureza.
 
         Args:
             df (pd.DataFrame): DataFrame con las columnas 'este', 'norte' e 'indice_dureza'
+            large_data (bool | None): Fuerza el modo de grandes volúmenes
+                (`Scattergl` + muestra espacial); `None` lo activa sobre
+                `LARGE_DATA_THRESHOLD` filas.
+            point_budget (int | None): Máximo de pozos dibujados en ese modo.
+            hover_columns (list | None): Columnas del hover; por defecto
+                la elevación, o `LARGE_DATA_HOVER_COLUMNS` en modo de
+                grandes volúmenes.
 
         Returns:
             go.Figure: Figura de Plotly con el mapa de dispersión 2D
@@ -200,10 +282,19 @@ class Visualizer:
             if col not in df.columns:
                 logging.error(f"Falta la columna requerida: {col}")
                 raise ValueError(f"El archivo no contiene la columna '{col}' necesaria para el mapa de dureza.")
+        total = len(df)
+        df, large_data = Visualizer._large_data_sample(df, large_data, point_budget)
+        hover_data = Visualizer._hover_columns(df, ["elevacion"], large_data, hover_columns) or []
+        hover_lines = "".join(
+            f"<br>Elevación: %{{customdata[{i}]:.1f}}" if col == "elevacion"
+            else f"<br>{col}: %{{customdata[{i}]}}"
+            for i, col in enumerate(hover_data)
+        )
+        scatter = go.Scattergl if large_data else go.Scatter
         fig = go.Figure()
 
         # Crear el scatter plot con índice de dureza
-        fig.add_trace(go.Scatter(
+        fig.add_trace(scatter(
             x=df['este'],
             y=df['norte'],
             mode='markers',
@@ -228,16 +319,16 @@ class Visualizer:
             hovertemplate=(
                 "Este: %{x:.1f}<br>" +
                 "Norte: %{y:.1f}<br>" +
-                "Índice de Dureza: %{marker.color:.1f}<br>" +
-                "Elevación: %{customdata[0]:.1f}" +
+                "Índice de Dureza: %{marker.color:.1f}" +
+                hover_lines +
                 "<extra></extra>"
             ),
-            customdata=df[['elevacion']] if 'elevacion' in df.columns else None
+            customdata=df[hover_data] if hover_data else None
         ))
 
         # Configurar el layout
         fig.update_layout(
-            title="Mapa de Dispersión de Índice de Dureza",
+            title=Visualizer._sample_title("Mapa de Dispersión de Índice de Dureza", df, total),
             plot_bgcolor='rgba(0,0,0,0)',
             paper_bgcolor='rgba(0,0,0,0)',
             xaxis=dict(
@@ -267,13 +358,315 @@ class Visualizer:
         logging.info("Mapa de dispersión de índice de dureza generado correctamente")
         return fig
 
+    # Etiquetas de las estadísticas de `plot_hardness_raster`.
+    RASTER_STATISTIC_LABELS = {
+        "mean": "Índice de dureza promedio",
+        "median": "Índice de dureza mediano",
+        "max": "Índice de dureza máximo",
+        "count": "Cantidad de pozos",
+    }
+
+    @staticmethod
+    def plot_hardness_raster(df, cell_size=None, statistic="mean"):
+        """
+        Genera un mapa de grilla (heatmap) del índice de dureza por celda.
+
+        A diferencia de `plot_hardness_heatmap`, dibuja una sola traza
+        `Heatmap`, así que el tamaño de la figura depende de la resolución
+        de la grilla y no de la cantidad de pozos.
+
+        Args:
+            df (pd.DataFrame): DataFrame con 'este', 'norte' e 'indice_dureza'.
+            cell_size (float | None): Lado de la celda en metros; `None`
+                usa `spatial_grid.auto_cell_size`.
+            statistic (str): 'mean', 'median', 'max' o 'count'.
+
+        Returns:
+            go.Figure: Figura de Plotly con el heatmap.
+        """
+        required_columns = ['este', 'norte', 'indice_dureza']
+        for col in required_columns:
+            if col not in df.columns:
+                logging.error(f"Falta la columna requerida: {col}")
+                raise ValueError(f"El archivo no contiene la columna '{col}' necesaria para el mapa de dureza.")
+        if statistic not in Visualizer.RASTER_STATISTIC_LABELS:
+            raise ValueError(f"Estadística no soportada para el mapa de grilla: {statistic}")
+
+        grid = grid_aggregate(
+            df['este'].to_numpy(),
+            df['norte'].to_numpy(),
+            df['indice_dureza'].to_numpy(),
+            cell_size=cell_size,
+            statistics=tuple(dict.fromkeys(("count", statistic))),
+        )
+        label = Visualizer.RASTER_STATISTIC_LABELS[statistic]
+        z = grid[statistic].astype(float)
+        if statistic == "count":
+            # Celdas vacías transparentes en vez de un color para el cero.
+            z[z == 0] = np.nan
+            color = dict(colorscale="Viridis")
+        else:
+            color = dict(
+                colorscale=[
+                    [0, 'rgb(0,255,0)'],
+                    [0.25, 'rgb(255,255,0)'],
+                    [0.5, 'rgb(255,165,0)'],
+                    [0.75, 'rgb(255,69,0)'],
+                    [1, 'rgb(255,0,0)']
+                ],
+                zmin=0,
+                zmax=100,
+            )
+
+        fig = go.Figure(go.Heatmap(
+            x=grid['x_centers'],
+            y=grid['y_centers'],
+            z=z,
+            customdata=grid['count'],
+            colorbar=dict(title=label),
+            hoverongaps=False,
+            hovertemplate=(
+                "Este: %{x:.1f}<br>" +
+                "Norte: %{y:.1f}<br>" +
+                f"{label}: " + "%{z:.1f}<br>" +
+                "Pozos: %{customdata}" +
+                "<extra></extra>"
+            ),
+            **color
+        ))
+        fig.update_layout(
+            title=f"Mapa de Grilla de Dureza (celda {grid['cell_size']:.1f} m)",
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)',
+            xaxis=dict(title="Este", showline=True, linewidth=1, linecolor='black', color='black'),
+            yaxis=dict(
+                title="Norte",
+                showline=True,
+                linewidth=1,
+                linecolor='black',
+                color='black',
+                scaleanchor="x",
+            ),
+        )
+        logging.info("Mapa de grilla de índice de dureza generado correctamente")
+        return fig
+
+    SWEEP_PARAMETER_LABELS = {
+        "soft": "Umbral soft",
+        "medium": "Umbral medium",
+        "hard": "Umbral hard",
+    }
+
+    @staticmethod
+    def plot_threshold_sweep(sweep, x, y=None, fixed=None, value="indice_dureza_medio"):
+        """
+        Grafica un barrido de umbrales (`threshold_sweep.sweep_thresholds`).
+
+        Con un solo eje (`y=None`) dibuja la proporción de cada categoría
+        de dureza en función del umbral `x`. Con dos ejes dibuja un
+        heatmap de `value` sobre la grilla (`x`, `y`).
+
+        Args:
+            sweep (pd.DataFrame): Tabla del barrido.
+            x (str): Umbral del eje X ('soft', 'medium' o 'hard').
+            y (str | None): Umbral del eje Y para el heatmap.
+            fixed (dict | None): Valor de cada umbral que no es eje; por
+                defecto, el valor candidato central.
+            value (str): 'indice_dureza_medio' o una etiqueta de dureza
+                (se grafica su proporción) para el heatmap.
+
+        Returns:
+            go.Figure: Figura de Plotly.
+        """
+        axes = [x] if y is None else [x, y]
+        labels = Visualizer.SWEEP_PARAMETER_LABELS
+        if any(axis not in labels for axis in axes) or len(set(axes)) != len(axes):
+            raise ValueError(f"Ejes de barrido no válidos: {axes}")
+        if value != "indice_dureza_medio" and value not in Visualizer.COLOR_MAPPING:
+            raise ValueError(f"Valor de barrido no soportado: {value}")
+
+        # Fijar los umbrales que no son ejes para obtener una curva o grilla.
+        fixed = dict(fixed or {})
+        subset = sweep
+        for parameter in labels:
+            if parameter in axes:
+                continue
+            candidates = np.sort(subset[parameter].unique())
+            if len(candidates) == 0:
+                break
+            target = fixed.get(parameter, candidates[(len(candidates) - 1) // 2])
+            nearest = candidates[np.abs(candidates - target).argmin()]
+            fixed[parameter] = nearest
+            subset = subset[subset[parameter] == nearest]
+        subtitle = ", ".join(f"{p}={v:g}" for p, v in fixed.items() if p not in axes)
+
+        if y is None:
+            fig = px.line(
+                subset.sort_values(x),
+                x=x,
+                y="proporcion",
+                color="dureza",
+                color_discrete_map=Visualizer.COLOR_MAPPING,
+                markers=True,
+                labels={x: labels[x], "proporcion": "Proporción de pozos", "dureza": "Dureza"},
+                title=f"Sensibilidad de la clasificación a {labels[x].lower()}"
+                + (f" ({subtitle})" if subtitle else ""),
+            )
+            fig.update_yaxes(tickformat=".0%")
+        else:
+            if value == "indice_dureza_medio":
+                cells = subset.drop_duplicates([x, y])
+                column, label = "indice_dureza_medio", "Índice de dureza medio"
+                color = dict(zmin=0, zmax=100, colorscale=[
+                    [0, 'rgb(0,255,0)'],
+                    [0.5, 'rgb(255,165,0)'],
+                    [1, 'rgb(255,0,0)'],
+                ])
+            else:
+                cells = subset[subset["dureza"] == value]
+                column, label = "proporcion", f"Proporción {value}"
+                color = dict(zmin=0, zmax=1, colorscale="Viridis")
+            grid = cells.pivot(index=y, columns=x, values=column)
+            fig = go.Figure(go.Heatmap(
+                x=grid.columns.to_numpy(),
+                y=grid.index.to_numpy(),
+                z=grid.to_numpy(),
+                colorbar=dict(title=label),
+                hoverongaps=False,
+                hovertemplate=(
+                    f"{labels[x]}: " + "%{x:g}<br>" +
+                    f"{labels[y]}: " + "%{y:g}<br>" +
+                    f"{label}: " + "%{z:.3g}" +
+                    "<extra></extra>"
+                ),
+                **color
+            ))
+            fig.update_layout(
+                title=f"Barrido de umbrales: {label.lower()}" + (f" ({subtitle})" if subtitle else ""),
+                xaxis_title=labels[x],
+                yaxis_title=labels[y],
+            )
+        logging.info("Gráfico de barrido de umbrales generado correctamente.")
+        return fig
+
+    @staticmethod
+    def plot_trend(trends, column, title=None):
+        """Tendencia de `column` en el tiempo, una línea por perforadora.
+
+        Args:
+            trends: Tabla de `time_series.TrendEngine.trends` (ya reducida
+                a unos cientos de puntos por perforadora).
+            column: Columna de valores a dibujar.
+            title: Título; por defecto se arma con la etiqueta de la
+                columna.
+        """
+        for col in ("perforadora", "tiempo inicio", column):
+            if col not in trends.columns:
+                raise ValueError(f"La tabla de tendencias no contiene la columna '{col}'.")
+        label = Visualizer.TREND_COLUMN_LABELS.get(column, column)
+        fig = px.line(
+            trends,
+            x="tiempo inicio",
+            y=column,
+            color="perforadora",
+            title=title or f"Tendencia de {label.lower()} por perforadora",
+            labels={"tiempo inicio": "Fecha", column: label, "perforadora": "Perforadora"},
+            color_discrete_sequence=Visualizer._rig_color_sequence(trends),
+        )
+        logging.info("Gráfico de tendencia por perforadora generado correctamente.")
+        return fig
+
+    @staticmethod
+    def plot_rig_utilisation(utilisation):
+        """Utilización por perforadora y turno (mapa de calor).
+
+        Args:
+            utilisation: Tabla de `rig_intervals.RigIntervals.utilisation`
+                (una fila por perforadora y turno).
+        """
+        for col in ("perforadora", "turno", "utilizacion", "horas_perforacion"):
+            if col not in utilisation.columns:
+                raise ValueError(f"La tabla de utilización no contiene la columna '{col}'.")
+        porcentaje = utilisation.pivot(index="perforadora", columns="turno", values="utilizacion") * 100.0
+        horas = utilisation.pivot(index="perforadora", columns="turno", values="horas_perforacion")
+        fig = go.Figure(
+            go.Heatmap(
+                x=porcentaje.columns,
+                y=porcentaje.index.astype(str),
+                z=porcentaje.to_numpy(),
+                customdata=horas.to_numpy(),
+                zmin=0.0,
+                zmax=100.0,
+                colorscale="Viridis",
+                colorbar=dict(title="Utilización (%)"),
+                hovertemplate=(
+                    "Perforadora: %{y}<br>Turno: %{x}<br>"
+                    "Utilización: %{z:.1f}%<br>Horas perforando: %{customdata:.2f}<extra></extra>"
+                ),
+            )
+        )
+        fig.update_layout(
+            title="Utilización por perforadora y turno",
+            xaxis_title="Turno",
+            yaxis_title="Perforadora",
+        )
+        logging.info("Mapa de utilización por perforadora generado correctamente.")
+        return fig
+
+    TREND_COLUMN_LABELS = {
+        "indice_dureza": "Índice de dureza",
+        "tasa_penetracion": "Tasa de penetración (m/min)",
+        "tasa_penetracion_normalizada": "Tasa de penetración normalizada (z)",
+    }
+
+    @staticmethod
+    def _quartile_box(summary, title, labels):
+        """Box plot drawn from a `group_summary` table, one trace per group.
+
+        Plotly receives the quartiles, whiskers and mean of each group
+        instead of its rows, so the payload depends only on the number
+        of groups. Groups without a finite value are skipped.
+        """
+        summary = summary[summary["validos"] > 0]
+        by = summary.index.name
+        palette = list(Visualizer.COLOR_MAPPING.values())
+        fig = go.Figure()
+        for i, (group, row) in enumerate(summary.iterrows()):
+            fig.add_trace(
+                go.Box(
+                    x=[group],
+                    name=str(group),
+                    q1=[row["q1"]],
+                    median=[row["mediana"]],
+                    q3=[row["q3"]],
+                    lowerfence=[row["bigote_inferior"]],
+                    upperfence=[row["bigote_superior"]],
+                    mean=[row["media"]],
+                    marker_color=palette[i % len(palette)],
+                )
+            )
+        fig.update_layout(
+            title=title,
+            xaxis_title=labels.get(by, by),
+            yaxis_title=labels.get("valor"),
+        )
+        return fig
+
+    @staticmethod
+    def _use_quartile_box(df, summary, large_data):
+        if summary is not None:
+            return True
+        if large_data is None:
+            return len(df) > Visualizer.LARGE_DATA_THRESHOLD
+        return large_data
+
     # PARITY-DEBT: webapp/src/utils/charts.ts:plotPenetrationRateByRig —
     # the per-rig box plots depend on the rig column and the parity
     # surface; when the TS port lands it must consume the same
     # canonical COLOR_MAPPING and skip silently on missing columns.
 
     @staticmethod
-    def plot_penetration_rate_by_rig(df):
+    def plot_penetration_rate_by_rig(df, summary=None, large_data=None):
         """Box plot of `tasa_penetracion` grouped by `perforadora`.
 
         Returns `None` when the rig column is absent (per R-8 silent
@@ -282,6 +675,12 @@ class Visualizer:
 
         Reuses the canonical `COLOR_MAPPING` so the visual vocabulary
         stays consistent across every chart.
+
+        In quartile mode the boxes come from a per-rig `group_summary`
+        (the precomputed `summary` when given, e.g. from
+        `ClassificationCache.summary`) instead of shipping every row;
+        `large_data=None` switches it on above `LARGE_DATA_THRESHOLD`
+        rows, as for the maps.
         """
         if "perforadora" not in df.columns:
             logging.info(
@@ -296,12 +695,23 @@ class Visualizer:
                     f"El archivo no contiene la columna '{col}' necesaria "
                     "para el box plot por perforadora."
                 )
+        title = "Distribución de tasa de penetración por perforadora"
+        if Visualizer._use_quartile_box(df, summary, large_data):
+            if summary is None:
+                summary = group_summary(df["perforadora"], df["tasa_penetracion"], name="perforadora")
+            fig = Visualizer._quartile_box(
+                summary,
+                title,
+                {"perforadora": "Perforadora", "valor": "Tasa de penetración (m/min)"},
+            )
+            logging.info("Box plot de tasa de penetración por perforadora (cuartiles) generado.")
+            return fig
         fig = px.box(
             df,
             x="perforadora",
             y="tasa_penetracion",
             color="perforadora",
-            title="Distribución de tasa de penetración por perforadora",
+            title=title,
             labels={
                 "perforadora": "Perforadora",
                 "tasa_penetracion": "Tasa de penetración (m/min)",
@@ -316,11 +726,13 @@ class Visualizer:
         return fig
 
     @staticmethod
-    def plot_hardness_by_rig(df):
+    def plot_hardness_by_rig(df, summary=None, large_data=None):
         """Box plot of `indice_dureza` grouped by `perforadora`.
 
         Returns `None` when the rig column is absent. Raises
         `ValueError` when the hardness or rig column is missing.
+        `summary` and `large_data` select the quartile mode as in
+        `plot_penetration_rate_by_rig`.
         """
         if "perforadora" not in df.columns:
             logging.info(
@@ -335,12 +747,21 @@ class Visualizer:
                     f"El archivo no contiene la columna '{col}' necesaria "
                     "para el box plot de dureza por perforadora."
                 )
+        title = "Distribución de índice de dureza por perforadora"
+        if Visualizer._use_quartile_box(df, summary, large_data):
+            if summary is None:
+                summary = group_summary(df["perforadora"], df["indice_dureza"], name="perforadora")
+            fig = Visualizer._quartile_box(
+                summary, title, {"perforadora": "Perforadora", "valor": "Índice de dureza"}
+            )
+            logging.info("Box plot de índice de dureza por perforadora (cuartiles) generado.")
+            return fig
         fig = px.box(
             df,
             x="perforadora",
             y="indice_dureza",
             color="perforadora",
-            title="Distribución de índice de dureza por perforadora",
+            title=title,
             labels={
                 "perforadora": "Perforadora",
                 "indice_dureza": "Índice de dureza",